@@ -0,0 +1,47 @@
+"""
+Per-update overhead of the handler metrics wrapper.
+
+Drives a trivial coroutine handler directly and through HandlerMetrics.instrument_handler,
+the same way the pyrogram dispatcher awaits callbacks, and reports the difference per call.
+
+Usage:
+    python -m benchmarks.handler_metrics [iterations]
+"""
+
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+from src.utils.handler_metrics import HandlerMetrics
+
+
+async def handler(client, update):
+    return None
+
+
+async def drive(callback, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await callback(None, None)
+    return time.perf_counter() - start
+
+
+async def main(iterations: int):
+    wrapped = SimpleNamespace(callback=handler)
+    HandlerMetrics().instrument_handler(wrapped, group=1)
+
+    # Warm up, then keep the best of a few rounds for each variant
+    await drive(handler, iterations // 10)
+    await drive(wrapped.callback, iterations // 10)
+    direct = min([await drive(handler, iterations) for _ in range(5)])
+    instrumented = min([await drive(wrapped.callback, iterations) for _ in range(5)])
+
+    print(f"{'variant':<16}{'us/update':>12}")
+    print(f"{'direct':<16}{direct / iterations * 1e6:>12.3f}")
+    print(f"{'instrumented':<16}{instrumented / iterations * 1e6:>12.3f}")
+    print(f"overhead: {(instrumented - direct) / iterations * 1e6:.3f} us/update")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000))
@@ -0,0 +1,83 @@
+"""
+Invalidation lag between two processes sharing a MongoDB database.
+
+A child process starts its own InvalidationBus subscribed to "bench:" and reports
+when each key arrives; the parent publishes keys at a fixed interval from a second
+bus and prints the publish-to-handle lag distribution measured in the child.
+Needs a reachable MongoDB configured through the usual environment variables.
+
+Usage:
+    python -m benchmarks.invalidation_lag [messages] [interval_ms]
+"""
+
+import asyncio
+import multiprocessing
+import sys
+import time
+
+from src.database.client import DatabaseClient
+from src.database.invalidation import InvalidationBus
+
+PREFIX = "bench:"
+
+
+async def subscriber(count: int, ready, results):
+    db = DatabaseClient.get_instance()
+    await db.connect()
+    bus = InvalidationBus.get_instance()
+    received = asyncio.Event()
+    seen = []
+
+    def on_invalidation(key: str):
+        seen.append(key)
+        if len(seen) >= count:
+            received.set()
+
+    InvalidationBus.subscribe(PREFIX, on_invalidation)
+    await bus.start()
+    ready.set()
+    try:
+        await asyncio.wait_for(received.wait(), timeout=count + 30)
+    except asyncio.TimeoutError:
+        pass
+    results.put({"received": len(seen), **bus.lag.snapshot()})
+    await bus.stop()
+    await db.disconnect()
+
+
+def run_subscriber(count: int, ready, results):
+    asyncio.run(subscriber(count, ready, results))
+
+
+async def publisher(count: int, interval: float):
+    db = DatabaseClient.get_instance()
+    await db.connect()
+    bus = InvalidationBus.get_instance()
+    await bus.start()
+    for index in range(count):
+        await bus.publish(f"{PREFIX}{index}")
+        await asyncio.sleep(interval)
+    await bus.stop()
+    await db.disconnect()
+
+
+def main(count: int, interval_ms: float):
+    context = multiprocessing.get_context("spawn")
+    ready, results = context.Event(), context.Queue()
+    child = context.Process(target=run_subscriber, args=(count, ready, results))
+    child.start()
+    if not ready.wait(timeout=30):
+        child.terminate()
+        raise SystemExit("subscriber did not start")
+
+    started = time.perf_counter()
+    asyncio.run(publisher(count, interval_ms / 1000))
+    stats = results.get(timeout=count + 60)
+    child.join()
+
+    print(f"published {count} keys in {time.perf_counter() - started:.1f}s, received {stats.pop('received')}")
+    print("lag ms: " + "  ".join(f"{name}={value}" for name, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, float(sys.argv[2]) if len(sys.argv) > 2 else 20)
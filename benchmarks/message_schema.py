@@ -0,0 +1,123 @@
+"""
+Storage and scan time of full spy documents versus the slim schema with compressed raw.
+
+Builds a synthetic corpus from the sample messages in benchmarks.spy_serializer
+(varying ids, senders, text and timestamps), prints the average BSON size of the
+full and the slim document, then writes the corpus in both shapes to a scratch
+database and reports collection and index sizes and the time to scan one chat
+with the daily summary projection and the whole collection with the sentiment
+projection. The scratch database is dropped afterwards. Pass --offline to skip the
+MongoDB part.
+
+Usage:
+    python -m benchmarks.message_schema [messages] [mongodb-uri] [--offline]
+"""
+
+import asyncio
+import copy
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import bson
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from benchmarks.spy_serializer import build_sample_messages
+from src.database.message_schema import decode_raw, slim_document
+from src.plugins.sentiment.constants import MESSAGE_PROJECTION as SENTIMENT_PROJECTION
+from src.plugins.spy.serializer import to_document
+from src.plugins.summary.job import MESSAGE_PROJECTION as SUMMARY_PROJECTION
+
+SCRATCH_DATABASE = "nexus_schema_benchmark"
+CHATS = 20
+INSERT_BATCH_SIZE = 5000
+WORDS = "привет как дела что нового кто идёт вечером встреча ссылка фото завтра сегодня".split()
+
+
+def build_corpus(count: int):
+    """Full documents shaped like spy output, spread over CHATS chats."""
+    templates = [to_document(message) for message in build_sample_messages()]
+    start = datetime.now(timezone.utc) - timedelta(days=30)
+    for index in range(count):
+        document = copy.deepcopy(templates[index % len(templates)])
+        document["id"] = index
+        document["chat"]["id"] = -1001000000000 - index % CHATS
+        document["from_user"]["id"] = 100000 + index % 300
+        document["from_user"]["username"] = f"user{index % 300}"
+        if "text" in document:
+            document["text"] = " ".join(random.choices(WORDS, k=random.randint(3, 30)))
+        document["created_at"] = start + timedelta(seconds=index * 2)
+        yield document
+
+
+async def measure_storage(uri: str, count: int):
+    client = AsyncIOMotorClient(uri)
+    db = client[SCRATCH_DATABASE]
+    await client.drop_database(SCRATCH_DATABASE)
+    try:
+        batch = []
+        for document in build_corpus(count):
+            batch.append(document)
+            if len(batch) == INSERT_BATCH_SIZE:
+                await db["full"].insert_many(batch)
+                await db["slim"].insert_many([slim_document(full) for full in batch])
+                batch = []
+        if batch:
+            await db["full"].insert_many(batch)
+            await db["slim"].insert_many([slim_document(full) for full in batch])
+
+        print(f"{'shape':<8}{'data MB':>10}{'storage MB':>12}{'index MB':>10}{'chat scan ms':>14}{'full scan ms':>14}")
+        for name in ("full", "slim"):
+            # The indexes everything else scans through
+            await db[name].create_index([("chat.id", 1), ("created_at", 1)])
+            await db[name].create_index([("from_user.id", 1)])
+            stats = await db.command("collStats", name)
+
+            started = time.perf_counter()
+            await db[name].find({"chat.id": -1001000000000}, SUMMARY_PROJECTION).sort("created_at", 1).to_list(length=None)
+            chat_scan = time.perf_counter() - started
+
+            started = time.perf_counter()
+            scanned = 0
+            async for _ in db[name].find({}, SENTIMENT_PROJECTION, batch_size=1000):
+                scanned += 1
+            full_scan = time.perf_counter() - started
+
+            mb = 1024 * 1024
+            print(f"{name:<8}{stats['size'] / mb:>10.1f}{stats['storageSize'] / mb:>12.1f}{stats['totalIndexSize'] / mb:>10.1f}{chat_scan * 1000:>14.1f}{full_scan * 1000:>14.1f}")
+    finally:
+        await client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+def measure_documents(count: int):
+    full_bytes = slim_bytes = raw_bytes = 0
+    started = time.perf_counter()
+    for document in build_corpus(count):
+        slim = slim_document(document)
+        full_bytes += len(bson.encode(document))
+        slim_bytes += len(bson.encode(slim))
+        raw_bytes += len(slim["raw"])
+    encode_us = (time.perf_counter() - started) / count * 1e6
+
+    sample = slim_document(next(build_corpus(1)))
+    started = time.perf_counter()
+    for _ in range(1000):
+        decode_raw(sample)
+    decode_us = (time.perf_counter() - started) / 1000 * 1e6
+
+    print(f"documents: {count}")
+    print(f"{'full BSON':<28}{full_bytes / count:>10.0f} B/doc")
+    print(f"{'slim BSON incl. raw':<28}{slim_bytes / count:>10.0f} B/doc")
+    print(f"{'  of which raw (zstd)':<28}{raw_bytes / count:>10.0f} B/doc")
+    print(f"{'slim + compress':<28}{encode_us:>10.1f} us/doc")
+    print(f"{'decode raw':<28}{decode_us:>10.1f} us/doc")
+
+
+if __name__ == "__main__":
+    arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]
+    count = int(arguments[0]) if arguments else 200000
+    measure_documents(min(count, 20000))
+    if "--offline" not in sys.argv:
+        asyncio.run(measure_storage(arguments[1] if len(arguments) > 1 else "mongodb://localhost:27017", count))
@@ -0,0 +1,103 @@
+"""
+Peak RSS of reading a large chat history as a list versus as a projected stream.
+
+Seeds a synthetic chat with N spy-shaped messages, then runs each reader in a fresh
+subprocess and reports its peak resident set size and wall time:
+
+    list      get_all_messages_by_chat (whole documents, materialized)
+    stream    iter_messages_by_chat with the sentiment projection, consumed one by one
+    slim      iter_messages_by_chat with the sentiment projection, materialized
+
+The seeded chat is deleted afterwards. Needs a reachable MongoDB; seeding a million
+messages takes a few minutes.
+
+Usage:
+    python -m benchmarks.message_streaming [messages]
+"""
+
+import asyncio
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.database.client import DatabaseClient
+from src.database.repository.message_repository import MessageRepository
+from src.plugins.sentiment.constants import MESSAGE_PROJECTION
+
+# Synthetic chat id, far outside the range Telegram assigns
+CHAT_ID = -1009999999999
+SEED_BATCH_SIZE = 10000
+WORDS = "привет как дела что нового кто идёт вечером встреча ссылка фото завтра сегодня".split()
+
+
+def build_message(index: int, start: datetime) -> dict:
+    user_id = 100000 + index % 200
+    created_at = start + timedelta(seconds=index * 3)
+    return {
+        "_": "Message",
+        "id": index,
+        "from_user": {"_": "User", "id": user_id, "is_bot": False, "first_name": f"User {user_id}", "username": f"user{user_id}", "language_code": "ru", "is_premium": False},
+        "chat": {"_": "Chat", "id": CHAT_ID, "type": "ChatType.SUPERGROUP", "title": "Benchmark chat", "username": "benchmark_chat"},
+        "date": created_at.replace(tzinfo=None).isoformat(sep=" "),
+        "text": " ".join(random.choices(WORDS, k=random.randint(3, 25))),
+        "entities": [{"_": "MessageEntity", "type": "MessageEntityType.BOLD", "offset": 0, "length": 5}],
+        "outgoing": False,
+        "mentioned": False,
+        "has_protected_content": False,
+        "sentiment": {"positive": random.random(), "negative": random.random(), "neutral": random.random(), "sensitive_topics": {}},
+        "created_at": created_at,
+    }
+
+
+async def seed(repository: MessageRepository, count: int):
+    start = datetime.now(timezone.utc) - timedelta(days=90)
+    for offset in range(0, count, SEED_BATCH_SIZE):
+        await repository.insert_messages([build_message(index, start) for index in range(offset, min(count, offset + SEED_BATCH_SIZE))])
+
+
+async def read(variant: str) -> dict:
+    db = DatabaseClient.get_instance()
+    await db.connect()
+    repository = MessageRepository(db.client)
+    started = time.perf_counter()
+    if variant == "list":
+        count = len(await repository.get_all_messages_by_chat(CHAT_ID))
+    elif variant == "stream":
+        count = 0
+        async for _ in repository.iter_messages_by_chat(CHAT_ID, projection=MESSAGE_PROJECTION):
+            count += 1
+    else:
+        count = len([message async for message in repository.iter_messages_by_chat(CHAT_ID, projection=MESSAGE_PROJECTION)])
+    elapsed = time.perf_counter() - started
+    await db.disconnect()
+    # ru_maxrss is in kilobytes on Linux
+    return {"variant": variant, "messages": count, "seconds": round(elapsed, 2), "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+
+
+async def main(count: int):
+    db = DatabaseClient.get_instance()
+    await db.connect()
+    repository = MessageRepository(db.client)
+    print(f"seeding {count} messages into chat {CHAT_ID}")
+    await seed(repository, count)
+
+    try:
+        print(f"{'variant':<10}{'messages':>10}{'seconds':>10}{'peak RSS MB':>14}")
+        for variant in ("list", "stream", "slim"):
+            output = subprocess.run([sys.executable, "-m", "benchmarks.message_streaming", "--read", variant], capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{variant:<10}{result['messages']:>10}{result['seconds']:>10}{result['peak_rss_mb']:>14}")
+    finally:
+        await repository.delete_messages_by_chat(CHAT_ID)
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--read":
+        print(json.dumps(asyncio.run(read(sys.argv[2]))))
+    else:
+        asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000))
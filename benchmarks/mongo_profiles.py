@@ -0,0 +1,95 @@
+"""
+Insert throughput and latency of the MongoDB connection profiles.
+
+For every connection profile and write concern, inserts synthetic messages into a
+scratch database on a local mongod the way the spy ingestion queue does (unordered
+insert_many batches) and as individual insert_one calls from concurrent handlers.
+Reports documents/sec and p50/p99 latency per operation. The scratch database is
+dropped afterwards.
+
+Usage:
+    python -m benchmarks.mongo_profiles [mongodb-uri] [documents]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import WriteConcern
+
+from src.database.profiles import PROFILES
+from src.database.verify_indexes import seed_messages
+
+SCRATCH_DATABASE = "nexus_profile_bench"
+BATCH_SIZE = 500
+CONCURRENCY = 20
+
+WRITE_CONCERNS = {
+    "w1": WriteConcern(w=1),
+    "w1,j=false": WriteConcern(w=1, j=False),
+    "w1,j=true": WriteConcern(w=1, j=True),
+    "w0": WriteConcern(w=0),
+}
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_batches(collection, documents) -> list:
+    latencies = []
+    for start in range(0, len(documents), BATCH_SIZE):
+        batch = [dict(doc) for doc in documents[start : start + BATCH_SIZE]]
+        began = time.perf_counter()
+        await collection.insert_many(batch, ordered=False)
+        latencies.append(time.perf_counter() - began)
+    return latencies
+
+
+async def run_single(collection, documents) -> list:
+    latencies = []
+    queue = asyncio.Queue()
+    for doc in documents:
+        queue.put_nowait(dict(doc))
+
+    async def worker():
+        while not queue.empty():
+            doc = queue.get_nowait()
+            began = time.perf_counter()
+            await collection.insert_one(doc)
+            latencies.append(time.perf_counter() - began)
+
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return latencies
+
+
+async def main(uri: str, count: int):
+    documents = seed_messages(count)
+
+    print(f"{'profile':<10}{'write concern':<14}{'mode':<8}{'docs/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for profile_name, profile in PROFILES.items():
+        client = AsyncIOMotorClient(uri, **profile.client_options())
+        try:
+            await client.drop_database(SCRATCH_DATABASE)
+            for concern_name, write_concern in WRITE_CONCERNS.items():
+                collection = client[SCRATCH_DATABASE].get_collection("messages", write_concern=write_concern)
+                for mode, runner in (("batch", run_batches), ("single", run_single)):
+                    await collection.drop()
+                    began = time.perf_counter()
+                    latencies = await runner(collection, documents)
+                    elapsed = time.perf_counter() - began
+                    p50 = statistics.median(latencies) * 1000
+                    p99 = percentile(latencies, 0.99) * 1000
+                    print(f"{profile_name:<10}{concern_name:<14}{mode:<8}{count / elapsed:>10,.0f}{p50:>10.2f}{p99:>10.2f}")
+        finally:
+            await client.drop_database(SCRATCH_DATABASE)
+            client.close()
+
+
+if __name__ == "__main__":
+    mongo_uri = sys.argv[1] if len(sys.argv) > 1 else "mongodb://localhost:27017"
+    documents_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    asyncio.run(main(mongo_uri, documents_count))
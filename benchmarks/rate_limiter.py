@@ -0,0 +1,80 @@
+"""
+Throughput benchmark of rate limit decisions in local and distributed mode.
+
+Runs the same decision workload against a scratch database on a local mongod:
+many users each issuing a few requests, plus a handful of hot users hammering one
+command. Local mode decides in memory; distributed mode issues an atomic
+find_one_and_update per decision, except for denied keys served by the lease cache.
+The scratch database is dropped afterwards.
+
+Usage:
+    python -m benchmarks.rate_limiter [mongodb-uri] [decisions]
+"""
+
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from src.database.indexes import IndexRegistry
+from src.database.repository.ratelimit_repository import RateLimitRepository
+from src.security.rate_limiter import RateLimiter
+
+SCRATCH_DATABASE = "nexus_ratelimit_bench"
+CONCURRENCY = 50
+HOT_USERS = 5
+
+
+def build_workload(decisions: int):
+    """Every fifth decision comes from a hot user, the rest are spread over many users."""
+    workload = []
+    for i in range(decisions):
+        user_id = i % HOT_USERS if i % 5 == 0 else 1000 + i % (decisions // 4 or 1)
+        workload.append((user_id, "markov_handler"))
+    return workload
+
+
+async def run(limiter: RateLimiter, workload) -> tuple:
+    queue = asyncio.Queue()
+    for item in workload:
+        queue.put_nowait(item)
+    allowed = 0
+
+    async def worker():
+        nonlocal allowed
+        while not queue.empty():
+            user_id, operation = queue.get_nowait()
+            allowed += await limiter.check(user_id, operation, window_seconds=2)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return time.perf_counter() - start, allowed
+
+
+async def main(uri: str, decisions: int):
+    client = AsyncIOMotorClient(uri)
+    db = client[SCRATCH_DATABASE]
+    try:
+        await client.drop_database(SCRATCH_DATABASE)
+        await IndexRegistry.create_indexes(db, "ratelimits")
+        repository = RateLimitRepository(SimpleNamespace(db=db))
+        workload = build_workload(decisions)
+
+        print(f"{'mode':<14}{'decisions/s':>14}{'allowed':>10}")
+        for mode, distributed in (("local", False), ("distributed", True)):
+            await db["ratelimits"].delete_many({})
+            limiter = RateLimiter(repository, distributed=distributed)
+            elapsed, allowed = await run(limiter, workload)
+            await limiter.stop()
+            print(f"{mode:<14}{decisions / elapsed:>14,.0f}{allowed:>10}")
+    finally:
+        await client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    mongo_uri = sys.argv[1] if len(sys.argv) > 1 else "mongodb://localhost:27017"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    asyncio.run(main(mongo_uri, count))
@@ -0,0 +1,75 @@
+"""
+Throughput of the spy message handler with logging on and off.
+
+Drives the spy plugin's message handler over the sample messages from
+benchmarks.spy_serializer, with the ingestion queue writing to an in-memory
+repository. Logging goes through the real queue-based pipeline into a temporary
+JSON log file; "off" disables logging entirely, "unsampled" logs every message and
+"sampled" uses the default LOG_SAMPLE_RATES.
+
+Usage:
+    python -m benchmarks.spy_logging [messages]
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import structlog
+
+from benchmarks.spy_serializer import build_sample_messages
+from src.plugins.spy import spy
+from src.plugins.spy.ingestion import MessageIngestionQueue
+from src.utils.logging import setup_structlog, shutdown_logging
+
+
+class MemoryMessageRepository:
+    """Stands in for MessageRepository; counts inserted documents."""
+
+    def __init__(self):
+        self.inserted = 0
+
+    async def insert_messages(self, messages):
+        self.inserted += len(messages)
+        return len(messages)
+
+
+async def drive(messages, count: int) -> float:
+    MessageIngestionQueue._instance = MessageIngestionQueue(MemoryMessageRepository())
+    start = time.perf_counter()
+    for index in range(count):
+        await spy.message(None, messages[index % len(messages)])
+    await MessageIngestionQueue.shutdown()
+    return time.perf_counter() - start
+
+
+async def main(count: int):
+    messages = build_sample_messages()
+    log_dir = tempfile.mkdtemp()
+    results = {}
+
+    for variant, sample_rates in (("off", ""), ("unsampled", "Message received=1"), ("sampled", "")):
+        os.environ["LOG_SAMPLE_RATES"] = sample_rates
+        setup_structlog(log_file=os.path.join(log_dir, f"{variant}.log"), console=False)
+        # Loggers are cached on first use; rebind so the new sampling rates apply
+        spy.log = structlog.get_logger(spy.__name__)
+        logging.disable(logging.CRITICAL if variant == "off" else logging.NOTSET)
+
+        await drive(messages, count // 10)
+        results[variant] = min([await drive(messages, count) for _ in range(3)])
+        shutdown_logging()
+
+    logging.disable(logging.NOTSET)
+    print(f"{'variant':<12}{'msgs/s':>12}{'us/msg':>10}")
+    for variant, elapsed in results.items():
+        print(f"{variant:<12}{count / elapsed:>12.0f}{elapsed / count * 1e6:>10.2f}")
+    for variant in ("off", "unsampled", "sampled"):
+        path = os.path.join(log_dir, f"{variant}.log")
+        print(f"{variant} log: {os.path.getsize(path)} bytes")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,79 @@
+"""
+Micro-benchmark of the spy message serializer.
+
+Compares the old ``json.loads(str(message))`` round trip against the direct
+serializer in ``src.plugins.spy.serializer`` on sample messages modelled on
+recorded updates (plain text, formatted reply, photo with caption, voice).
+
+Usage:
+    python -m benchmarks.spy_serializer [iterations]
+"""
+
+import json
+import sys
+import timeit
+from datetime import datetime
+
+from pyrogram import enums, types
+
+from src.plugins.spy.serializer import to_document
+
+
+def build_sample_messages():
+    """Build pyrogram messages shaped like the updates the spy plugin records."""
+    user = types.User(id=123456789, is_self=False, is_contact=False, is_mutual_contact=False, is_deleted=False, is_bot=False, is_verified=False, is_restricted=False, is_scam=False, is_fake=False, is_support=False, is_premium=True, first_name="Иван", last_name="Петров", username="ivan_petrov", language_code="ru", phone_number="79991234567")
+    other = types.User(id=987654321, is_self=False, is_bot=False, first_name="Мария", username="maria")
+    chat = types.Chat(id=-1001716442415, type=enums.ChatType.SUPERGROUP, title="Тестовый чат", username="test_chat", is_verified=False, is_restricted=False, is_scam=False, is_fake=False)
+    date = datetime(2025, 3, 14, 12, 30, 15)
+
+    text = types.Message(id=1001, from_user=user, chat=chat, date=date, text="Привет всем! Как дела? Кто идёт вечером на встречу?", outgoing=False, mentioned=False, has_protected_content=False)
+
+    replied = types.Message(id=1002, from_user=other, chat=chat, date=date, text="Я иду, только опоздаю минут на 15")
+    reply = types.Message(
+        id=1003,
+        from_user=user,
+        chat=chat,
+        date=date,
+        text="Отлично, ждём тебя! Ссылка: https://example.com/meetup",
+        entities=[types.MessageEntity(type=enums.MessageEntityType.BOLD, offset=0, length=7), types.MessageEntity(type=enums.MessageEntityType.URL, offset=26, length=26)],
+        reply_to_message_id=1002,
+        reply_to_message=replied,
+    )
+
+    thumbs = [types.Thumbnail(file_id="AAMCAgADGQEAAQ" * 4, file_unique_id="AQADAgAT", width=320, height=180, file_size=12345)]
+    photo = types.Photo(file_id="AgACAgIAAxkBAAIB" * 4, file_unique_id="AQADAgATx", width=1280, height=720, file_size=153421, date=date, thumbs=thumbs)
+    photo_msg = types.Message(id=1004, from_user=other, chat=chat, date=date, media=enums.MessageMediaType.PHOTO, photo=photo, caption="Фото с прошлой встречи")
+
+    voice = types.Voice(file_id="AwACAgIAAxkBAAIC" * 4, file_unique_id="AgADmRQ", duration=12, mime_type="audio/ogg", file_size=45231, date=date)
+    voice_msg = types.Message(id=1005, from_user=user, chat=chat, date=date, media=enums.MessageMediaType.VOICE, voice=voice)
+
+    return [text, reply, photo_msg, voice_msg]
+
+
+def main(iterations: int = 20000):
+    messages = build_sample_messages()
+
+    # The samples carry no raw TL objects, so both paths must produce the same documents
+    for message in messages:
+        assert to_document(message) == json.loads(str(message)), f"Mismatch for message {message.id}"
+
+    def old_path():
+        for message in messages:
+            json.loads(str(message))
+
+    def new_path():
+        for message in messages:
+            to_document(message)
+
+    per_message = iterations * len(messages)
+    old_time = min(timeit.repeat(old_path, number=iterations, repeat=3))
+    new_time = min(timeit.repeat(new_path, number=iterations, repeat=3))
+
+    print(f"{'path':<28}{'us/message':>12}")
+    print(f"{'json.loads(str(message))':<28}{old_time / per_message * 1e6:>12.2f}")
+    print(f"{'to_document(message)':<28}{new_time / per_message * 1e6:>12.2f}")
+    print(f"speedup: {old_time / new_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,56 @@
+"""
+Time to warm the peer config cache with and without a warm-restart snapshot.
+
+Loads up to N stored peer configs the way handlers do (one get_peer_config per chat)
+into an empty cache, then saves a snapshot, clears the cache and restores it from the
+snapshot file. Needs a reachable MongoDB with a populated peer_config collection.
+
+Usage:
+    python -m benchmarks.warm_restart [chats]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from src.database.client import DatabaseClient
+from src.database.repository.peer_config_repository import PeerConfigRepository
+from src.utils.snapshot import CacheSnapshot
+
+
+async def main(limit: int):
+    db = DatabaseClient.get_instance()
+    await db.connect()
+    repository = PeerConfigRepository(db.client)
+    chat_ids = [document["chat_id"] async for document in repository.collection.find({}, {"_id": 0, "chat_id": 1}).limit(limit)]
+
+    repository.invalidate_cache()
+    started = time.perf_counter()
+    for chat_id in chat_ids:
+        await repository.get_peer_config(chat_id)
+    cold = time.perf_counter() - started
+
+    path = os.path.join(tempfile.mkdtemp(), "cache_snapshot.bson")
+    CacheSnapshot.save(path)
+    size = os.path.getsize(path)
+    repository.invalidate_cache()
+    started = time.perf_counter()
+    CacheSnapshot.load(path)
+    warm = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for chat_id in chat_ids:
+        await repository.get_peer_config(chat_id)
+    first_reads = time.perf_counter() - started
+
+    print(f"chats: {len(chat_ids)}, snapshot: {size} bytes")
+    print(f"{'cold (mongo)':<24}{cold * 1000:>10.1f} ms")
+    print(f"{'snapshot restore':<24}{warm * 1000:>10.1f} ms")
+    print(f"{'reads after restore':<24}{first_reads * 1000:>10.1f} ms")
+    await db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
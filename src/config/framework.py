@@ -1,9 +1,11 @@
+import copy
 from typing import Dict, Optional, Any, ClassVar
 
 import structlog
 from pydantic import BaseModel, Field
 
 from src.database.client import DatabaseClient
+from src.security.entitlements import Entitlements
 
 logger = structlog.get_logger(__name__)
 
@@ -26,13 +28,11 @@ class PeerConfigModel(BaseModel):
 
     # Only NSFW is a core parameter
     nsfw_enabled: bool = Field(default=False, description="Разрешен ли 18+ контент?", display_name="Разрешен ли 18+ контент?")
-    
-    # VIP status - not exposed via /config
-    is_vip: bool = Field(default=False, description="VIP статус", display_name="VIP статус")
 
     # Class variables to store parameter metadata and mappings
     param_registry: ClassVar[Dict[str, ConfigParam]] = {}
     command_to_param: ClassVar[Dict[str, str]] = {}  # Maps command names to parameter names
+    registry_version: ClassVar[int] = 0  # Bumped on every registration so cached configs pick up new defaults
 
     @classmethod
     def register_param(cls, param_name: str, param_type: str, default: Any, description: str, display_name: str, command_name: Optional[str] = None):
@@ -56,6 +56,24 @@ class PeerConfigModel(BaseModel):
 
         # Add to command mapping
         cls.command_to_param[command_name.lower()] = param_name
+        cls.registry_version += 1
+
+    @classmethod
+    def apply_defaults(cls, config: Dict) -> Dict:
+        """
+        Fill in defaults for registered parameters missing from a stored config, in place.
+
+        Args:
+            config: Configuration document as stored in the database
+
+        Returns:
+            The same dictionary with every registered parameter present
+        """
+        for param_name, param_info in cls.param_registry.items():
+            if param_name not in config:
+                # Mutable defaults (e.g. imagegen_cfg) must not be shared between chats
+                config[param_name] = copy.deepcopy(param_info.default)
+        return config
 
     @classmethod
     def register_core_params(cls):
@@ -124,6 +142,20 @@ class PeerConfigModel(BaseModel):
             return False, default
 
 
+_peer_config_repository = None
+
+
+def _get_peer_config_repository():
+    """Get the process-wide peer config repository, creating it on first use."""
+    global _peer_config_repository
+    if _peer_config_repository is None:
+        from src.database.repository.peer_config_repository import PeerConfigRepository
+
+        db_client = DatabaseClient.get_instance()
+        _peer_config_repository = PeerConfigRepository(db_client.client)
+    return _peer_config_repository
+
+
 async def get_chat_setting(chat_id: int, param_name: str, default=None):
     """
     Get a specific setting value for a chat.
@@ -137,11 +169,7 @@ async def get_chat_setting(chat_id: int, param_name: str, default=None):
         The setting value
     """
     try:
-        # Initialize repository
-        from src.database.repository.peer_config_repository import PeerConfigRepository
-
-        db_client = DatabaseClient.get_instance()
-        config_repo = PeerConfigRepository(db_client.client)
+        config_repo = _get_peer_config_repository()
 
         # Convert command name to parameter name if needed
         actual_param = PeerConfigModel.get_param_by_command(param_name) or param_name
@@ -170,11 +198,7 @@ async def update_chat_setting(chat_id: int, param_name: str, value: Any):
         The updated configuration
     """
     try:
-        # Initialize repository
-        from src.database.repository.peer_config_repository import PeerConfigRepository
-
-        db_client = DatabaseClient.get_instance()
-        config_repo = PeerConfigRepository(db_client.client)
+        config_repo = _get_peer_config_repository()
 
         # Convert command name to parameter name if needed
         actual_param = PeerConfigModel.get_param_by_command(param_name) or param_name
@@ -199,11 +223,7 @@ async def get_chat_config(chat_id: int):
         The full configuration dictionary
     """
     try:
-        # Initialize repository
-        from src.database.repository.peer_config_repository import PeerConfigRepository
-
-        db_client = DatabaseClient.get_instance()
-        config_repo = PeerConfigRepository(db_client.client)
+        config_repo = _get_peer_config_repository()
 
         # Get and return the config
         return await config_repo.get_peer_config(chat_id)
@@ -213,6 +233,16 @@ async def get_chat_config(chat_id: int):
         return {"chat_id": chat_id}
 
 
+def invalidate_chat_config(chat_id: Optional[int] = None):
+    """
+    Drop cached configuration so the next read goes to the database.
+
+    Args:
+        chat_id: The chat ID to invalidate (None to invalidate every chat)
+    """
+    _get_peer_config_repository().invalidate_cache(chat_id)
+
+
 def get_param_registry():
     """
     Get the parameter registry.
@@ -245,43 +275,38 @@ def get_param_info(param_name: str) -> Optional[ConfigParam]:
     return None
 
 
-async def enable_vip(chat_id: int) -> Dict:
+async def enable_vip(user_id: int, granted_by: Optional[int] = None):
     """
-    Enable VIP status for a chat.
+    Enable VIP status for a user.
 
     Args:
-        chat_id: The chat ID to enable VIP for
-
-    Returns:
-        The updated configuration
+        user_id: The user ID to enable VIP for
+        granted_by: User ID of the developer granting it
     """
-    return await update_chat_setting(chat_id, "is_vip", True)
+    await Entitlements.get_instance().grant_vip(user_id, granted_by)
 
 
-async def disable_vip(chat_id: int) -> Dict:
+async def disable_vip(user_id: int):
     """
-    Disable VIP status for a chat.
+    Disable VIP status for a user.
 
     Args:
-        chat_id: The chat ID to disable VIP for
-
-    Returns:
-        The updated configuration
+        user_id: The user ID to disable VIP for
     """
-    return await update_chat_setting(chat_id, "is_vip", False)
+    await Entitlements.get_instance().revoke_vip(user_id)
 
 
-async def is_vip(chat_id: int) -> bool:
+def is_vip(user_id: int) -> bool:
     """
-    Check if a chat has VIP status.
+    Check if a user has VIP status.
 
     Args:
-        chat_id: The chat ID to check
+        user_id: The user ID to check
 
     Returns:
-        True if the chat has VIP status, False otherwise
+        True if the user has VIP status, False otherwise
     """
-    return await get_chat_setting(chat_id, "is_vip", False)
+    return Entitlements.get_instance().is_vip(user_id)
 
 
 # Initialize core parameters
@@ -3,6 +3,8 @@ from typing import Optional
 import structlog
 from motor.motor_asyncio import AsyncIOMotorClient
 
+from src.database.monitoring import CommandMonitor
+from src.database.profiles import get_profile
 from src.utils.credentials import Credentials
 
 # Get the shared logger instance
@@ -26,17 +28,21 @@ class DatabaseClient:
         """Connect to MongoDB and initialize the database."""
         if not self._initialized:
             try:
-                logger.info("Connecting to MongoDB", host=self.credentials.database.host, port=self.credentials.database.port)
-                self.client = AsyncIOMotorClient(self.connection_string)
+                profile = get_profile(self.credentials.database.profile)
+                options = profile.client_options()
+                logger.info("Connecting to MongoDB", host=self.credentials.database.host, port=self.credentials.database.port, profile=self.credentials.database.profile, compressors=options.get("compressors"))
+                monitor = CommandMonitor.get_instance()
+                monitor.measure_payloads = self.credentials.metrics.mongo_payload_sizes
+                self.client = AsyncIOMotorClient(self.connection_string, event_listeners=[monitor], **options)
                 self.db = self.client[database_name]
                 # Verify connection
                 await self.client.admin.command("ping")
 
-                # Initialize rate limiting
-                from src.database.repository.ratelimit_repository import RateLimitRepository
+                # Create indexes declared by every repository
+                from src.database.indexes import IndexRegistry
 
-                rate_limit_repo = RateLimitRepository(self)
-                await rate_limit_repo.initialize()
+                IndexRegistry.discover()
+                await IndexRegistry.create_indexes(self.db)
 
                 # Initialize bot configuration
                 from src.database.repository.bot_config_repository import BotConfigRepository
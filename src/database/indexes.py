@@ -0,0 +1,110 @@
+"""Declarative registry of MongoDB indexes and the queries they are meant to serve."""
+
+import importlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+# Modules that declare indexes, relative to the src directory
+REPOSITORY_MODULE_GLOBS = ("database/repository/*.py", "plugins/*/repository.py")
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """An index on a collection."""
+
+    collection: str
+    keys: Tuple[Tuple[str, Any], ...]
+    options: Dict[str, Any] = field(default_factory=dict, hash=False, compare=False)
+
+
+@dataclass(frozen=True)
+class QuerySpec:
+    """A query shape a repository issues, used to verify that it is served by an index."""
+
+    collection: str
+    name: str
+    filter: Dict[str, Any] = field(hash=False, compare=False)
+    sort: Optional[List[Tuple[str, int]]] = field(default=None, hash=False, compare=False)
+
+
+class IndexRegistry:
+    """
+    Collects index declarations from every repository.
+
+    Repositories register their indexes (and the queries those indexes serve) at module
+    level, the same way plugins register their peer config parameters. All indexes
+    are created once at startup by create_indexes().
+    """
+
+    indexes: ClassVar[List[IndexSpec]] = []
+    queries: ClassVar[List[QuerySpec]] = []
+
+    @classmethod
+    def register_index(cls, collection: str, keys, **options):
+        """
+        Declare an index.
+
+        Args:
+            collection: Collection name in the nexus database
+            keys: Field name or list of (field, direction) pairs, as accepted by create_index
+            **options: Extra create_index options (unique, sparse, expireAfterSeconds, ...)
+        """
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        spec = IndexSpec(collection=collection, keys=tuple(tuple(key) for key in keys), options=options)
+        if spec not in cls.indexes:
+            cls.indexes.append(spec)
+
+    @classmethod
+    def register_query(cls, collection: str, name: str, filter: Dict[str, Any], sort: Optional[List[Tuple[str, int]]] = None):
+        """
+        Declare a query shape that must be served by one of the registered indexes.
+
+        Args:
+            collection: Collection name in the nexus database
+            name: Repository method issuing the query
+            filter: Example filter document
+            sort: Sort specification, if the query sorts
+        """
+        spec = QuerySpec(collection=collection, name=name, filter=filter, sort=sort)
+        if spec not in cls.queries:
+            cls.queries.append(spec)
+
+    @classmethod
+    def discover(cls):
+        """Import every repository module so that its declarations are registered."""
+        for pattern in REPOSITORY_MODULE_GLOBS:
+            for path in sorted(SRC_DIR.glob(pattern)):
+                if path.name == "__init__.py":
+                    continue
+                module = ".".join(("src",) + path.relative_to(SRC_DIR).with_suffix("").parts)
+                try:
+                    importlib.import_module(module)
+                except Exception as e:
+                    logger.error("Failed to import repository module", module=module, error=str(e))
+
+    @classmethod
+    async def create_indexes(cls, db, collection: Optional[str] = None):
+        """
+        Create registered indexes. Existing indexes are left untouched.
+
+        Args:
+            db: Motor database handle
+            collection: Only create indexes for this collection (None for all)
+        """
+        for spec in cls.indexes:
+            if collection is not None and spec.collection != collection:
+                continue
+            try:
+                await db[spec.collection].create_index(list(spec.keys), **spec.options)
+            except Exception as e:
+                logger.error("Failed to create index", collection=spec.collection, keys=spec.keys, error=str(e))
+
+        if collection is None:
+            logger.info("Database indexes ensured", count=len(cls.indexes))
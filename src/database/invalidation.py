@@ -0,0 +1,213 @@
+"""Cross-process cache invalidation over a capped MongoDB collection."""
+
+import asyncio
+import inspect
+import os
+import socket
+import time
+import uuid
+from typing import Callable, ClassVar, List, Optional, Tuple
+
+import structlog
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+from src.database.client import DatabaseClient
+from src.utils.metrics import Histogram
+
+logger = structlog.get_logger(__name__)
+
+INVALIDATION_COLLECTION = "invalidations"
+# The capped collection only has to hold messages until every process has read them
+CAPPED_SIZE_BYTES = 1024 * 1024
+CAPPED_MAX_DOCUMENTS = 10000
+# Delay before reopening the tailable cursor once it dies (empty collection, network error)
+RETRY_SECONDS = 1.0
+
+
+class InvalidationBus:
+    """
+    Broadcasts cache invalidations between bot processes.
+
+    Publishers append a key such as "peer_config:-1001234" to a capped collection;
+    every process tails it with an awaitable cursor and calls the callbacks subscribed
+    to a matching key prefix. Messages published by the process itself are skipped,
+    since its own caches were already updated by the write. A capped collection works
+    on a standalone mongod, where change streams are not available.
+
+    Cache owners subscribe at module level, the same way repositories register their
+    indexes, so subscriptions exist before the bus starts.
+    """
+
+    subscribers: ClassVar[List[Tuple[str, Callable]]] = []
+    _instance = None
+
+    def __init__(self, db_client: DatabaseClient):
+        self.db = db_client.db
+        self.collection = self.db[INVALIDATION_COLLECTION]
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._listener: Optional[asyncio.Task] = None
+        self._last_id = None
+        # Guards creating the capped collection, which publishers may race the listener for
+        self._collection_lock = asyncio.Lock()
+        self._collection_ready = False
+        # Time between publishing and handling, for messages from other processes
+        self.lag = Histogram()
+
+    @classmethod
+    def get_instance(cls) -> "InvalidationBus":
+        """Get the process-wide invalidation bus."""
+        if cls._instance is None:
+            cls._instance = cls(DatabaseClient.get_instance())
+        return cls._instance
+
+    @classmethod
+    async def shutdown(cls):
+        """Stop listening if the bus was ever started."""
+        if cls._instance is not None:
+            await cls._instance.stop()
+
+    @classmethod
+    def subscribe(cls, prefix: str, callback: Callable):
+        """
+        Call a function for every invalidation whose key starts with a prefix.
+
+        Args:
+            prefix: Key prefix such as "peer_config:"
+            callback: Function or coroutine function receiving the full key
+        """
+        if (prefix, callback) not in cls.subscribers:
+            cls.subscribers.append((prefix, callback))
+
+    async def publish(self, key: str):
+        """
+        Tell the other processes that cached data for a key changed.
+
+        Failures are logged, not raised; the writer's own change already succeeded.
+
+        Args:
+            key: Invalidated key, "<cache>:<id>" by convention ("<cache>:" for everything)
+        """
+        try:
+            await self.ensure_collection()
+            await self.collection.insert_one({"key": key, "origin": self.origin, "published_at": time.time()})
+        except PyMongoError as e:
+            logger.error("Failed to publish cache invalidation", key=key, error=str(e))
+
+    async def ensure_collection(self):
+        """
+        Make sure the invalidations collection exists and is capped.
+
+        Runs once per process, before the first publish or tail. An insert into a
+        missing collection would create it uncapped, and tailable cursors fail on
+        those, so an existing uncapped collection is converted.
+        """
+        if self._collection_ready:
+            return
+        async with self._collection_lock:
+            if self._collection_ready:
+                return
+            try:
+                await self.db.create_collection(INVALIDATION_COLLECTION, capped=True, size=CAPPED_SIZE_BYTES, max=CAPPED_MAX_DOCUMENTS)
+            except CollectionInvalid:
+                info = await self.db.list_collections(filter={"name": INVALIDATION_COLLECTION}).to_list(length=1)
+                if not info or not info[0].get("options", {}).get("capped"):
+                    logger.warning("Invalidation collection is not capped, converting it", collection=INVALIDATION_COLLECTION)
+                    try:
+                        await self.db.command("convertToCapped", INVALIDATION_COLLECTION, size=CAPPED_SIZE_BYTES)
+                    except PyMongoError as e:
+                        logger.error("Invalidation collection is not capped; cross-process cache invalidation will not work", collection=INVALIDATION_COLLECTION, error=str(e))
+                        raise
+            self._collection_ready = True
+
+    async def start(self):
+        """Create the capped collection if needed and start following it."""
+        await self.ensure_collection()
+
+        # Only messages published from now on are relevant
+        latest = await self.collection.find_one({}, sort=[("$natural", -1)], projection={"_id": 1})
+        self._last_id = latest["_id"] if latest else None
+
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        logger.info("Cache invalidation bus started", origin=self.origin, subscribers=len(self.subscribers))
+
+    async def stop(self):
+        """Stop following invalidations."""
+        if self._listener is not None and not self._listener.done():
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        self._listener = None
+
+    async def _listen(self):
+        """Tail the capped collection, reopening the cursor whenever it dies."""
+        while True:
+            query = {"_id": {"$gt": self._last_id}} if self._last_id is not None else {}
+            cursor = self.collection.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+            try:
+                while cursor.alive:
+                    async for message in cursor:
+                        self._last_id = message["_id"]
+                        await self._dispatch(message)
+            except PyMongoError as e:
+                logger.warning("Cache invalidation cursor interrupted", error=str(e))
+            finally:
+                await cursor.close()
+            await asyncio.sleep(RETRY_SECONDS)
+
+    async def replay(self, since: float) -> int:
+        """
+        Dispatch invalidations published since a point in time, such as while the process was down.
+
+        When the capped collection no longer reaches back that far, every subscriber
+        gets its bare prefix instead, which invalidates everything it caches.
+
+        Args:
+            since: Unix time to replay from
+
+        Returns:
+            int: Number of invalidations replayed
+        """
+        oldest = await self.collection.find_one({}, sort=[("$natural", 1)], projection={"published_at": 1})
+        if oldest is not None and oldest.get("published_at", 0) > since:
+            logger.warning("Invalidation history does not cover the downtime, invalidating all caches")
+            return await self.invalidate_all()
+
+        replayed = 0
+        async for message in self.collection.find({"published_at": {"$gte": since}}):
+            await self._dispatch(message, record_lag=False)
+            replayed += 1
+        return replayed
+
+    async def invalidate_all(self) -> int:
+        """
+        Invalidate everything cached by every subscriber in this process.
+
+        Each subscriber gets its bare prefix; nothing is published to other processes.
+
+        Returns:
+            int: Number of subscribers invalidated
+        """
+        for prefix in {prefix for prefix, _ in self.subscribers}:
+            await self._dispatch({"key": prefix}, record_lag=False)
+        return len(self.subscribers)
+
+    async def _dispatch(self, message: dict, record_lag: bool = True):
+        """Run the callbacks subscribed to a message's key."""
+        if message.get("origin") == self.origin:
+            return
+        key = message.get("key", "")
+        for prefix, callback in self.subscribers:
+            if not key.startswith(prefix):
+                continue
+            try:
+                result = callback(key)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error("Cache invalidation callback failed", key=key, error=str(e))
+        if record_lag:
+            self.lag.observe((time.time() - message.get("published_at", time.time())) * 1000)
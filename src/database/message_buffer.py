@@ -0,0 +1,222 @@
+"""In-memory buffer of recently ingested messages per chat."""
+
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+from structlog import get_logger
+
+log = get_logger(__name__)
+
+# Slim records kept per chat; older records fall off the ring
+MAX_MESSAGES_PER_CHAT = 5000
+# Process-wide caps; idle chats are evicted, least recently active first, to stay below them
+MAX_TOTAL_MESSAGES = 200000
+MAX_TOTAL_TEXT_BYTES = 64 * 1024 * 1024
+MAX_CHATS = 2000
+
+# from_user fields kept in slim records
+USER_FIELDS = ("id", "first_name", "last_name", "username", "is_bot")
+# Media types readers only check for presence of; stored as True
+MEDIA_FIELDS = ("photo", "sticker", "video_note", "voice")
+# Forward and channel post markers copied as they are
+FORWARD_FIELDS = ("forwards", "views", "forward_from_message_id")
+
+
+class ChatBuffer:
+    """Ring of slim records for one chat and the moment from which it is complete."""
+
+    __slots__ = ("records", "covered_since", "text_bytes")
+
+    def __init__(self, covered_since: datetime):
+        self.records: Deque[Dict] = deque()
+        # Every message of the chat created at or after this moment is in the ring
+        self.covered_since = covered_since
+        self.text_bytes = 0
+
+
+class RecentMessageBuffer:
+    """
+    Keeps slim copies of the messages this process ingested, per chat.
+
+    The ingestion queue adds every message it accepts, so recent history can be read
+    without a database round trip. A chat's buffer only starts at the first message
+    seen by this process and loses its oldest records when it grows past
+    MAX_MESSAGES_PER_CHAT; readers get None for ranges it does not fully cover and
+    fall back to MessageRepository. Whole chats are evicted, least recently active
+    first, when the process-wide message, text size or chat count caps are exceeded.
+
+    Records have the shape of projected message documents: id, created_at, text,
+    caption, reply_to_message_id, a slim from_user, media presence and forward markers.
+    """
+
+    _instance = None
+
+    def __init__(self, max_messages_per_chat: int = MAX_MESSAGES_PER_CHAT, max_total_messages: int = MAX_TOTAL_MESSAGES, max_total_text_bytes: int = MAX_TOTAL_TEXT_BYTES, max_chats: int = MAX_CHATS):
+        self.max_messages_per_chat = max_messages_per_chat
+        self.max_total_messages = max_total_messages
+        self.max_total_text_bytes = max_total_text_bytes
+        self.max_chats = max_chats
+        # Least recently active chat first
+        self._chats: "OrderedDict[int, ChatBuffer]" = OrderedDict()
+        self._total_messages = 0
+        self._total_text_bytes = 0
+
+        # Read statistics
+        self._hits = 0
+        self._misses = 0
+        self._evicted_chats = 0
+
+    @classmethod
+    def get_instance(cls) -> "RecentMessageBuffer":
+        """Get the process-wide message buffer."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def to_record(document: Dict) -> Dict:
+        """
+        Build a slim record from a message document.
+
+        Args:
+            document: Message document as written by the spy logger
+
+        Returns:
+            Dict: Slim record
+        """
+        record = {"id": document.get("id"), "created_at": document.get("created_at")}
+        for field in ("text", "caption"):
+            if document.get(field):
+                record[field] = document[field]
+
+        reply_to = document.get("reply_to_message_id") or (document.get("reply_to_message") or {}).get("id")
+        if reply_to is not None:
+            record["reply_to_message_id"] = reply_to
+
+        user = document.get("from_user")
+        if isinstance(user, dict):
+            record["from_user"] = {field: user[field] for field in USER_FIELDS if user.get(field) is not None}
+
+        for field in MEDIA_FIELDS:
+            if field in document:
+                record[field] = True
+        for field in FORWARD_FIELDS:
+            if field in document:
+                record[field] = document[field]
+        return record
+
+    @staticmethod
+    def _text_size(record: Dict) -> int:
+        # UTF-8 bytes, not characters: most buffered text is Cyrillic, two bytes per letter
+        return len(record.get("text", "").encode("utf-8")) + len(record.get("caption", "").encode("utf-8"))
+
+    def add(self, document: Dict):
+        """
+        Add an ingested message document.
+
+        Args:
+            document: Message document with chat.id and created_at
+        """
+        chat = document.get("chat")
+        created_at = document.get("created_at")
+        if not isinstance(chat, dict) or chat.get("id") is None or created_at is None:
+            return
+
+        record = self.to_record(document)
+        size = self._text_size(record)
+        buffer = self._chats.get(chat["id"])
+        if buffer is None:
+            buffer = self._chats[chat["id"]] = ChatBuffer(created_at)
+        self._chats.move_to_end(chat["id"])
+
+        buffer.records.append(record)
+        buffer.text_bytes += size
+        self._total_messages += 1
+        self._total_text_bytes += size
+
+        while len(buffer.records) > self.max_messages_per_chat:
+            self._drop_oldest(buffer)
+        self._enforce_caps(chat["id"])
+
+    def _drop_oldest(self, buffer: ChatBuffer):
+        """Drop a chat's oldest record; the buffer is then complete from the next one on."""
+        dropped = buffer.records.popleft()
+        size = self._text_size(dropped)
+        buffer.text_bytes -= size
+        self._total_messages -= 1
+        self._total_text_bytes -= size
+        buffer.covered_since = buffer.records[0]["created_at"] if buffer.records else dropped["created_at"]
+
+    def _enforce_caps(self, active_chat_id: int):
+        """Evict idle chats until the process-wide caps hold, trimming the active chat as a last resort."""
+        while len(self._chats) > self.max_chats or self._total_messages > self.max_total_messages or self._total_text_bytes > self.max_total_text_bytes:
+            chat_id = next(iter(self._chats))
+            if chat_id == active_chat_id:
+                # Only the chat being written to is left
+                self._drop_oldest(self._chats[chat_id])
+                continue
+            self.evict(chat_id)
+
+    def evict(self, chat_id: int):
+        """
+        Forget a chat's buffered messages.
+
+        Args:
+            chat_id: The chat ID
+        """
+        buffer = self._chats.pop(chat_id, None)
+        if buffer is None:
+            return
+        self._total_messages -= len(buffer.records)
+        self._total_text_bytes -= buffer.text_bytes
+        self._evicted_chats += 1
+
+    def get_messages_by_date_range(self, start_date: datetime, end_date: datetime, chat_id: int, exclude_commands: bool = True, exclude_bots: bool = True) -> Optional[List[Dict]]:
+        """
+        Get buffered messages of a chat within a date range, oldest first.
+
+        Applies the same filters as MessageRepository.iter_messages_by_date_range.
+
+        Args:
+            start_date: Start date (inclusive), timezone aware
+            end_date: End date (exclusive), timezone aware
+            chat_id: Chat ID to filter by
+            exclude_commands: Whether to exclude command messages
+            exclude_bots: Whether to exclude bot messages
+
+        Returns:
+            Optional[List[Dict]]: Slim records, or None if the buffer does not cover the whole range
+        """
+        buffer = self._chats.get(chat_id)
+        if buffer is None or start_date < buffer.covered_since:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        messages = []
+        for record in buffer.records:
+            if not start_date <= record["created_at"] < end_date:
+                continue
+            if exclude_commands and not ((record.get("text") and not record["text"].startswith("/")) or record.get("caption")):
+                continue
+            if exclude_bots and record.get("from_user", {}).get("is_bot"):
+                continue
+            messages.append(record)
+        return messages
+
+    def get_stats(self) -> Dict:
+        """
+        Get buffer size and read statistics.
+
+        Returns:
+            Dictionary with chat and message counts, buffered text size and hit/miss counters
+        """
+        return {
+            "chats": len(self._chats),
+            "messages": self._total_messages,
+            "text_bytes": self._total_text_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evicted_chats": self._evicted_chats,
+        }
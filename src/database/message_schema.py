@@ -0,0 +1,93 @@
+"""Slim canonical shape of stored messages, with the full original kept compressed."""
+
+from typing import Any, Dict, Optional
+
+import bson
+import zstandard
+
+# Bumped when the slim shape changes; stored as "schema" on every slim document
+SCHEMA_VERSION = 1
+# Fast level: messages are compressed on the ingestion path
+RAW_COMPRESSION_LEVEL = 3
+
+# Top-level fields kept as they are
+SCALAR_FIELDS = ("id", "date", "text", "caption", "media", "service", "reply_to_message_id", "forward_from_message_id", "forwards", "views", "sentiment", "created_at")
+# Nested objects reduced to the fields readers use
+NESTED_FIELDS = {
+    "chat": ("id", "type", "title", "username", "first_name"),
+    "from_user": ("id", "is_bot", "first_name", "last_name", "username"),
+    "forward_from_chat": ("id",),
+}
+# Media readers only check for; reduced to their file_unique_id
+MEDIA_FIELDS = ("photo", "sticker", "video_note", "voice", "video", "animation", "audio", "document")
+
+_compressor = zstandard.ZstdCompressor(level=RAW_COMPRESSION_LEVEL)
+_decompressor = zstandard.ZstdDecompressor()
+
+
+def _pick(document: Any, fields) -> Dict:
+    if not isinstance(document, dict):
+        return {}
+    return {field: document[field] for field in fields if document.get(field) is not None}
+
+
+def slim_document(document: Dict) -> Dict:
+    """
+    Reduce a full spy document to the canonical slim shape.
+
+    Field paths are those of the full document, so queries, indexes and projections
+    work on both shapes. The full document is kept zstd-compressed under "raw".
+
+    Args:
+        document: Full message document from the serializer
+
+    Returns:
+        Dict: Slim document
+    """
+    slim = {"schema": SCHEMA_VERSION}
+    slim.update(_pick(document, SCALAR_FIELDS))
+    for field, subfields in NESTED_FIELDS.items():
+        if value := _pick(document.get(field), subfields):
+            slim[field] = value
+    for field in MEDIA_FIELDS:
+        if field in document:
+            slim[field] = _pick(document[field], ("file_unique_id",))
+
+    # Legacy flat fields, in case a document still carries them
+    if document.get("chat_id") is not None and "id" not in slim.get("chat", {}):
+        slim.setdefault("chat", {})["id"] = document["chat_id"]
+    for legacy, field in (("user_id", "id"), ("username", "username")):
+        if document.get(legacy) is not None and field not in slim.get("from_user", {}):
+            slim.setdefault("from_user", {})[field] = document[legacy]
+
+    reply = document.get("reply_to_message")
+    if isinstance(reply, dict):
+        slim["reply_to_message"] = _pick(reply, ("id",))
+        if user := _pick(reply.get("from_user"), ("id", "is_bot")):
+            slim["reply_to_message"]["from_user"] = user
+
+    original = {key: value for key, value in document.items() if key not in ("_id", "created_at")}
+    slim["raw"] = _compressor.compress(bson.encode(original))
+    return slim
+
+
+def decode_raw(document: Dict) -> Optional[Dict]:
+    """
+    Get the full original of a stored message.
+
+    Args:
+        document: Stored message document; must include "raw" for slim documents
+
+    Returns:
+        Optional[Dict]: The full document, the document itself for messages stored
+        before the slim shape, or None when "raw" was projected out
+    """
+    if "schema" not in document:
+        return document
+    raw = document.get("raw")
+    if raw is None:
+        return None
+    original = bson.decode(_decompressor.decompress(raw))
+    if "created_at" in document:
+        original["created_at"] = document["created_at"]
+    return original
@@ -0,0 +1,240 @@
+"""Background data migrations for the messages collection."""
+
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional
+
+import structlog
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from src.database.message_schema import slim_document
+from src.database.repository.message_repository import MessageRepository
+
+logger = structlog.get_logger(__name__)
+
+BATCH_SIZE = 1000
+# Pause between batches so the migration does not starve live traffic
+BATCH_PAUSE_SECONDS = 0.5
+# How often the slim migration checks whether the legacy shape migration has completed
+LEGACY_WAIT_SECONDS = 60
+
+
+class LegacyMessageShapeMigration:
+    """
+    Rewrites messages stored in the legacy flat shape (chat_id, user_id, username)
+    into the pyrogram shape (chat.id, from_user.id, from_user.username).
+
+    Progress is checkpointed after every batch in the migrations collection, so an
+    interrupted run resumes where it stopped. Documents the server refuses to update
+    are skipped and their _ids recorded under failed_ids in the checkpoint, so one bad
+    document cannot stall the run. Once every legacy document was visited the
+    migration is marked complete and MessageRepository stops issuing fallback queries.
+    """
+
+    MIGRATION_ID = "messages_legacy_shape"
+    LEGACY_FILTER = {"$or": [{"chat_id": {"$exists": True}}, {"user_id": {"$exists": True}}]}
+
+    def __init__(self, db, batch_size: int = BATCH_SIZE, batch_pause: float = BATCH_PAUSE_SECONDS):
+        self.db = db["nexus"]
+        self.messages = self.db["messages"]
+        self.migrations = self.db["migrations"]
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self._task: Optional[asyncio.Task] = None
+
+    async def get_state(self) -> Dict:
+        """Get the stored checkpoint for this migration."""
+        state = await self.migrations.find_one({"_id": self.MIGRATION_ID})
+        return state or {"_id": self.MIGRATION_ID, "last_id": None, "migrated": 0, "completed": False}
+
+    async def start(self):
+        """
+        Apply a stored completion flag and start migrating in the background if needed.
+        Should be called once after the database connection is established.
+        """
+        state = await self.get_state()
+        if state.get("completed"):
+            MessageRepository.legacy_shape_migrated = True
+            return
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Cancel a running migration; it resumes from the last checkpoint next time."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    @staticmethod
+    def convert(doc: Dict) -> Dict:
+        """
+        Build the update that moves a legacy document into the pyrogram shape.
+
+        Args:
+            doc: Legacy message document
+
+        Returns:
+            Update document with $set and $unset stages
+        """
+        chat_fields, user_fields = {}, {}
+        chat = doc.get("chat") if isinstance(doc.get("chat"), dict) else {}
+        from_user = doc.get("from_user") if isinstance(doc.get("from_user"), dict) else {}
+
+        if "chat_id" in doc and "id" not in chat:
+            chat_fields["id"] = doc["chat_id"]
+        if "user_id" in doc and "id" not in from_user:
+            user_fields["id"] = doc["user_id"]
+        if doc.get("username") and "username" not in from_user:
+            user_fields["username"] = doc["username"]
+
+        set_fields = {}
+        for name, fields in (("chat", chat_fields), ("from_user", user_fields)):
+            if not fields:
+                continue
+            if name in doc and not isinstance(doc[name], dict):
+                # Dotted paths cannot be set below null or a scalar, so replace the whole value
+                set_fields[name] = fields
+            else:
+                set_fields.update({f"{name}.{field}": value for field, value in fields.items()})
+
+        update = {"$unset": {"chat_id": "", "user_id": "", "username": ""}}
+        if set_fields:
+            update["$set"] = set_fields
+        return update
+
+    async def run(self):
+        """Migrate legacy documents batch by batch, checkpointing after each batch."""
+        state = await self.get_state()
+        last_id = state.get("last_id")
+        migrated = state.get("migrated", 0)
+        logger.info("Starting legacy message migration", resume_from=str(last_id) if last_id else None, migrated=migrated)
+
+        try:
+            while True:
+                query = dict(self.LEGACY_FILTER)
+                if last_id is not None:
+                    query = {"$and": [self.LEGACY_FILTER, {"_id": {"$gt": last_id}}]}
+
+                # Whole chat/from_user values, so convert() can tell null or scalar values from missing ones
+                cursor = self.messages.find(query, {"chat_id": 1, "user_id": 1, "username": 1, "chat": 1, "from_user": 1}).sort("_id", 1).limit(self.batch_size)
+                batch = await cursor.to_list(length=self.batch_size)
+                if not batch:
+                    break
+
+                failed_ids = []
+                try:
+                    result = await self.messages.bulk_write([UpdateOne({"_id": doc["_id"]}, self.convert(doc)) for doc in batch], ordered=False)
+                    migrated += result.modified_count
+                except BulkWriteError as e:
+                    # Unordered, so every other document of the batch was still written
+                    migrated += e.details.get("nModified", 0)
+                    failed_ids = [batch[error["index"]]["_id"] for error in e.details.get("writeErrors", [])]
+                    logger.error("Some legacy messages could not be migrated", failed=len(failed_ids), first_error=e.details.get("writeErrors", [{}])[0].get("errmsg"))
+                last_id = batch[-1]["_id"]
+
+                checkpoint = {"$set": {"last_id": last_id, "migrated": migrated, "updated_at": datetime.utcnow()}}
+                if failed_ids:
+                    checkpoint["$push"] = {"failed_ids": {"$each": failed_ids}}
+                await self.migrations.update_one({"_id": self.MIGRATION_ID}, checkpoint, upsert=True)
+                logger.info("Migrated legacy message batch", batch_size=len(batch), migrated=migrated, failed=len(failed_ids))
+
+                await asyncio.sleep(self.batch_pause)
+
+            await self.migrations.update_one({"_id": self.MIGRATION_ID}, {"$set": {"completed": True, "completed_at": datetime.utcnow(), "migrated": migrated}}, upsert=True)
+            MessageRepository.legacy_shape_migrated = True
+            logger.info("Legacy message migration completed", migrated=migrated)
+        except asyncio.CancelledError:
+            logger.info("Legacy message migration interrupted", migrated=migrated)
+            raise
+        except Exception as e:
+            logger.error("Legacy message migration failed", error=str(e), migrated=migrated)
+
+
+class SlimMessageMigration:
+    """
+    Rewrites full pyrogram message documents into the slim canonical shape, keeping
+    the original zstd-compressed under "raw" (see src.database.message_schema).
+
+    Works like LegacyMessageShapeMigration: batches in _id order, a checkpoint in the
+    migrations collection after every batch and a pause between batches. It only
+    starts once the legacy shape migration has completed, so no document is slimmed
+    before its chat and user IDs are in place.
+    """
+
+    MIGRATION_ID = "messages_slim_schema"
+    # Documents still in the legacy shape are left to LegacyMessageShapeMigration
+    FULL_FILTER = {"_": "Message", "schema": {"$exists": False}, "chat_id": {"$exists": False}, "user_id": {"$exists": False}}
+
+    def __init__(self, db, batch_size: int = BATCH_SIZE, batch_pause: float = BATCH_PAUSE_SECONDS):
+        self.db = db["nexus"]
+        self.messages = self.db["messages"]
+        self.migrations = self.db["migrations"]
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self._task: Optional[asyncio.Task] = None
+
+    async def get_state(self) -> Dict:
+        """Get the stored checkpoint for this migration."""
+        state = await self.migrations.find_one({"_id": self.MIGRATION_ID})
+        return state or {"_id": self.MIGRATION_ID, "last_id": None, "migrated": 0, "completed": False}
+
+    async def start(self):
+        """Start migrating in the background unless the migration already completed."""
+        state = await self.get_state()
+        if state.get("completed"):
+            return
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Cancel a running migration; it resumes from the last checkpoint next time."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self):
+        """Slim full documents batch by batch, checkpointing after each batch."""
+        while not await self.migrations.find_one({"_id": LegacyMessageShapeMigration.MIGRATION_ID, "completed": True}, {"_id": 1}):
+            await asyncio.sleep(LEGACY_WAIT_SECONDS)
+
+        state = await self.get_state()
+        last_id = state.get("last_id")
+        migrated = state.get("migrated", 0)
+        logger.info("Starting slim message migration", resume_from=str(last_id) if last_id else None, migrated=migrated)
+
+        try:
+            while True:
+                query = dict(self.FULL_FILTER)
+                if last_id is not None:
+                    query["_id"] = {"$gt": last_id}
+
+                cursor = self.messages.find(query).sort("_id", 1).limit(self.batch_size)
+                batch = await cursor.to_list(length=self.batch_size)
+                if not batch:
+                    break
+
+                result = await self.messages.bulk_write([ReplaceOne({"_id": doc["_id"]}, slim_document(doc)) for doc in batch], ordered=False)
+                last_id = batch[-1]["_id"]
+                migrated += result.modified_count
+
+                await self.migrations.update_one({"_id": self.MIGRATION_ID}, {"$set": {"last_id": last_id, "migrated": migrated, "updated_at": datetime.utcnow()}}, upsert=True)
+                logger.info("Migrated slim message batch", batch_size=len(batch), migrated=migrated)
+
+                await asyncio.sleep(self.batch_pause)
+
+            await self.migrations.update_one({"_id": self.MIGRATION_ID}, {"$set": {"completed": True, "completed_at": datetime.utcnow(), "migrated": migrated}}, upsert=True)
+            logger.info("Slim message migration completed", migrated=migrated)
+        except asyncio.CancelledError:
+            logger.info("Slim message migration interrupted", migrated=migrated)
+            raise
+        except Exception as e:
+            logger.error("Slim message migration failed", error=str(e), migrated=migrated)
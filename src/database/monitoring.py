@@ -0,0 +1,220 @@
+"""MongoDB command monitoring: latency histograms per collection and command, slow query log."""
+
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import bson
+import structlog
+from pymongo import monitoring
+
+from src.utils.metrics import Histogram
+
+logger = structlog.get_logger(__name__)
+
+# Commands slower than this are reported to the slow log
+SLOW_COMMAND_THRESHOLD_MS = 100.0
+# At most one slow log line per (collection, command, caller) in this many seconds
+SLOW_LOG_INTERVAL_SECONDS = 10.0
+# Commands that carry no collection name in their first field
+_COLLECTION_FIELDS = {"getMore": "collection"}
+# Handshake and housekeeping commands that are not interesting
+_IGNORED_COMMANDS = frozenset({"hello", "isMaster", "ismaster", "ping", "saslStart", "saslContinue", "buildInfo", "endSessions", "killCursors"})
+
+# Repository method currently issuing commands; Motor carries the context into its worker threads
+current_operation: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_operation", default=None)
+
+
+def monitored_repository(cls):
+    """
+    Class decorator naming the repository method behind every command it issues.
+
+    Each public coroutine method is wrapped to set current_operation to
+    "ClassName.method" while it runs, and each async generator method while it
+    fetches the next item, which the command monitor attaches to its slow log entries.
+    """
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        if inspect.iscoroutinefunction(method):
+            setattr(cls, name, _with_operation(f"{cls.__name__}.{name}", method))
+        elif inspect.isasyncgenfunction(method):
+            setattr(cls, name, _with_operation_iter(f"{cls.__name__}.{name}", method))
+    return cls
+
+
+def _with_operation(operation: str, method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = current_operation.set(operation)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            current_operation.reset(token)
+
+    return wrapper
+
+
+def _with_operation_iter(operation: str, method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        iterator = method(*args, **kwargs)
+        try:
+            while True:
+                token = current_operation.set(operation)
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    current_operation.reset(token)
+                yield item
+        finally:
+            await iterator.aclose()
+
+    return wrapper
+
+
+class _CommandStats:
+    """Counters for one (collection, command) pair."""
+
+    __slots__ = ("latency", "failures", "documents", "request_bytes", "reply_bytes")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.failures = 0
+        self.documents = 0
+        self.request_bytes = 0
+        self.reply_bytes = 0
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """
+    Command listener recording latency histograms, document counts and payload sizes
+    per collection and command.
+
+    The driver does not report payload sizes, so measuring them means encoding every
+    command and reply again; it is off unless measure_payloads is set
+    (METRICS_MONGO_PAYLOAD_SIZES=true), and the byte counters stay at 0 otherwise.
+
+    Events arrive on the driver's threads, so all bookkeeping is guarded by a lock.
+    Commands slower than the threshold are logged with the repository method that
+    issued them, at most once per SLOW_LOG_INTERVAL_SECONDS for the same call site.
+    """
+
+    _instance = None
+
+    def __init__(self, slow_threshold_ms: float = SLOW_COMMAND_THRESHOLD_MS, measure_payloads: bool = False):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.measure_payloads = measure_payloads
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _CommandStats] = {}
+        # (connection, request id) -> (collection, request size, caller)
+        self._pending: Dict[Tuple, Tuple[str, int, Optional[str]]] = {}
+        # Slow log call site -> (last logged at, suppressed since)
+        self._slow_log: Dict[Tuple[str, str, str], Tuple[float, int]] = {}
+
+    @classmethod
+    def get_instance(cls) -> "CommandMonitor":
+        """Get the process-wide command monitor."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name in _IGNORED_COMMANDS:
+            return
+        field = _COLLECTION_FIELDS.get(event.command_name, event.command_name)
+        collection = event.command.get(field)
+        if not isinstance(collection, str):
+            collection = event.database_name
+        request_bytes = len(bson.encode(event.command)) if self.measure_payloads else 0
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (collection, request_bytes, current_operation.get())
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event, event.reply)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, None)
+
+    def _finish(self, event, reply: Optional[dict]):
+        if event.command_name in _IGNORED_COMMANDS:
+            return
+        duration_ms = event.duration_micros / 1000
+        documents = _count_documents(reply) if reply is not None else 0
+        reply_bytes = len(bson.encode(reply)) if reply is not None and self.measure_payloads else 0
+
+        with self._lock:
+            collection, request_bytes, caller = self._pending.pop((event.connection_id, event.request_id), (event.database_name, 0, None))
+            stats = self._stats.get((collection, event.command_name))
+            if stats is None:
+                stats = self._stats[(collection, event.command_name)] = _CommandStats()
+            stats.latency.observe(duration_ms)
+            stats.documents += documents
+            stats.request_bytes += request_bytes
+            stats.reply_bytes += reply_bytes
+            if reply is None:
+                stats.failures += 1
+
+            suppressed = self._should_log_slow(collection, event.command_name, caller or "unknown", duration_ms)
+
+        if suppressed is not None:
+            logger.warning("Slow MongoDB command", collection=collection, command=event.command_name, duration_ms=round(duration_ms, 1), caller=caller or "unknown", documents=documents, suppressed=suppressed)
+
+    def _should_log_slow(self, collection: str, command: str, caller: str, duration_ms: float) -> Optional[int]:
+        """Decide whether a command goes to the slow log; returns how many were suppressed before it."""
+        if duration_ms < self.slow_threshold_ms:
+            return None
+        key = (collection, command, caller)
+        now = time.monotonic()
+        last_logged, suppressed = self._slow_log.get(key, (0.0, 0))
+        if now - last_logged < SLOW_LOG_INTERVAL_SECONDS:
+            self._slow_log[key] = (last_logged, suppressed + 1)
+            return None
+        self._slow_log[key] = (now, 0)
+        return suppressed
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """
+        Get latency and volume statistics per collection and command.
+
+        Returns:
+            Dict[str, Dict]: "collection.command" -> latency percentiles (ms), failures,
+            documents and payload bytes, slowest total time first
+        """
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1].latency.total, reverse=True)
+            return {f"{collection}.{command}": {**stats.latency.snapshot(), "total_ms": round(stats.latency.total, 1), "failures": stats.failures, "documents": stats.documents, "request_bytes": stats.request_bytes, "reply_bytes": stats.reply_bytes} for (collection, command), stats in items}
+
+    def get_histograms(self) -> Dict[Tuple[str, str], Histogram]:
+        """Get a copy of the raw latency histograms keyed by (collection, command)."""
+        with self._lock:
+            histograms = {}
+            for key, stats in self._stats.items():
+                histogram = Histogram(stats.latency.buckets)
+                histogram.counts = list(stats.latency.counts)
+                histogram.count, histogram.total, histogram.max = stats.latency.count, stats.latency.total, stats.latency.max
+                histograms[key] = histogram
+            return histograms
+
+    def reset(self):
+        """Drop all collected statistics."""
+        with self._lock:
+            self._stats.clear()
+            self._slow_log.clear()
+
+
+def _count_documents(reply: dict) -> int:
+    """Count the documents a command returned or affected."""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or ())
+    if "n" in reply:
+        return reply["n"]
+    if "value" in reply:
+        return 1 if reply["value"] is not None else 0
+    return 0
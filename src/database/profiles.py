@@ -0,0 +1,98 @@
+"""Connection profiles for the MongoDB client."""
+
+import importlib.util
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Python module each wire compressor needs; zlib ships with Python
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+@dataclass(frozen=True)
+class ConnectionProfile:
+    """Pool, compression and timeout settings passed to AsyncIOMotorClient."""
+
+    max_pool_size: int = 100
+    min_pool_size: int = 0
+    max_idle_time_ms: Optional[int] = None
+    # Tried in order; compressors whose module is not installed are skipped
+    compressors: Tuple[str, ...] = ()
+    server_selection_timeout_ms: int = 30000
+    connect_timeout_ms: int = 20000
+    socket_timeout_ms: Optional[int] = None
+
+    def available_compressors(self) -> Tuple[str, ...]:
+        """Get the configured compressors that can actually be used in this environment."""
+        return tuple(name for name in self.compressors if importlib.util.find_spec(COMPRESSOR_MODULES.get(name, name)) is not None)
+
+    def client_options(self) -> Dict[str, Any]:
+        """
+        Build keyword arguments for AsyncIOMotorClient.
+
+        Returns:
+            Dict[str, Any]: Client options
+        """
+        options = {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+        }
+        if self.max_idle_time_ms is not None:
+            options["maxIdleTimeMS"] = self.max_idle_time_ms
+        if self.socket_timeout_ms is not None:
+            options["socketTimeoutMS"] = self.socket_timeout_ms
+
+        compressors = self.available_compressors()
+        if compressors:
+            options["compressors"] = ",".join(compressors)
+        if len(compressors) < len(self.compressors):
+            logger.warning("Some MongoDB compressors are unavailable", configured=self.compressors, available=compressors)
+        return options
+
+
+PROFILES: Dict[str, ConnectionProfile] = {
+    # Driver defaults, kept for comparison
+    "default": ConnectionProfile(),
+    # Long-running bot: warm pool, compressed traffic, fail fast when the server is gone.
+    # No socket timeout: the same client runs the startup migrations and the chat registry
+    # backfill, whose reads can legitimately take longer; bound single operations with maxTimeMS.
+    "bot": ConnectionProfile(
+        max_pool_size=50,
+        min_pool_size=5,
+        max_idle_time_ms=300000,
+        compressors=("zstd", "snappy", "zlib"),
+        server_selection_timeout_ms=5000,
+        connect_timeout_ms=5000,
+    ),
+    # Bulk jobs (migrations, backfills): larger pool, cheap compression, patient timeouts
+    "batch": ConnectionProfile(
+        max_pool_size=100,
+        min_pool_size=0,
+        compressors=("snappy", "zlib"),
+        server_selection_timeout_ms=30000,
+        connect_timeout_ms=20000,
+        socket_timeout_ms=120000,
+    ),
+}
+
+
+def get_profile(name: str) -> ConnectionProfile:
+    """
+    Get a connection profile by name, falling back to the bot profile.
+
+    Args:
+        name: Profile name (MONGO_PROFILE)
+
+    Returns:
+        ConnectionProfile: The profile
+    """
+    profile = PROFILES.get(name)
+    if profile is None:
+        logger.warning("Unknown MongoDB connection profile, using bot profile", profile=name)
+        profile = PROFILES["bot"]
+    return profile
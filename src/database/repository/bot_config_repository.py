@@ -1,29 +1,132 @@
+import asyncio
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 import structlog
+from pymongo.errors import OperationFailure, PyMongoError
+
+from src.database.client import DatabaseClient
+from src.database.indexes import IndexRegistry
+from src.database.invalidation import InvalidationBus
+from src.database.monitoring import monitored_repository
 
 # Get the shared logger instance
 logger = structlog.get_logger()
 
+# How often the configs are reloaded when change streams are not available
+POLL_INTERVAL_SECONDS = 30
+# Retry delay after a change stream breaks for reasons other than being unsupported
+WATCH_RETRY_SECONDS = 5
+# Invalidation bus key prefix; followed by the config ID
+INVALIDATION_PREFIX = "bot_config:"
+
 
+@monitored_repository
 class BotConfigRepository:
-    """Repository for handling global bot configuration."""
+    """
+    Repository for handling global bot configuration.
+
+    All configurations are loaded into a process-wide cache at startup and served from
+    memory afterwards. Edits made by other bot processes arrive over the invalidation
+    bus; edits made outside the bot are picked up through a change stream on the
+    collection, or by polling when the server does not support change streams
+    (standalone mongod).
+    """
+
+    # Class-level cache shared by every repository instance in the process
+    _config_cache: Dict[str, Dict] = {}
+    _loaded = False
+    _watcher: Optional[asyncio.Task] = None
 
     def __init__(self, db_client):
         self.db = db_client.db
         self.collection = self.db["bot_config"]
-        # In-memory cache of configurations
-        self._config_cache = {}
 
     async def initialize(self):
         """
-        Initialize the bot configuration if it doesn't exist.
+        Load all configurations and start watching for external edits.
         This should be called once during application startup.
         """
         # No default configurations are created here
         # Plugins will register their own configurations
-        logger.info("Bot configuration repository initialized")
+        await self.load_all()
+        if BotConfigRepository._watcher is None or BotConfigRepository._watcher.done():
+            BotConfigRepository._watcher = asyncio.create_task(self._watch())
+        logger.info("Bot configuration repository initialized", configs=len(self._config_cache))
+
+    async def load_all(self):
+        """Replace the cache with every configuration stored in the database."""
+        configs = await self.collection.find({}).to_list(length=None)
+        BotConfigRepository._config_cache = {config["config_id"]: config for config in configs if "config_id" in config}
+        BotConfigRepository._loaded = True
+
+    @classmethod
+    async def stop_watching(cls):
+        """Stop following external configuration edits."""
+        if cls._watcher is not None and not cls._watcher.done():
+            cls._watcher.cancel()
+            try:
+                await cls._watcher
+            except asyncio.CancelledError:
+                pass
+
+    async def _watch(self):
+        """Apply external edits from a change stream, falling back to polling."""
+        while True:
+            try:
+                async with self.collection.watch(full_document="updateLookup") as stream:
+                    logger.info("Watching bot configuration for changes")
+                    async for change in stream:
+                        self._apply_change(change)
+            except OperationFailure as e:
+                # Change streams need a replica set or sharded cluster
+                logger.info("Change streams unavailable, polling bot configuration", error=str(e), interval=POLL_INTERVAL_SECONDS)
+                await self._poll()
+                return
+            except PyMongoError as e:
+                logger.warning("Bot configuration change stream interrupted", error=str(e))
+                await asyncio.sleep(WATCH_RETRY_SECONDS)
+                # Resync in case changes were missed while the stream was down
+                await self._reload()
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+            await self._reload()
+
+    async def _reload(self):
+        try:
+            await self.load_all()
+        except Exception as e:
+            logger.error("Failed to reload bot configuration", error=str(e))
+
+    @classmethod
+    async def _on_invalidation(cls, key: str):
+        """Reload a config another process changed."""
+        config_id = key[len(INVALIDATION_PREFIX) :]
+        repository = cls(DatabaseClient.get_instance())
+        if not config_id:
+            await repository.load_all()
+            return
+        config = await repository.collection.find_one({"config_id": config_id})
+        if config:
+            cls._config_cache[config_id] = config
+        else:
+            cls._config_cache.pop(config_id, None)
+
+    def _apply_change(self, change: Dict):
+        """Update the cache from a change stream event."""
+        operation = change.get("operationType")
+        document = change.get("fullDocument")
+        if operation in ("insert", "update", "replace") and document and "config_id" in document:
+            self._config_cache[document["config_id"]] = document
+            logger.info("Bot configuration changed", config_id=document["config_id"], operation=operation)
+        elif operation == "delete":
+            document_id = change.get("documentKey", {}).get("_id")
+            for config_id, config in list(self._config_cache.items()):
+                if config.get("_id") == document_id:
+                    del self._config_cache[config_id]
+                    logger.info("Bot configuration deleted", config_id=config_id)
 
     @staticmethod
     def _read_file_content(file_path: str) -> str:
@@ -48,6 +151,12 @@ class BotConfigRepository:
         if config_id in self._config_cache:
             return self._config_cache[config_id]
 
+        if self._loaded:
+            # Everything stored is already cached, so the config does not exist
+            config = {"config_id": config_id}
+            self._config_cache[config_id] = config
+            return config
+
         # Check database
         config = await self.collection.find_one({"config_id": config_id})
 
@@ -69,8 +178,9 @@ class BotConfigRepository:
         if config_id in self._config_cache:
             self._config_cache[config_id].update(updates)
         else:
-            await self.get_config(config_id)  # This will cache the config
+            self._config_cache[config_id] = await self.collection.find_one({"config_id": config_id})
 
+        await InvalidationBus.get_instance().publish(f"{INVALIDATION_PREFIX}{config_id}")
         return self._config_cache[config_id]
 
     def invalidate_cache(self, config_id: str = None):
@@ -107,6 +217,7 @@ class BotConfigRepository:
 
             # Cache the config
             self._config_cache[plugin_id] = config
+            await InvalidationBus.get_instance().publish(f"{INVALIDATION_PREFIX}{plugin_id}")
 
         return config
 
@@ -139,6 +250,9 @@ class BotConfigRepository:
         """
         Get a specific value from a plugin's configuration.
 
+        When a default is given, the stored value is converted to the default's type
+        (e.g. a temperature edited in as "0.7" is returned as 0.7).
+
         Args:
             plugin_id: Unique identifier for the plugin
             key: Configuration key to retrieve
@@ -148,7 +262,17 @@ class BotConfigRepository:
             The configuration value or default
         """
         config = await self.get_config(plugin_id)
-        return config.get(key, default)
+        value = config.get(key, default)
+        if default is None or value is None or isinstance(value, type(default)):
+            return value
+
+        try:
+            if isinstance(default, bool):
+                return str(value).lower() in ("true", "yes", "1", "on", "enable")
+            return type(default)(value)
+        except (TypeError, ValueError):
+            logger.error("Invalid bot configuration value type", config_id=plugin_id, key=key, value=value)
+            return default
 
     async def set_plugin_config_value(self, plugin_id: str, key: str, value: Any) -> Dict:
         """
@@ -178,8 +302,14 @@ class BotConfigRepository:
         # Keep only the config_id and update with defaults
         await self.collection.update_one({"config_id": plugin_id}, {"$set": default_config}, upsert=True)
 
-        # Invalidate cache for this config
-        self.invalidate_cache(plugin_id)
+        # Replace the cached config with the stored one
+        config = await self.collection.find_one({"config_id": plugin_id})
+        self._config_cache[plugin_id] = config
+        await InvalidationBus.get_instance().publish(f"{INVALIDATION_PREFIX}{plugin_id}")
+        return config
+
 
-        # Get and return the updated config
-        return await self.get_config(plugin_id)
+InvalidationBus.subscribe(INVALIDATION_PREFIX, BotConfigRepository._on_invalidation)
+
+IndexRegistry.register_index("bot_config", "config_id")
+IndexRegistry.register_query("bot_config", "get_config", {"config_id": "threads"})
@@ -0,0 +1,203 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+import pytz
+from pymongo import UpdateOne
+from structlog import get_logger
+
+from src.database.indexes import IndexRegistry
+from src.database.monitoring import monitored_repository
+
+log = get_logger(__name__)
+
+# Daily counters follow Moscow days, the same days the summaries cover
+COUNTER_TIMEZONE = pytz.timezone("Europe/Moscow")
+PRIVATE_CHAT_TYPE = "ChatType.PRIVATE"
+# How far back the one-time backfill counts messages
+BACKFILL_DAYS = 7
+
+
+@monitored_repository
+class ChatRepository:
+    """
+    Registry of every chat the bot has seen, maintained by message ingestion.
+
+    One document per chat holds its latest title, type and username, first_seen and
+    last_seen timestamps and a message counter per day ("message_counts.2025-01-31"),
+    so chat discovery and activity checks never have to scan the messages collection.
+    Counters include every logged message, commands and bots too, so they are an
+    upper bound for filtered counts.
+    """
+
+    # Migrations document recording that the registry was seeded from stored messages
+    BACKFILL_MIGRATION_ID = "chats_registry"
+
+    def __init__(self, db):
+        self.db = db["nexus"]
+        self.collection = self.db["chats"]
+        self.migrations = self.db["migrations"]
+
+    @staticmethod
+    def day_key(moment: datetime) -> str:
+        """
+        Get the counter key for the day a moment falls on.
+
+        Args:
+            moment: Timestamp; naive values are taken as UTC
+
+        Returns:
+            str: Day as YYYY-MM-DD in COUNTER_TIMEZONE
+        """
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.astimezone(COUNTER_TIMEZONE).strftime("%Y-%m-%d")
+
+    async def record_messages(self, messages: Iterable[Dict]) -> int:
+        """
+        Update the registry from a batch of logged message documents.
+
+        Each chat in the batch gets one upsert refreshing its metadata and
+        incrementing its daily counters.
+
+        Args:
+            messages: Message documents as written by the spy logger
+
+        Returns:
+            int: Number of chats updated
+        """
+        chats: Dict[int, Dict] = {}
+        for message in messages:
+            chat = message.get("chat")
+            created_at = message.get("created_at")
+            if not isinstance(chat, dict) or chat.get("id") is None or created_at is None:
+                continue
+
+            entry = chats.setdefault(chat["id"], {"set": {}, "counts": {}, "first_seen": created_at, "last_seen": created_at})
+            entry["set"].update({field: chat[field] for field in ("type", "username") if chat.get(field) is not None})
+            if title := chat.get("title") or chat.get("first_name"):
+                entry["set"]["title"] = title
+            entry["first_seen"] = min(entry["first_seen"], created_at)
+            entry["last_seen"] = max(entry["last_seen"], created_at)
+            day = self.day_key(created_at)
+            entry["counts"][day] = entry["counts"].get(day, 0) + 1
+
+        if not chats:
+            return 0
+
+        operations = [UpdateOne({"chat_id": chat_id}, self._build_update(entry["set"], entry["first_seen"], entry["last_seen"], entry["counts"]), upsert=True) for chat_id, entry in chats.items()]
+        await self.collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    @staticmethod
+    def _build_update(metadata: Dict, first_seen: datetime, last_seen: datetime, counts: Dict[str, int], absolute_counts: bool = False) -> Dict:
+        """
+        Build the upsert for one chat.
+
+        Counts are added with $inc, or raised to at least the given totals with $max
+        when they are absolute. $set is left out without metadata, as MongoDB rejects an empty one.
+        """
+        counters = {f"message_counts.{day}": count for day, count in counts.items()}
+        update = {"$max": {"last_seen": last_seen}, "$min": {"first_seen": first_seen}}
+        if absolute_counts:
+            update["$max"].update(counters)
+        else:
+            update["$inc"] = counters
+        if metadata:
+            update["$set"] = metadata
+        return update
+
+    async def get_chat(self, chat_id: int) -> Optional[Dict]:
+        """
+        Get a chat's registry entry.
+
+        Args:
+            chat_id: The chat ID
+
+        Returns:
+            Optional[Dict]: The registry document or None if the chat was never seen
+        """
+        return await self.collection.find_one({"chat_id": chat_id}, {"_id": 0})
+
+    async def get_active_chats(self, since: datetime, exclude_types: Iterable[str] = (PRIVATE_CHAT_TYPE,)) -> List[Dict]:
+        """
+        Get chats with messages logged since a point in time.
+
+        Args:
+            since: Only chats last seen at or after this moment
+            exclude_types: Chat types to leave out, private chats by default
+
+        Returns:
+            List[Dict]: Registry documents
+        """
+        cursor = self.collection.find({"last_seen": {"$gte": since}, "type": {"$nin": list(exclude_types)}}, {"_id": 0})
+        return await cursor.to_list(length=None)
+
+    async def get_message_count(self, chat_id: int, day: datetime) -> int:
+        """
+        Get the number of messages logged in a chat on a day.
+
+        Args:
+            chat_id: The chat ID
+            day: Any moment of the day
+
+        Returns:
+            int: Messages counted that day, 0 for unknown chats
+        """
+        key = self.day_key(day)
+        document = await self.collection.find_one({"chat_id": chat_id}, {"_id": 0, f"message_counts.{key}": 1})
+        return (document or {}).get("message_counts", {}).get(key, 0)
+
+    async def backfill_from_messages(self, days: int = BACKFILL_DAYS) -> int:
+        """
+        Seed the registry from recently stored messages.
+
+        Runs once, for chats that were active before ingestion started maintaining
+        the registry; completion is recorded in the migrations collection. Totals are
+        merged with $max, so counting alongside live ingestion never counts a message twice.
+
+        Args:
+            days: How many days of messages to count
+
+        Returns:
+            int: Number of chats seeded
+        """
+        if await self.migrations.find_one({"_id": self.BACKFILL_MIGRATION_ID}):
+            return 0
+
+        pipeline = [
+            {"$match": {"created_at": {"$gte": datetime.now(timezone.utc) - timedelta(days=days)}, "chat.id": {"$exists": True}}},
+            {"$sort": {"created_at": 1}},
+            {
+                "$group": {
+                    "_id": {"chat_id": "$chat.id", "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at", "timezone": COUNTER_TIMEZONE.zone}}},
+                    "count": {"$sum": 1},
+                    "first_seen": {"$first": "$created_at"},
+                    "last_seen": {"$last": "$created_at"},
+                    "title": {"$last": {"$ifNull": ["$chat.title", "$chat.first_name"]}},
+                    "type": {"$last": "$chat.type"},
+                    "username": {"$last": "$chat.username"},
+                }
+            },
+        ]
+
+        operations, chat_ids = [], set()
+        async for group in self.db["messages"].aggregate(pipeline, allowDiskUse=True):
+            metadata = {field: group[field] for field in ("title", "type", "username") if group.get(field) is not None}
+            update = self._build_update(metadata, group["first_seen"], group["last_seen"], {group["_id"]["day"]: group["count"]}, absolute_counts=True)
+            operations.append(UpdateOne({"chat_id": group["_id"]["chat_id"]}, update, upsert=True))
+            chat_ids.add(group["_id"]["chat_id"])
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+        chats = len(chat_ids)
+        await self.migrations.update_one({"_id": self.BACKFILL_MIGRATION_ID}, {"$set": {"completed_at": datetime.utcnow(), "chats": chats}}, upsert=True)
+        log.info("Seeded chat registry from stored messages", chats=chats, days=days)
+        return chats
+
+
+# One document per chat
+IndexRegistry.register_index("chats", "chat_id", unique=True)
+# Chat discovery for the daily summary
+IndexRegistry.register_index("chats", "last_seen")
+IndexRegistry.register_query("chats", "get_chat", {"chat_id": -1001})
+IndexRegistry.register_query("chats", "get_active_chats", {"last_seen": {"$gte": datetime(2025, 1, 1)}, "type": {"$nin": [PRIVATE_CHAT_TYPE]}})
@@ -0,0 +1,106 @@
+from datetime import datetime
+from typing import List, Optional
+
+import structlog
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+from src.database.client import DatabaseClient
+from src.database.indexes import IndexRegistry
+from src.database.monitoring import monitored_repository
+
+logger = structlog.get_logger()
+
+# Entitlement granted by /set_vip
+VIP_ENTITLEMENT = "vip"
+
+
+@monitored_repository
+class EntitlementsRepository:
+    """Repository for per-user entitlements such as VIP status."""
+
+    # Migrations document recording that VIP flags were moved out of peer_config
+    LEGACY_VIP_MIGRATION_ID = "vip_entitlements"
+
+    def __init__(self, db_client: DatabaseClient):
+        self.db = db_client.db
+        self.collection: AsyncIOMotorCollection = self.db["entitlements"]
+        self.migrations = self.db["migrations"]
+
+    async def get_user_ids(self, entitlement: str) -> List[int]:
+        """
+        Get every user holding an entitlement.
+
+        Args:
+            entitlement: The entitlement name
+
+        Returns:
+            List[int]: User IDs
+        """
+        cursor = self.collection.find({"entitlement": entitlement}, {"_id": 0, "user_id": 1})
+        return [document["user_id"] async for document in cursor]
+
+    async def has(self, user_id: int, entitlement: str) -> bool:
+        """
+        Check whether a user holds an entitlement.
+
+        Args:
+            user_id: The user ID
+            entitlement: The entitlement name
+
+        Returns:
+            bool: True if the entitlement is stored for the user
+        """
+        return await self.collection.find_one({"user_id": user_id, "entitlement": entitlement}, {"_id": 1}) is not None
+
+    async def grant(self, user_id: int, entitlement: str, granted_by: Optional[int] = None):
+        """
+        Grant an entitlement to a user; granting it twice is a no-op.
+
+        Args:
+            user_id: The user ID
+            entitlement: The entitlement name
+            granted_by: User ID of the developer granting it
+        """
+        await self.collection.update_one({"user_id": user_id, "entitlement": entitlement}, {"$setOnInsert": {"granted_at": datetime.utcnow(), "granted_by": granted_by}}, upsert=True)
+
+    async def revoke(self, user_id: int, entitlement: str):
+        """
+        Revoke an entitlement from a user.
+
+        Args:
+            user_id: The user ID
+            entitlement: The entitlement name
+        """
+        await self.collection.delete_one({"user_id": user_id, "entitlement": entitlement})
+
+    async def import_legacy_vips(self) -> int:
+        """
+        Move VIP flags stored in peer_config documents into the entitlements collection.
+
+        Runs once; completion is recorded in the migrations collection so later
+        startups skip the peer_config scan.
+
+        Returns:
+            int: Number of VIP entitlements imported
+        """
+        if await self.migrations.find_one({"_id": self.LEGACY_VIP_MIGRATION_ID}):
+            return 0
+
+        cursor = self.db["peer_config"].find({"is_vip": True}, {"_id": 0, "chat_id": 1})
+        operations = [UpdateOne({"user_id": document["chat_id"], "entitlement": VIP_ENTITLEMENT}, {"$setOnInsert": {"granted_at": datetime.utcnow(), "granted_by": None}}, upsert=True) async for document in cursor]
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+        await self.db["peer_config"].update_many({"is_vip": {"$exists": True}}, {"$unset": {"is_vip": ""}})
+
+        await self.migrations.update_one({"_id": self.LEGACY_VIP_MIGRATION_ID}, {"$set": {"completed_at": datetime.utcnow(), "imported": len(operations)}}, upsert=True)
+        logger.info("Imported legacy VIP flags", imported=len(operations))
+        return len(operations)
+
+
+# One document per (user, entitlement)
+IndexRegistry.register_index("entitlements", [("user_id", 1), ("entitlement", 1)], unique=True)
+# Loading every holder of an entitlement at startup
+IndexRegistry.register_index("entitlements", "entitlement")
+IndexRegistry.register_query("entitlements", "has/grant/revoke", {"user_id": 42, "entitlement": VIP_ENTITLEMENT})
+IndexRegistry.register_query("entitlements", "get_user_ids", {"entitlement": VIP_ENTITLEMENT})
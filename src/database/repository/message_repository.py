@@ -1,18 +1,37 @@
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
+from pymongo import WriteConcern
+from pymongo.errors import BulkWriteError
 from structlog import get_logger
 
+from src.database.indexes import IndexRegistry
+from src.database.message_schema import decode_raw
+from src.database.monitoring import monitored_repository
+from src.database.repository.user_repository import UserRepository
+
 log = get_logger(__name__)
 
+# Spy logging is write-heavy and can afford to lose the last moments of writes on a crash:
+# acknowledge on the primary without waiting for the journal
+MESSAGES_WRITE_CONCERN = WriteConcern(w=1, j=False)
+# Documents per cursor batch for the streaming readers; keeps memory flat on large chats
+DEFAULT_BATCH_SIZE = 1000
+
 
+@monitored_repository
 class MessageRepository:
     """Repository for handling message-related database operations."""
 
+    # Set once LegacyMessageShapeMigration has rewritten every chat_id/user_id document,
+    # after which the fallback queries for the old structure are skipped
+    legacy_shape_migrated = False
+
     def __init__(self, db):
         self.db = db["nexus"]
-        self.collection = self.db["messages"]
+        self.collection = self.db.get_collection("messages", write_concern=MESSAGES_WRITE_CONCERN)
         self.history_collection = self.db["messages_hist"]
+        self.users = UserRepository(db)
 
     async def insert_message(self, message_data: Dict) -> str:
         """
@@ -27,6 +46,28 @@ class MessageRepository:
         result = await self.collection.insert_one(message_data)
         return str(result.inserted_id)
 
+    async def insert_messages(self, messages: List[Dict]) -> int:
+        """
+        Log a batch of messages to the database in a single unordered write.
+
+        A failing document does not prevent the rest of the batch from being inserted.
+
+        Args:
+            messages: List of dictionaries containing message information
+
+        Returns:
+            int: Number of inserted documents
+        """
+        if not messages:
+            return 0
+
+        try:
+            result = await self.collection.insert_many(messages, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            log.error("Some messages failed to insert", errors=len(e.details.get("writeErrors", [])))
+            return e.details.get("nInserted", 0)
+
     async def get_messages_by_chat(self, chat_id: int, limit: int = 100) -> List[Dict]:
         """Get messages from a specific chat."""
         # Try the new structure first (chat.id)
@@ -35,7 +76,7 @@ class MessageRepository:
         messages = await cursor.to_list(length=None)
 
         # If no messages found, try the old structure (chat_id)
-        if not messages:
+        if not messages and not self.legacy_shape_migrated:
             query = {"chat_id": chat_id}
             cursor = self.collection.find(query).limit(limit)
             messages = await cursor.to_list(length=None)
@@ -50,7 +91,7 @@ class MessageRepository:
         messages = await cursor.to_list(length=None)
 
         # If no messages found, try the old structure (user_id)
-        if not messages:
+        if not messages and not self.legacy_shape_migrated:
             query = {"user_id": user_id}
             cursor = self.collection.find(query).limit(limit)
             messages = await cursor.to_list(length=None)
@@ -64,23 +105,27 @@ class MessageRepository:
 
     async def delete_messages_by_chat(self, chat_id: int) -> int:
         """Delete all messages from a specific chat."""
-        query = {"chat_id": chat_id}
+        query = {"chat.id": chat_id} if self.legacy_shape_migrated else {"$or": [{"chat.id": chat_id}, {"chat_id": chat_id}]}
         result = await self.collection.delete_many(query)
         return result.deleted_count
 
     async def get_message_count_by_chat(self, chat_id: int) -> int:
         """Get the total number of messages in a chat."""
-        query = {"chat_id": chat_id}
+        query = {"chat.id": chat_id} if self.legacy_shape_migrated else {"$or": [{"chat.id": chat_id}, {"chat_id": chat_id}]}
         return await self.collection.count_documents(query)
 
     async def get_message_count_by_user(self, user_id: int) -> int:
         """Get the total number of messages by a user."""
-        query = {"user_id": user_id}
+        query = {"from_user.id": user_id} if self.legacy_shape_migrated else {"$or": [{"from_user.id": user_id}, {"user_id": user_id}]}
         return await self.collection.count_documents(query)
 
     async def get_user_id_by_username(self, username: str) -> Optional[int]:
         """
-        Get user_id by username from message history.
+        Get user_id by username.
+
+        Resolved from the users directory first; users not in it yet are looked up
+        in message history and then remembered in the directory. Usernames found only
+        in history for users the directory knows under another name are stale.
 
         Args:
             username: Username to search for
@@ -88,19 +133,25 @@ class MessageRepository:
         Returns:
             int or None: User ID if found, None otherwise
         """
+        user_id = await self.users.get_user_id_by_username(username)
+        if user_id is not None:
+            return user_id
+
         # Find the most recent message from a user with this username
         query = {"from_user.username": username}
-        message = await self.collection.find_one(query, sort=[("date", -1)])
+        message = await self.collection.find_one(query, {"_id": 0, "from_user.id": 1, "user_id": 1, "created_at": 1}, sort=[("date", -1)])
 
         # Check if message exists and has from_user.id
         if message and "from_user" in message and "id" in message["from_user"]:
-            return message["from_user"]["id"]
-
+            user_id = message["from_user"]["id"]
         # Fallback to user_id if from_user.id is not available
-        if message and "user_id" in message:
-            return message["user_id"]
+        elif message and "user_id" in message:
+            user_id = message["user_id"]
 
-        return None
+        # Users the directory already knows have changed or dropped this username since
+        if user_id is not None and not await self.users.remember(user_id, username, message.get("created_at")):
+            return None
+        return user_id
 
     async def find_messages_by_query(self, query: Dict, limit: Optional[int] = None) -> List[Dict]:
         """
@@ -132,6 +183,12 @@ class MessageRepository:
         Returns:
             List of messages matching the criteria
         """
+        cursor = self.collection.find(self._date_range_query(start_date, end_date, chat_id, exclude_commands, exclude_bots)).sort("created_at", 1)
+        return await cursor.to_list(length=None)
+
+    @staticmethod
+    def _date_range_query(start_date: datetime, end_date: datetime, chat_id: int, exclude_commands: bool, exclude_bots: bool) -> Dict:
+        """Build the filter shared by the date range readers."""
         query = {"created_at": {"$gte": start_date, "$lt": end_date}, "chat.id": chat_id}
 
         # Add filters for commands and bots if needed
@@ -147,8 +204,7 @@ class MessageRepository:
             if and_conditions:
                 query["$and"] = and_conditions
 
-        cursor = self.collection.find(query).sort("created_at", 1)
-        return await cursor.to_list(length=None)
+        return query
 
     async def aggregate_messages(self, pipeline: List[Dict]) -> List[Dict]:
         """
@@ -160,7 +216,7 @@ class MessageRepository:
         Returns:
             List of documents resulting from the aggregation
         """
-        cursor = self.collection.aggregate(pipeline)
+        cursor = self.collection.aggregate(pipeline, allowDiskUse=True)
         return await cursor.to_list(length=None)
 
     async def find_one_message_by_chat_id(self, chat_id: int) -> Optional[Dict]:
@@ -176,6 +232,20 @@ class MessageRepository:
         query = {"chat.id": chat_id}
         return await self.collection.find_one(query)
 
+    async def get_original_message(self, chat_id: int, message_id: int) -> Optional[Dict]:
+        """
+        Get the full pyrogram dump of a message, decompressing it for slim documents.
+
+        Args:
+            chat_id: Chat ID of the message
+            message_id: Telegram message ID within the chat
+
+        Returns:
+            The full message document or None if not found
+        """
+        message = await self.collection.find_one({"chat.id": chat_id, "id": message_id})
+        return decode_raw(message) if message else None
+
     async def get_all_messages_by_chat(self, chat_id: int) -> List[Dict]:
         """
         Get all messages from a specific chat without a limit.
@@ -193,51 +263,166 @@ class MessageRepository:
         messages = await cursor.to_list(length=None)
 
         # If no messages found, try the old structure (chat_id)
-        if not messages:
+        if not messages and not self.legacy_shape_migrated:
             query = {"chat_id": chat_id}
             cursor = self.collection.find(query)
             messages = await cursor.to_list(length=None)
 
         return messages
 
-    async def soft_delete_user_messages(self, user_id: int) -> int:
+    async def soft_delete_user_messages(self, user_id: int, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
         """
         Soft-delete all messages from a specific user by moving them to the history collection.
 
+        Messages are streamed and moved one batch at a time, so a user with a long
+        history is never held in memory at once.
+
         Args:
             user_id: The ID of the user whose messages should be soft-deleted
+            batch_size: Number of messages moved per round trip
 
         Returns:
             int: Number of messages that were soft-deleted
         """
         log.info("Soft-deleting messages for user", user_id=user_id)
 
-        # Try the new structure first (from_user.id)
-        query = {"from_user.id": user_id}
-        cursor = self.collection.find(query)
-        messages = await cursor.to_list(length=None)
-
-        # If no messages found, try the old structure (user_id)
-        if not messages:
-            query = {"user_id": user_id}
-            cursor = self.collection.find(query)
-            messages = await cursor.to_list(length=None)
-
-        if not messages:
+        query = {"from_user.id": user_id} if self.legacy_shape_migrated else {"$or": [{"from_user.id": user_id}, {"user_id": user_id}]}
+        deleted = 0
+        batch: List[Dict] = []
+        async for message in self.iter_messages(query, batch_size=batch_size):
+            batch.append(message)
+            if len(batch) >= batch_size:
+                deleted += await self._move_to_history(batch)
+                batch = []
+        if batch:
+            deleted += await self._move_to_history(batch)
+
+        if not deleted:
             log.info("No messages found for user", user_id=user_id)
             return 0
 
-        # Add deletion metadata to each message
-        for message in messages:
-            message["deleted_at"] = datetime.utcnow()
-            message["deletion_type"] = "gdpr_request"
+        log.info("Soft-deleted messages for user", user_id=user_id, count=deleted)
+        return deleted
+
+    async def _move_to_history(self, messages: List[Dict]) -> int:
+        """Copy messages into the history collection with deletion metadata, then delete them."""
+        deleted_at = datetime.utcnow()
+        try:
+            await self.history_collection.insert_many([{**message, "deleted_at": deleted_at, "deletion_type": "gdpr_request"} for message in messages], ordered=False)
+        except BulkWriteError as e:
+            # Messages copied by an earlier, interrupted run are already in the history
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+        result = await self.collection.delete_many({"_id": {"$in": [message["_id"] for message in messages]}})
+        return result.deleted_count
+
+    # Streaming readers: documents are fetched batch_size at a time and only the
+    # projected fields are transferred, for callers that scan whole chat histories.
+
+    async def iter_messages(self, query: Dict, projection: Optional[Dict] = None, sort: Optional[List[Tuple[str, int]]] = None, limit: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[Dict]:
+        """
+        Stream messages matching a query.
+
+        Args:
+            query: MongoDB query dictionary
+            projection: Fields to return (None for whole documents)
+            sort: Sort specification
+            limit: Maximum number of messages (None for no limit)
+            batch_size: Number of documents per cursor batch
+
+        Yields:
+            Dict: Message documents
+        """
+        cursor = self.collection.find(query, projection, batch_size=batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        async for message in cursor:
+            yield message
+
+    async def iter_messages_by_chat(self, chat_id: int, projection: Optional[Dict] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[Dict]:
+        """
+        Stream every message of a chat, falling back to the legacy shape while it may still exist.
+
+        Args:
+            chat_id: The ID of the chat
+            projection: Fields to return (None for whole documents)
+            batch_size: Number of documents per cursor batch
 
-        # Insert all messages into the history collection
-        if messages:
-            await self.history_collection.insert_many(messages)
+        Yields:
+            Dict: Message documents
+        """
+        found = False
+        async for message in self.iter_messages({"chat.id": chat_id}, projection, batch_size=batch_size):
+            found = True
+            yield message
 
-        # Delete messages from the main collection
-        delete_result = await self.collection.delete_many({"$or": [{"from_user.id": user_id}, {"user_id": user_id}]})
+        if not found and not self.legacy_shape_migrated:
+            async for message in self.iter_messages({"chat_id": chat_id}, projection, batch_size=batch_size):
+                yield message
 
-        log.info("Soft-deleted messages for user", user_id=user_id, count=delete_result.deleted_count)
-        return delete_result.deleted_count
+    async def iter_messages_by_date_range(self, start_date: datetime, end_date: datetime, chat_id: int, exclude_commands: bool = True, exclude_bots: bool = True, projection: Optional[Dict] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[Dict]:
+        """
+        Stream messages of a chat within a date range, oldest first.
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (exclusive)
+            chat_id: Chat ID to filter by
+            exclude_commands: Whether to exclude command messages
+            exclude_bots: Whether to exclude bot messages
+            projection: Fields to return (None for whole documents)
+            batch_size: Number of documents per cursor batch
+
+        Yields:
+            Dict: Message documents
+        """
+        query = self._date_range_query(start_date, end_date, chat_id, exclude_commands, exclude_bots)
+        async for message in self.iter_messages(query, projection, sort=[("created_at", 1)], batch_size=batch_size):
+            yield message
+
+    async def iter_aggregate(self, pipeline: List[Dict], batch_size: int = DEFAULT_BATCH_SIZE, allow_disk_use: bool = True) -> AsyncIterator[Dict]:
+        """
+        Stream the results of an aggregation on the messages collection.
+
+        Args:
+            pipeline: MongoDB aggregation pipeline
+            batch_size: Number of documents per cursor batch
+            allow_disk_use: Let blocking stages ($group, $sort) spill to disk instead of failing at the memory limit
+
+        Yields:
+            Dict: Result documents
+        """
+        async for document in self.collection.aggregate(pipeline, allowDiskUse=allow_disk_use, batchSize=batch_size):
+            yield document
+
+
+# Indexes for the messages collection
+IndexRegistry.register_index("messages", [("chat.id", 1), ("created_at", 1)])
+IndexRegistry.register_index("messages", [("chat.id", 1), ("from_user.id", 1)])
+IndexRegistry.register_index("messages", [("from_user.id", 1)])
+IndexRegistry.register_index("messages", [("from_user.username", 1), ("date", -1)])
+# Legacy document shape, only present on old messages
+IndexRegistry.register_index("messages", [("chat_id", 1)], sparse=True)
+IndexRegistry.register_index("messages", [("user_id", 1)], sparse=True)
+
+# Query shapes served by the indexes above
+IndexRegistry.register_query("messages", "get_messages_by_chat", {"chat.id": -1001})
+IndexRegistry.register_query("messages", "get_messages_by_chat (legacy)", {"chat_id": -1001})
+IndexRegistry.register_query("messages", "get_messages_by_user", {"from_user.id": 42})
+IndexRegistry.register_query("messages", "get_messages_by_user (legacy)", {"user_id": 42})
+IndexRegistry.register_query("messages", "get_user_id_by_username", {"from_user.username": "username"}, sort=[("date", -1)])
+IndexRegistry.register_query(
+    "messages",
+    "get_messages_by_date_range",
+    {
+        "created_at": {"$gte": datetime(2025, 1, 1), "$lt": datetime(2025, 1, 2)},
+        "chat.id": -1001,
+        "$and": [{"$or": [{"text": {"$exists": True, "$ne": "", "$not": {"$regex": "^/"}}}, {"caption": {"$exists": True, "$ne": ""}}]}, {"$or": [{"from_user.is_bot": False}, {"from_user.is_bot": {"$exists": False}}]}],
+    },
+    sort=[("created_at", 1)],
+)
+IndexRegistry.register_query("messages", "get_original_message", {"chat.id": -1001, "id": 7})
+IndexRegistry.register_query("messages", "MarkovTextGenerator.get_messages", {"chat.id": -1001, "from_user.id": 42})
+IndexRegistry.register_query("messages", "soft_delete_user_messages", {"$or": [{"from_user.id": 42}, {"user_id": 42}]})
@@ -1,87 +1,89 @@
 from typing import Dict
 
 import structlog
+from pymongo import WriteConcern
 
 from src.config.framework import PeerConfigModel
+from src.database.indexes import IndexRegistry
+from src.database.invalidation import InvalidationBus
+from src.database.monitoring import monitored_repository
+from src.utils.cache import TTLCache
+from src.utils.snapshot import CacheSnapshot
 
 logger = structlog.get_logger(__name__)
 
+# Bounds for the shared peer configuration cache
+PEER_CONFIG_CACHE_SIZE = 10000
+PEER_CONFIG_CACHE_TTL = 600  # 10 minutes
+# Settings changes must survive a failover before the cache is updated
+PEER_CONFIG_WRITE_CONCERN = WriteConcern(w="majority", j=True)
+# Invalidation bus key prefix; followed by the chat ID
+INVALIDATION_PREFIX = "peer_config:"
 
+
+@monitored_repository
 class PeerConfigRepository:
     """Enhanced repository for handling peer-specific configurations."""
 
+    # Class-level cache shared by every repository instance in the process
+    _config_cache = TTLCache(maxsize=PEER_CONFIG_CACHE_SIZE, ttl=PEER_CONFIG_CACHE_TTL)
+
+    # Migrations document recording which parameter defaults are already stored
+    DEFAULTS_MIGRATION_ID = "peer_config_defaults"
+
     def __init__(self, db):
         self.db = db["nexus"]
-        self.collection = self.db["peer_config"]
-        # In-memory cache of peer configurations
-        self._config_cache = {}
+        self.collection = self.db.get_collection("peer_config", write_concern=PEER_CONFIG_WRITE_CONCERN)
+        self.migrations = self.db["migrations"]
 
-    async def initialize_new_params(self):
-        """
-        Initialize any new parameters for all existing peers.
-        This should be called after all plugins have registered their parameters.
+    async def backfill_defaults(self):
         """
-        # Get all peers
-        all_peers = await self.collection.find({}).to_list(length=None)
+        Persist defaults of newly registered parameters into every stored config.
 
-        # For each peer, check for missing parameters and add defaults
-        for peer_doc in all_peers:
-            chat_id = peer_doc.get("chat_id")
-            if not chat_id:
-                continue
-
-            updates = {}
-            # Check each registered parameter
-            for param_name, param_info in PeerConfigModel.param_registry.items():
-                if param_name not in peer_doc:
-                    # Parameter doesn't exist for this peer, add with default
-                    updates[param_name] = param_info.default
+        Runs one update_many per parameter that has not been backfilled yet; parameters
+        already handled by a previous startup are recorded in the migrations collection
+        and skipped. Reads do not depend on this, since defaults are applied in memory,
+        but it keeps the stored documents complete for direct queries.
+        Should be called once after all plugins have registered their parameters.
+        """
+        state = await self.migrations.find_one({"_id": self.DEFAULTS_MIGRATION_ID}) or {}
+        done = set(state.get("params", []))
 
-            if updates:
-                # Update the peer with new parameters
-                await self.collection.update_one({"chat_id": chat_id}, {"$set": updates})
-                logger.info("Initialized new parameters for peer", chat_id=chat_id, parameters=list(updates.keys()))
+        pending = [name for name in PeerConfigModel.param_registry if name not in done]
+        if not pending:
+            return
 
-                # Update cache if needed
-                if chat_id in self._config_cache:
-                    self._config_cache[chat_id].update(updates)
+        for param_name in pending:
+            default = PeerConfigModel.param_registry[param_name].default
+            result = await self.collection.update_many({param_name: {"$exists": False}}, {"$set": {param_name: default}})
+            if result.modified_count:
+                logger.info("Backfilled parameter default", parameter=param_name, peers=result.modified_count)
 
-        logger.info("Completed parameter initialization for all peers")
+        await self.migrations.update_one({"_id": self.DEFAULTS_MIGRATION_ID}, {"$addToSet": {"params": {"$each": pending}}}, upsert=True)
+        logger.info("Completed parameter backfill for all peers", parameters=pending)
 
     async def get_peer_config(self, chat_id: int) -> Dict:
         """
         Get peer configuration, using cache if available.
-        Creates default config if peer doesn't exist.
-        Ensures all registered parameters exist.
+        Registered parameters missing from the stored document are filled with their
+        defaults in memory; nothing is written to the database on read.
         """
         # Check cache first
-        if chat_id in self._config_cache:
-            return self._config_cache[chat_id]
-
-        # Check database
-        config = await self.collection.find_one({"chat_id": chat_id})
-
-        if not config:
-            # Create new config with defaults from registry
-            default_values = {field: info.default for field, info in PeerConfigModel.param_registry.items()}
-            config = {"chat_id": chat_id, **default_values}
-            await self.collection.insert_one(config)
-            logger.info(f"Created new configuration for chat {chat_id}")
-        else:
-            # Check for missing parameters
-            updates = {}
-            for param_name, param_info in PeerConfigModel.param_registry.items():
-                if param_name not in config:
-                    updates[param_name] = param_info.default
-                    config[param_name] = param_info.default
-
-            if updates:
-                # Update with missing parameters
-                await self.collection.update_one({"chat_id": chat_id}, {"$set": updates})
-                logger.info("Added missing parameters to config", chat_id=chat_id, parameters=list(updates.keys()))
+        cached = self._config_cache.get(chat_id)
+        if cached is not None:
+            version, config = cached
+            if version != PeerConfigModel.registry_version:
+                # Parameters were registered since this entry was cached
+                PeerConfigModel.apply_defaults(config)
+                self._config_cache.set(chat_id, (PeerConfigModel.registry_version, config))
+            return config
+
+        # Check database; unknown peers get defaults until their first update
+        config = await self.collection.find_one({"chat_id": chat_id}) or {"chat_id": chat_id}
+        PeerConfigModel.apply_defaults(config)
 
         # Cache the config
-        self._config_cache[chat_id] = config
+        self._config_cache.set(chat_id, (PeerConfigModel.registry_version, config))
         return config
 
     async def update_peer_config(self, chat_id: int, updates: Dict) -> Dict:
@@ -106,16 +108,16 @@ class PeerConfigRepository:
         if not valid_updates:
             return current_config
 
-        # Update database
-        await self.collection.update_one({"chat_id": chat_id}, {"$set": valid_updates}, upsert=True)
+        # Update database; a new peer document is stored with every default filled in
+        defaults = {name: info.default for name, info in PeerConfigModel.param_registry.items() if name not in valid_updates}
+        await self.collection.update_one({"chat_id": chat_id}, {"$set": valid_updates, "$setOnInsert": defaults}, upsert=True)
 
-        # Update cache
-        if chat_id in self._config_cache:
-            self._config_cache[chat_id].update(valid_updates)
-        else:
-            await self.get_peer_config(chat_id)  # This will cache the config
+        # Write through to the cache; current_config is the cached entry unless it expired meanwhile
+        current_config.update(valid_updates)
+        self._config_cache.set(chat_id, (PeerConfigModel.registry_version, current_config))
+        await InvalidationBus.get_instance().publish(f"{INVALIDATION_PREFIX}{chat_id}")
 
-        return self._config_cache[chat_id]
+        return current_config
 
     def invalidate_cache(self, chat_id: int = None):
         """
@@ -125,3 +127,32 @@ class PeerConfigRepository:
             self._config_cache.pop(chat_id, None)
         else:
             self._config_cache.clear()
+
+    @classmethod
+    def dump_cache(cls):
+        """Cached configs as (chat_id, config, age) for the warm-restart snapshot."""
+        return ((chat_id, config, age) for chat_id, (_, config), age in cls._config_cache.items())
+
+    @classmethod
+    def restore_cache(cls, entries) -> int:
+        """Put configs from a snapshot back into the cache."""
+        for chat_id, config, age in entries:
+            # An unknown registry version makes the first read apply current defaults
+            cls._config_cache.set(chat_id, (-1, config), age=age)
+        return len(entries)
+
+    @classmethod
+    def _on_invalidation(cls, key: str):
+        """Drop a config another process changed."""
+        chat_id = key[len(INVALIDATION_PREFIX) :]
+        if chat_id:
+            cls._config_cache.pop(int(chat_id), None)
+        else:
+            cls._config_cache.clear()
+
+
+InvalidationBus.subscribe(INVALIDATION_PREFIX, PeerConfigRepository._on_invalidation)
+CacheSnapshot.register("peer_config", PeerConfigRepository.dump_cache, PeerConfigRepository.restore_cache, ttl=PEER_CONFIG_CACHE_TTL)
+
+IndexRegistry.register_index("peer_config", "chat_id")
+IndexRegistry.register_query("peer_config", "get_peer_config", {"chat_id": -1001})
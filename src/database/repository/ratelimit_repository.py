@@ -1,22 +1,20 @@
-import asyncio
-import time
 from datetime import datetime
-from typing import Dict, Tuple
+from typing import Dict, List, Optional
 
 import structlog
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReturnDocument, UpdateOne
 
 from src.database.client import DatabaseClient
+from src.database.indexes import IndexRegistry
+from src.database.monitoring import monitored_repository
 
 logger = structlog.get_logger()
 
 
+@monitored_repository
 class RateLimitRepository:
-    """Repository for handling rate limit operations."""
-
-    # Class-level lock and cache
-    _lock = asyncio.Lock()
-    _cache: Dict[Tuple[int, str], float] = {}
+    """Repository for persisting rate limiter buckets."""
 
     def __init__(self, db_client: DatabaseClient):
         self.db = db_client.db
@@ -24,43 +22,69 @@ class RateLimitRepository:
 
     async def initialize(self):
         """Initialize the rate limit collection with indexes."""
-        # Create compound index on user_id and operation
-        await self.collection.create_index([("user_id", 1), ("operation", 1)], unique=True)
-        # Create TTL index to automatically remove old entries
-        await self.collection.create_index(
-            "timestamp",
-            expireAfterSeconds=86400,  # 24 hours
-        )
-
-    async def check_rate_limit(self, user_id: int, operation: str, window_seconds: int) -> bool:
+        await IndexRegistry.create_indexes(self.db, "ratelimits")
+
+    async def save_buckets(self, buckets: List[Dict]) -> int:
+        """
+        Upsert bucket states in a single unordered bulk write.
+
+        Args:
+            buckets: Bucket documents with user_id, operation, tokens, updated_at and expires_at
+
+        Returns:
+            int: Number of buckets written
+        """
+        if not buckets:
+            return 0
+
+        operations = [UpdateOne({"user_id": bucket["user_id"], "operation": bucket["operation"]}, {"$set": bucket}, upsert=True) for bucket in buckets]
+        result = await self.collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.matched_count
+
+    async def load_buckets(self) -> List[Dict]:
         """
-        Check if operation is allowed using thread-safe class-level cache.
+        Get all buckets that have not refilled yet.
+
+        Returns:
+            List[Dict]: Bucket documents
+        """
+        cursor = self.collection.find({"expires_at": {"$gt": datetime.utcnow()}}, {"_id": 0})
+        return await cursor.to_list(length=None)
+
+    async def take_token(self, user_id: int, operation: str, window_seconds: float, capacity: int, now: float) -> Optional[Dict]:
+        """
+        Refill the bucket and take a token in a single atomic update.
+
+        The refill and the decision are computed server side by an update pipeline, so
+        concurrent processes sharing the collection can never both take the last token.
+        The document is created with a full bucket when it does not exist yet.
 
         Args:
             user_id: The user ID
             operation: The operation name
-            window_seconds: Time window in seconds
+            window_seconds: Time to refill the whole bucket
+            capacity: Number of tokens in a full bucket
+            now: Current unix time of the decision
 
         Returns:
-            bool: True if operation is allowed, False if rate limited
+            Optional[Dict]: Bucket after the update; updated_at equals now if a token was taken
         """
-        key = (user_id, operation)
-        current_time = time.time()
-
-        async with self._lock:
-            # Check cache
-            last_request = self._cache.get(key, 0)
-            if current_time - last_request < window_seconds:
-                return False
-
-            # Update cache immediately
-            self._cache[key] = current_time
-
-            # Update MongoDB asynchronously
-            now = datetime.utcnow()
-            try:
-                await self.collection.update_one({"user_id": user_id, "operation": operation}, {"$set": {"timestamp": now}}, upsert=True)
-            except Exception as e:
-                logger.error("Failed to update rate limit in MongoDB", error=str(e))
-
-            return True
+        rate = capacity / window_seconds
+        refilled = {"$min": [capacity, {"$add": [{"$ifNull": ["$tokens", capacity]}, {"$multiply": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, rate]}]}]}
+        allowed = {"$gte": ["$_refilled", 1]}
+        pipeline = [
+            {"$set": {"_refilled": refilled}},
+            {"$set": {"tokens": {"$cond": [allowed, {"$subtract": ["$_refilled", 1]}, "$tokens"]}, "updated_at": {"$cond": [allowed, now, "$updated_at"]}}},
+            # Milliseconds since epoch of the moment the bucket is full again, for the TTL index
+            {"$set": {"expires_at": {"$toDate": {"$multiply": [{"$add": ["$updated_at", {"$divide": [{"$subtract": [capacity, "$tokens"]}, rate]}]}, 1000]}}}},
+            {"$unset": "_refilled"},
+        ]
+        return await self.collection.find_one_and_update({"user_id": user_id, "operation": operation}, pipeline, projection={"_id": 0, "tokens": 1, "updated_at": 1}, upsert=True, return_document=ReturnDocument.AFTER)
+
+
+# Compound index on user_id and operation
+IndexRegistry.register_index("ratelimits", [("user_id", 1), ("operation", 1)], unique=True)
+# TTL index removing buckets once they have refilled
+IndexRegistry.register_index("ratelimits", "expires_at", expireAfterSeconds=0)
+IndexRegistry.register_query("ratelimits", "save_buckets/take_token", {"user_id": 42, "operation": "markov_handler"})
+IndexRegistry.register_query("ratelimits", "load_buckets", {"expires_at": {"$gt": datetime(2025, 1, 1)}})
@@ -7,9 +7,12 @@ from bson.objectid import ObjectId
 from structlog import get_logger
 
 from src.database.client import DatabaseClient
+from src.database.indexes import IndexRegistry
+from src.database.monitoring import monitored_repository
 
 log = get_logger(__name__)
 
+@monitored_repository
 class RequestRepository:
     """Repository for handling request history."""
 
@@ -22,12 +25,7 @@ class RequestRepository:
     async def initialize(self):
         """Initialize the repository by creating indexes."""
         try:
-            # Create index on timestamp for fast retrieval by date
-            await self.requests_collection.create_index("timestamp")
-            # Create index on user_id for fast retrieval by user
-            await self.requests_collection.create_index("user_id")
-            # Create index on chat_id for fast retrieval by chat
-            await self.requests_collection.create_index("chat_id")
+            await IndexRegistry.create_indexes(self.db, "requests")
 
             log.info("RequestRepository initialized successfully")
         except Exception as e:
@@ -276,4 +274,15 @@ class RequestRepository:
             query={},
             limit=limit,
             log_context={}
-        )
\ No newline at end of file
+        )
+
+
+# Index on timestamp for fast retrieval by date
+IndexRegistry.register_index("requests", "timestamp")
+# Index on user_id for fast retrieval by user
+IndexRegistry.register_index("requests", "user_id")
+# Index on chat_id for fast retrieval by chat
+IndexRegistry.register_index("requests", "chat_id")
+IndexRegistry.register_query("requests", "get_user_requests", {"user_id": 42}, sort=[("timestamp", -1)])
+IndexRegistry.register_query("requests", "get_chat_requests", {"chat_id": -1001}, sort=[("timestamp", -1)])
+IndexRegistry.register_query("requests", "get_recent_requests", {}, sort=[("timestamp", -1)])
@@ -0,0 +1,165 @@
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from pymongo import UpdateOne
+from structlog import get_logger
+
+from src.database.indexes import IndexRegistry
+from src.database.monitoring import monitored_repository
+from src.utils.cache import TTLCache
+
+log = get_logger(__name__)
+
+# Bounds for the username resolution cache; usernames can change hands, so entries expire
+USERNAME_CACHE_SIZE = 10000
+USERNAME_CACHE_TTL = 3600  # 1 hour
+# Profile fields copied from from_user into the directory
+PROFILE_FIELDS = ("username", "first_name", "last_name", "is_bot")
+
+
+@monitored_repository
+class UserRepository:
+    """
+    Directory of users seen in logged messages, maintained by message ingestion.
+
+    One document per user holds the latest profile fields, the username lowercased
+    for lookups (Telegram usernames are case-insensitive) and first_seen/last_seen
+    timestamps. When a username moved to another account, the most recently seen
+    holder wins.
+    """
+
+    # Class-level cache shared by every repository instance in the process: lowercase username -> user ID
+    _username_cache = TTLCache(maxsize=USERNAME_CACHE_SIZE, ttl=USERNAME_CACHE_TTL)
+    # Reverse of the cache, so a renamed user's old username can be dropped from it: user ID -> lowercase username
+    _cached_usernames = TTLCache(maxsize=USERNAME_CACHE_SIZE, ttl=USERNAME_CACHE_TTL)
+
+    def __init__(self, db):
+        self.db = db["nexus"]
+        self.collection = self.db["users"]
+
+    @staticmethod
+    def normalize_username(username: str) -> str:
+        """Lowercase a username and strip a leading @."""
+        return username.lstrip("@").lower()
+
+    @classmethod
+    def _cache_username(cls, key: str, user_id: int):
+        """Cache a resolution, dropping the user's previously cached username."""
+        previous = cls._cached_usernames.get(user_id)
+        if previous is not None and previous != key and cls._username_cache.get(previous) == user_id:
+            cls._username_cache.pop(previous)
+        cls._username_cache.set(key, user_id)
+        cls._cached_usernames.set(user_id, key)
+
+    @classmethod
+    def _forget_username(cls, user_id: int):
+        """Drop a user's cached username, if any."""
+        previous = cls._cached_usernames.pop(user_id)
+        if previous is not None and cls._username_cache.get(previous) == user_id:
+            cls._username_cache.pop(previous)
+
+    async def record_messages(self, messages: Iterable[Dict]) -> int:
+        """
+        Update the directory from a batch of logged message documents.
+
+        Args:
+            messages: Message documents as written by the spy logger
+
+        Returns:
+            int: Number of users updated
+        """
+        users: Dict[int, Dict] = {}
+        for message in messages:
+            user = message.get("from_user")
+            created_at = message.get("created_at")
+            if not isinstance(user, dict) or user.get("id") is None or created_at is None:
+                continue
+
+            entry = users.setdefault(user["id"], {"profile": {}, "username": None, "first_seen": created_at, "last_seen": created_at})
+            entry["profile"].update({field: user[field] for field in PROFILE_FIELDS if field != "username" and user.get(field) is not None})
+            entry["first_seen"] = min(entry["first_seen"], created_at)
+            if created_at >= entry["last_seen"]:
+                # The username of the user's latest message wins, including having none
+                entry["username"] = user.get("username")
+                entry["last_seen"] = created_at
+
+        if not users:
+            return 0
+
+        operations = []
+        for user_id, entry in users.items():
+            profile = entry["profile"]
+            update = {"$max": {"last_seen": entry["last_seen"]}, "$min": {"first_seen": entry["first_seen"]}}
+            if username := entry["username"]:
+                profile["username"] = username
+                profile["username_lower"] = self.normalize_username(username)
+                self._cache_username(profile["username_lower"], user_id)
+            else:
+                # A dropped username must stop resolving to this user
+                update["$unset"] = {"username": "", "username_lower": ""}
+                self._forget_username(user_id)
+            if profile:
+                update["$set"] = profile
+            operations.append(UpdateOne({"user_id": user_id}, update, upsert=True))
+
+        await self.collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    async def get_user_id_by_username(self, username: str) -> Optional[int]:
+        """
+        Resolve a username to a user ID, case-insensitively.
+
+        Args:
+            username: Username with or without a leading @
+
+        Returns:
+            Optional[int]: User ID of the most recently seen holder, or None if unknown
+        """
+        key = self.normalize_username(username)
+        if not key:
+            return None
+
+        user_id = self._username_cache.get(key)
+        if user_id is not None:
+            return user_id
+
+        document = await self.collection.find_one({"username_lower": key}, {"_id": 0, "user_id": 1}, sort=[("last_seen", -1)])
+        if document is None:
+            return None
+
+        self._cache_username(key, document["user_id"])
+        return document["user_id"]
+
+    async def remember(self, user_id: int, username: str, seen_at: Optional[datetime] = None) -> bool:
+        """
+        Store a username resolved elsewhere, such as from message history.
+
+        Only users missing from the directory are added. A user already in it holds a
+        different username or none by now, so the resolved one is stale.
+
+        Args:
+            user_id: The user ID
+            username: The username
+            seen_at: When the user was last seen with this username
+
+        Returns:
+            bool: True if the user was added, False if the username is stale
+        """
+        key = self.normalize_username(username)
+        update = {"$setOnInsert": {"username": username.lstrip("@"), "username_lower": key}}
+        if seen_at is not None:
+            update["$max"] = {"last_seen": seen_at}
+            update["$min"] = {"first_seen": seen_at}
+        result = await self.collection.update_one({"user_id": user_id}, update, upsert=True)
+        if result.upserted_id is None:
+            return False
+        self._cache_username(key, user_id)
+        return True
+
+
+# One document per user
+IndexRegistry.register_index("users", "user_id", unique=True)
+# Username resolution, newest holder first
+IndexRegistry.register_index("users", [("username_lower", 1), ("last_seen", -1)])
+IndexRegistry.register_query("users", "get_user_id_by_username", {"username_lower": "username"}, sort=[("last_seen", -1)])
+IndexRegistry.register_query("users", "record_messages", {"user_id": 42})
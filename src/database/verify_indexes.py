@@ -0,0 +1,87 @@
+"""
+Verify that every registered repository query is served by an index.
+
+Seeds a scratch database on a local mongod, creates all registered indexes,
+runs explain() on each registered query and fails if any winning plan
+contains a COLLSCAN stage. The scratch database is dropped afterwards.
+
+Usage:
+    python -m src.database.verify_indexes [mongodb-uri]
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Iterator, List
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from src.database.indexes import IndexRegistry
+
+SCRATCH_DATABASE = "nexus_index_check"
+SEED_MESSAGES = 2000
+
+
+def seed_messages(count: int) -> List[dict]:
+    """Build synthetic messages in both the current and the legacy document shape."""
+    start = datetime(2025, 1, 1)
+    messages = []
+    for i in range(count):
+        created_at = start + timedelta(minutes=i)
+        if i % 10 == 0:
+            # Legacy shape
+            messages.append({"message_id": i, "chat_id": -1000 - i % 5, "user_id": i % 50, "username": f"user{i % 50}", "text": f"legacy message {i}", "created_at": created_at})
+        else:
+            user = {"id": i % 50, "is_bot": i % 25 == 0, "first_name": f"User {i % 50}", "username": f"user{i % 50}"}
+            chat = {"id": -1000 - i % 5, "type": "ChatType.SUPERGROUP", "title": f"Chat {i % 5}"}
+            messages.append({"id": i, "from_user": user, "chat": chat, "date": str(created_at), "text": f"message {i}", "created_at": created_at})
+    return messages
+
+
+def find_stages(plan: Any) -> Iterator[str]:
+    """Yield every stage name in an explain plan, whatever the server version nests it under."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from find_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from find_stages(item)
+
+
+async def verify(uri: str) -> bool:
+    IndexRegistry.discover()
+
+    client = AsyncIOMotorClient(uri)
+    db = client[SCRATCH_DATABASE]
+    try:
+        await client.drop_database(SCRATCH_DATABASE)
+
+        # Seed data so the planner has something to choose over
+        await db["messages"].insert_many(seed_messages(SEED_MESSAGES))
+        for collection in {query.collection for query in IndexRegistry.queries} - {"messages"}:
+            await db[collection].insert_one({"seed": True})
+
+        await IndexRegistry.create_indexes(db)
+
+        ok = True
+        for query in IndexRegistry.queries:
+            cursor = db[query.collection].find(query.filter)
+            if query.sort:
+                cursor = cursor.sort(query.sort)
+            explain = await cursor.explain()
+            stages = list(find_stages(explain["queryPlanner"]["winningPlan"]))
+            status = "FAIL" if "COLLSCAN" in stages else "ok"
+            ok &= status == "ok"
+            print(f"{status:<5}{query.collection:<22}{query.name:<40}{' <- '.join(reversed(stages))}")
+
+        return ok
+    finally:
+        await client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    mongo_uri = sys.argv[1] if len(sys.argv) > 1 else "mongodb://localhost:27017"
+    sys.exit(0 if asyncio.run(verify(mongo_uri)) else 1)
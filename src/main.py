@@ -3,68 +3,151 @@ import asyncio
 from pyrogram import Client, idle
 
 from src.database.client import DatabaseClient
+from src.database.invalidation import InvalidationBus
+from src.database.migrations import LegacyMessageShapeMigration, SlimMessageMigration
 from src.database.repository.bot_config_repository import BotConfigRepository
+from src.database.repository.chat_repository import ChatRepository
 from src.database.repository.message_repository import MessageRepository
 from src.database.repository.peer_config_repository import PeerConfigRepository
-from src.plugins.deathbyai import initialize as init_deathbyai
-from src.plugins.fanfic import initialize as init_fanfic
-from src.plugins.imagegen import initialize as init_imagegen
-from src.plugins.summary import initialize as init_summary_config
+# Imported for the startup steps they declare
+from src.plugins import deathbyai, fanfic, imagegen, summary, tanks, threads, transcribe  # noqa: F401
+from src.plugins.spy.ingestion import MessageIngestionQueue
 from src.plugins.summary.job import init_summary
-from src.plugins.tanks import init_tanks
-from src.plugins.threads import initialize as init_threads
-from src.plugins.transcribe import initialize as init_falai
+from src.security.entitlements import Entitlements
+from src.security.rate_limiter import RateLimiter
 from src.utils.credentials import Credentials
+from src.utils.handler_metrics import HandlerMetrics, MetricsServer
 from src.utils.logging import setup_structlog
+from src.utils.snapshot import CacheSnapshot
+from src.utils.startup import Startup
 
 # Setup logging once at the module level
 logger = setup_structlog()
 
+# Plugin configuration steps that must finish before the client starts handling updates
+PLUGIN_CONFIG_STEPS = ("threads", "fanfic", "summary_config", "deathbyai", "transcribe", "imagegen")
+
 
 async def main():
     # Initialize credentials singleton and get shared database instance
     credentials = Credentials.get_instance()
     db = DatabaseClient.get_instance(credentials)
+    app = None
+    legacy_migration = None
+    slim_migration = None
+    metrics_server = None
 
-    try:
-        # Initialize database connection
-        await db.connect()
-
-        # Initialize bot config repository
-        config_repo = BotConfigRepository(db)
-        await config_repo.initialize()
-        # Initialize plugin configurations
-        # Each plugin registers its own configuration
-        await init_threads()
-        await init_fanfic()
-        await init_summary_config()
-        await init_deathbyai()
-        await init_falai()
-        await init_imagegen()
-
-        # Initialize tanks data
-        await init_tanks()
-
-        # Initialize client
+    async def start_legacy_migration():
+        # Rewrite legacy message documents in the background
+        nonlocal legacy_migration
+        legacy_migration = LegacyMessageShapeMigration(db.client)
+        await legacy_migration.start()
+
+    async def start_slim_migration():
+        # Move full message documents to the slim shape in the background
+        nonlocal slim_migration
+        slim_migration = SlimMessageMigration(db.client)
+        await slim_migration.start()
+
+    async def start_invalidation_bus():
+        # Created here rather than at registration, once the database step has connected
+        await InvalidationBus.get_instance().start()
+
+    async def restore_cache_snapshot():
+        # Warm the caches saved by the last graceful shutdown, then catch up on changes made meanwhile.
+        # The snapshot is only an optimization: on any failure start cold instead of blocking the client
+        if not credentials.snapshot.path:
+            return
+        try:
+            saved_at = CacheSnapshot.load(credentials.snapshot.path)
+        except Exception as e:
+            logger.error("Failed to restore cache snapshot, starting cold", error=str(e))
+            return
+        if saved_at is None:
+            return
+        bus = InvalidationBus.get_instance()
+        try:
+            replayed = await bus.replay(saved_at)
+            logger.info("Replayed cache invalidations since snapshot", invalidations=replayed)
+        except Exception as e:
+            # Restored entries may be stale without the replay, so drop them
+            logger.error("Failed to replay cache invalidations, discarding restored caches", error=str(e))
+            await bus.invalidate_all()
+
+    async def backfill_chat_registry():
+        # Seed the chat registry for chats that were active before ingestion maintained it
+        await ChatRepository(db.client).backfill_from_messages()
+
+    async def load_entitlements():
+        # Never fatal: a failed load is retried in the background and VIP checks answer False meanwhile
+        await Entitlements.get_instance().load()
+
+    async def start_client():
+        nonlocal app
         app = Client(credentials.bot.name, api_id=credentials.bot.app_id, api_hash=credentials.bot.app_hash, bot_token=credentials.bot.bot_token, plugins=dict(root="src/plugins"), mongodb=dict(connection=db.client, remove_peers=False))
+        # Time every handler pyrogram registers from the plugins
+        HandlerMetrics.get_instance().instrument_client(app)
 
         logger.info("Starting Nexus")
         await app.start()
 
-        # Initialize repositories and summary job after app is started
-        message_repository = MessageRepository(db.client)
-        config_repository = PeerConfigRepository(db.client)
-        await init_summary(message_repository, config_repository, app)
+    async def start_metrics_server():
+        nonlocal metrics_server
+        if credentials.metrics.port:
+            metrics_server = MetricsServer(credentials.metrics.host, credentials.metrics.port)
+            await metrics_server.start()
+
+    async def backfill_peer_config():
+        # All plugins are loaded now, so every peer config parameter is registered
+        await PeerConfigRepository(db.client).backfill_defaults()
+
+    async def start_summary_job():
+        await init_summary(MessageRepository(db.client), PeerConfigRepository(db.client), app)
+
+    # Plugin configuration steps register themselves on import
+    Startup.register("database", db.connect, critical=True)
+    Startup.register("legacy_migration", start_legacy_migration, depends_on=("database",))
+    Startup.register("slim_migration", start_slim_migration, depends_on=("database",))
+    Startup.register("invalidation_bus", start_invalidation_bus, depends_on=("database",))
+    Startup.register("cache_snapshot", restore_cache_snapshot, depends_on=("database",))
+    Startup.register("entitlements", load_entitlements, depends_on=("database",))
+    Startup.register("chat_registry_backfill", backfill_chat_registry, depends_on=("database",), background=True)
+    Startup.register("client", start_client, depends_on=("database", "cache_snapshot", "entitlements", *PLUGIN_CONFIG_STEPS), critical=True)
+    Startup.register("metrics_server", start_metrics_server)
+    Startup.register("peer_config_backfill", backfill_peer_config, depends_on=("client",))
+    Startup.register("summary_job", start_summary_job, depends_on=("client",))
 
+    try:
+        await Startup.run()
         await idle()
     except Exception as e:
         logger.error("Error in main loop", error=str(e))
         raise
     finally:
         logger.info("Shutting down Nexus")
-        await db.disconnect()
-        if "app" in locals():
+        # Cancel background startup work such as the tank sync
+        await Startup.stop()
+        if metrics_server is not None:
+            await metrics_server.stop()
+        if app is not None:
             await app.stop()
+            # Only a bot that actually ran has caches worth keeping
+            if credentials.snapshot.path:
+                try:
+                    CacheSnapshot.save(credentials.snapshot.path)
+                except OSError as e:
+                    logger.error("Failed to save cache snapshot", error=str(e))
+        if legacy_migration is not None:
+            await legacy_migration.stop()
+        if slim_migration is not None:
+            await slim_migration.stop()
+        # Flush buffered messages before the connection goes away
+        await MessageIngestionQueue.shutdown()
+        await RateLimiter.shutdown()
+        await InvalidationBus.shutdown()
+        await Entitlements.shutdown()
+        await BotConfigRepository.stop_watching()
+        await db.disconnect()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,12 @@
+"""Middleware attaching a shared per-update context to every incoming message"""
+
+from pyrogram import Client, filters
+from pyrogram.types import Message
+
+from src.security.context import UpdateContext
+
+
+@Client.on_message(filters.all, group=-1)
+async def attach_context(client: Client, message: Message):
+    """Attach an UpdateContext before any other handler group sees the message."""
+    UpdateContext.of(message)
@@ -7,9 +7,13 @@ from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
 from structlog import get_logger
 
+from src.database.indexes import IndexRegistry
+from src.database.monitoring import monitored_repository
+
 log = get_logger(__name__)
 
 
+@monitored_repository
 class DeathByAIRepository:
     """Repository for managing Death by AI game data"""
 
@@ -21,14 +25,8 @@ class DeathByAIRepository:
 
     async def create_indexes(self):
         """Create necessary indexes"""
-        # Game indexes
-        await self.games.create_index([("chat_id", 1), ("status", 1)])
-        await self.games.create_index([("message_id", 1)])
-        await self.games.create_index([("initiator_id", 1)])
-
-        # Scenario indexes
-        await self.scenarios.create_index([("difficulty", 1)])
-        await self.scenarios.create_index([("created_at", -1)])
+        await IndexRegistry.create_indexes(self.db, "deathbyai_games")
+        await IndexRegistry.create_indexes(self.db, "deathbyai_scenarios")
 
     async def get_random_scenario(self) -> Optional[Dict[str, Any]]:
         """
@@ -190,3 +188,15 @@ class DeathByAIRepository:
         """
         cursor = self.games.find({"chat_id": chat_id}).sort("start_time", -1).limit(limit)
         return await cursor.to_list(length=None)
+
+
+# Game indexes
+IndexRegistry.register_index("deathbyai_games", [("chat_id", 1), ("status", 1)])
+IndexRegistry.register_index("deathbyai_games", [("message_id", 1)])
+IndexRegistry.register_index("deathbyai_games", [("initiator_id", 1)])
+IndexRegistry.register_query("deathbyai_games", "get_active_game", {"chat_id": -1001, "status": "active"})
+IndexRegistry.register_query("deathbyai_games", "get_game_by_message", {"message_id": 1})
+
+# Scenario indexes
+IndexRegistry.register_index("deathbyai_scenarios", [("difficulty", 1)])
+IndexRegistry.register_index("deathbyai_scenarios", [("created_at", -1)])
@@ -4,11 +4,13 @@ import structlog
 
 from src.database.client import DatabaseClient
 from src.database.repository.bot_config_repository import BotConfigRepository
+from src.utils.startup import startup_step
 
 logger = structlog.get_logger(__name__)
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
+@startup_step("fanfic", depends_on=("database",))
 async def initialize():
     """Initialize the fanfic plugin configuration."""
     try:
@@ -4,9 +4,13 @@ from typing import Dict, List, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from structlog import get_logger
 
+from src.database.indexes import IndexRegistry
+from src.database.monitoring import monitored_repository
+
 log = get_logger(__name__)
 
 
+@monitored_repository
 class FanficRepository:
     """Repository for managing fanfic data"""
 
@@ -17,8 +21,7 @@ class FanficRepository:
 
     async def create_index(self):
         """Create necessary indexes"""
-        await self.collection.create_index([("user_id", 1), ("chat_id", 1), ("timestamp", -1)])
-        await self.collection.create_index([("topic", "text")])
+        await IndexRegistry.create_indexes(self.db, "fanfics")
 
     async def save_fanfic(self, fanfic_data: Dict) -> str:
         """
@@ -110,3 +113,8 @@ class FanficRepository:
         cutoff = datetime.utcnow() - timedelta(days=days)
         result = await self.collection.delete_many({"timestamp": {"$lt": cutoff}})
         return result.deleted_count
+
+
+IndexRegistry.register_index("fanfics", [("user_id", 1), ("chat_id", 1), ("timestamp", -1)])
+IndexRegistry.register_index("fanfics", [("topic", "text")])
+IndexRegistry.register_query("fanfics", "get_user_fanfics", {"user_id": 42}, sort=[("timestamp", -1)])
@@ -7,10 +7,8 @@ from pyrogram.enums import ChatType, ParseMode
 from pyrogram.types import Message, InputMediaPhoto
 from structlog import get_logger
 
-from src.config.framework import is_vip
 from src.plugins.help import command_handler
-from src.database.client import DatabaseClient
-from src.database.repository.ratelimit_repository import RateLimitRepository
+from src.security.context import UpdateContext
 from src.database.repository.requests_repository import RequestRepository
 from src.services.falai import FalAI
 from .constants import MODEL_NAME
@@ -30,21 +28,15 @@ async def ideogram_command(client: Client, message: Message):
         if len(message.command) > 1:
             # Apply rate limiting
             user_id = message.from_user.id
-            isvip = await is_vip(user_id)
+            context = UpdateContext.of(message)
+            isvip = context.is_vip
             log.info("VIP Status", user_id=user_id, isvip=isvip)
             
             if isvip:
                 log.info("VIP bypassed rate limit for ideogram", user_id=user_id)
             else:
-                db_client = DatabaseClient.get_instance()
-                rate_limit_repo = RateLimitRepository(db_client)
-                
                 # Check if user is rate limited (15 seconds window)
-                allowed = await rate_limit_repo.check_rate_limit(
-                    user_id=user_id,
-                    operation="ideogram",
-                    window_seconds=90 
-                )
+                allowed = await context.check_rate_limit(operation="ideogram", window_seconds=90)
                 
                 if not allowed:
                     await message.reply(
@@ -3,11 +3,13 @@
 import structlog
 
 from src.plugins.imagegen.repository import ImagegenModelRepository
+from src.utils.startup import startup_step
 
 # Get the shared logger instance
 logger = structlog.get_logger()
 
 
+@startup_step("imagegen", depends_on=("database",))
 async def initialize():
     """Initialize imagegen plugin."""
     try:
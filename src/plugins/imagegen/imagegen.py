@@ -8,10 +8,8 @@ from pyrogram.enums import ChatType, ParseMode
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery, InputMediaPhoto, InputMediaDocument
 from structlog import get_logger
 
-from src.config.framework import is_vip
 from src.plugins.help import command_handler
-from src.database.client import DatabaseClient
-from src.database.repository.ratelimit_repository import RateLimitRepository
+from src.security.context import UpdateContext
 from .constants import CALLBACK_PREFIX, IMAGEGEN_DISABLED, MODEL_CALLBACK, NEGATIVE_PROMPT_CALLBACK, CFG_SCALE_CALLBACK, LORAS_CALLBACK, IMAGE_SIZE_CALLBACK, BACK_CALLBACK, IMAGE_SIZES
 from .repository import ImagegenRepository, ImagegenModelRepository
 from .service import ImagegenService
@@ -19,8 +17,6 @@ from .service import ImagegenService
 import httpx
 import re
 
-from src.utils.helpers import is_developer
-
 
 log = get_logger(__name__)
 
@@ -119,7 +115,8 @@ async def imagegen_command(client: Client, message: Message):
     """Handler for /imagegen command."""
     
     user_id = message.from_user.id
-    isvip = await is_vip(user_id)
+    context = UpdateContext.of(message)
+    isvip = context.is_vip
     log.info("VIP Status", user_id=user_id, isvip=isvip)
     if not isvip:
         await message.reply("❌ **Только VIP пользователи могут использовать эту команду**", parse_mode=ParseMode.MARKDOWN)
@@ -136,15 +133,8 @@ async def imagegen_command(client: Client, message: Message):
             
 
             
-            db_client = DatabaseClient.get_instance()
-            rate_limit_repo = RateLimitRepository(db_client)
-            
             # Check if user is rate limited (3 minutes window)
-            allowed = await rate_limit_repo.check_rate_limit(
-                user_id=user_id,
-                operation="imagegen",
-                window_seconds=60  # 1 minute
-            )
+            allowed = await context.check_rate_limit(operation="imagegen", window_seconds=60)
             
             if not allowed:
                 await message.reply(
@@ -610,7 +600,7 @@ async def handle_imagegen_callback(client: Client, callback_query: CallbackQuery
 async def add_model_command(client: Client, message: Message):
     """Handler for /add_model command."""
     
-    if not is_developer(message.from_user.id):
+    if not UpdateContext.of(message).is_developer:
         await message.reply("❌ **Только разработчик может использовать эту команду**", parse_mode=ParseMode.MARKDOWN)
         return
     
@@ -7,6 +7,8 @@ from structlog import get_logger
 
 from src.config.framework import PeerConfigModel, update_chat_setting, get_chat_setting
 from src.database.client import DatabaseClient
+from src.database.indexes import IndexRegistry
+from src.database.monitoring import monitored_repository
 from .constants import DEFAULT_CONFIG
 
 log = get_logger(__name__)
@@ -14,6 +16,7 @@ log = get_logger(__name__)
 __all__ = ["ImagegenRepository", "ImagegenModelRepository", "ImagegenRequestRepository"]
 
 
+@monitored_repository
 class ImagegenRepository:
     """Repository for handling imagegen settings in peer_config."""
 
@@ -104,6 +107,7 @@ class ImagegenRepository:
             return await ImagegenRepository.get_imagegen_config(chat_id)
 
 
+@monitored_repository
 class ImagegenModelRepository:
     """Repository for handling available models for image generation."""
 
@@ -116,8 +120,7 @@ class ImagegenModelRepository:
     async def initialize(self):
         """Initialize the repository by creating indexes."""
         try:
-            # Create unique index on id field for models
-            await self.models_collection.create_index("id", unique=True)
+            await IndexRegistry.create_indexes(self.db, "imagegen_models")
 
             log.info("ImagegenModelRepository initialized successfully")
         except Exception as e:
@@ -431,4 +434,9 @@ class ImagegenModelRepository:
             return {}
 
 # Register the imagegen_cfg parameter in the peer_config model
-PeerConfigModel.register_param(param_name="imagegen_cfg", param_type="plugin:imagegen", default=DEFAULT_CONFIG.copy(), description="Настройки генерации изображений", display_name="Настройки генерации изображений", command_name="imagegen")
\ No newline at end of file
+PeerConfigModel.register_param(param_name="imagegen_cfg", param_type="plugin:imagegen", default=DEFAULT_CONFIG.copy(), description="Настройки генерации изображений", display_name="Настройки генерации изображений", command_name="imagegen")
+
+
+# Unique index on id field for models
+IndexRegistry.register_index("imagegen_models", "id", unique=True)
+IndexRegistry.register_query("imagegen_models", "get_model_by_id", {"id": "flux"})
@@ -17,6 +17,8 @@ from src.utils.helpers import is_private_chat
 
 log = get_logger(__name__)
 MIN_MESSAGES = 10
+# Markov chains are built from message text only
+MESSAGE_PROJECTION = {"_id": 0, "text": 1, "caption": 1}
 
 
 class MarkovTextGenerator:
@@ -38,26 +40,21 @@ class MarkovTextGenerator:
 
     async def get_messages(self, chat_id: int, user_id: Optional[int] = None, username: Optional[str] = None) -> List[dict]:
         """Get messages from database based on filters"""
-        queries = []
+        # Same query for the current structure and the old structure
         if user_id:
-            queries = [{"chat.id": chat_id, "from_user.id": user_id}, {"chat_id": chat_id, "user_id": user_id}]
+            query, legacy_query = {"chat.id": chat_id, "from_user.id": user_id}, {"chat_id": chat_id, "user_id": user_id}
         elif username:
-            queries = [{"chat.id": chat_id, "from_user.username": username}, {"chat_id": chat_id, "username": username}]
+            query, legacy_query = {"chat.id": chat_id, "from_user.username": username}, {"chat_id": chat_id, "username": username}
         else:
-            queries = [
-                {"chat.id": chat_id},
-                None,  # Will use get_messages_by_chat as fallback
-            ]
-
-        for query in queries:
-            if query is None:
-                messages = await self.message_repository.get_messages_by_chat(chat_id)
-            else:
-                messages = await self.message_repository.find_messages_by_query(query)
-
-            if messages and len(messages) >= MIN_MESSAGES:
-                return messages
-        return []
+            query, legacy_query = {"chat.id": chat_id}, {"chat_id": chat_id}
+
+        messages = [message async for message in self.message_repository.iter_messages(query, MESSAGE_PROJECTION)]
+
+        # Only fall back to the old structure while legacy documents may still exist
+        if len(messages) < MIN_MESSAGES and not self.message_repository.legacy_shape_migrated:
+            messages = [message async for message in self.message_repository.iter_messages(legacy_query, MESSAGE_PROJECTION)]
+
+        return messages if len(messages) >= MIN_MESSAGES else []
 
     def extract_texts(self, messages: List[dict]) -> List[str]:
         """Extract and clean texts from messages"""
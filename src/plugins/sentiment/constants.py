@@ -14,6 +14,21 @@ MAX_TEXT_LENGTH = 150  # Maximum text length for analysis
 SENTIMENT_THRESHOLD = 0.7  # Minimum threshold for significant sentiment
 TOPIC_THRESHOLD = 0.9  # Threshold for topic relevance
 
+# Only the fields the analysis reads are fetched from the chat history
+MESSAGE_PROJECTION = {
+    "_id": 0,
+    "date": 1,
+    "text": 1,
+    "sentiment": 1,
+    "chat.type": 1,
+    "from_user.id": 1,
+    "from_user.username": 1,
+    "from_user.first_name": 1,
+    "user_id": 1,
+    "forward_from_chat.id": 1,
+    "reply_to_message.from_user.is_bot": 1,
+}
+
 # Graph settings
 GRAPH_WINDOWS = {"6h": "6h", "24h": "24h", "7d": "7d"}
 
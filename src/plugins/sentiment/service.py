@@ -12,7 +12,7 @@ from structlog import get_logger
 
 from src.database.client import DatabaseClient
 from src.database.repository.message_repository import MessageRepository
-from .constants import MIN_MESSAGES, MIN_TEXT_LENGTH, MAX_TEXT_LENGTH, SENTIMENT_THRESHOLD, TOPIC_THRESHOLD, GRAPH_WINDOWS, GRAPH_COLORS, MESSAGES
+from .constants import MESSAGE_PROJECTION, MIN_MESSAGES, MIN_TEXT_LENGTH, MAX_TEXT_LENGTH, SENTIMENT_THRESHOLD, TOPIC_THRESHOLD, GRAPH_WINDOWS, GRAPH_COLORS, MESSAGES
 
 log = get_logger(__name__)
 
@@ -86,13 +86,10 @@ class SentimentService:
             # Get repository
             message_repository = SentimentService.get_message_repository()
 
-            # Get all messages from the chat
-            raw_messages = await message_repository.get_all_messages_by_chat(chat_id)
+            # Stream the chat history, keeping only the fields the analysis needs
+            messages = [MessageWrapper(msg) async for msg in message_repository.iter_messages_by_chat(chat_id, projection=MESSAGE_PROJECTION)]
 
-            log.info(f"Retrieved {len(raw_messages)} messages for sentiment analysis in chat {chat_id}")
-
-            # Wrap raw message dictionaries with our wrapper class
-            messages = [MessageWrapper(msg) for msg in raw_messages]
+            log.info(f"Retrieved {len(messages)} messages for sentiment analysis in chat {chat_id}")
 
             # Analyze sentiment
             analysis = await SentimentService.analyze_chat_sentiment(messages)
@@ -0,0 +1,181 @@
+"""Write-behind message ingestion for the spy logger"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from structlog import get_logger
+
+from src.database.client import DatabaseClient
+from src.database.message_buffer import RecentMessageBuffer
+from src.database.repository.chat_repository import ChatRepository
+from src.database.repository.message_repository import MessageRepository
+from src.database.repository.user_repository import UserRepository
+
+log = get_logger(__name__)
+
+# Maximum number of messages waiting to be written before producers are blocked
+MAX_QUEUE_SIZE = 10000
+# Flush as soon as this many messages are buffered...
+FLUSH_BATCH_SIZE = 500
+# ...or once the oldest buffered message has waited this many seconds
+FLUSH_INTERVAL_SECONDS = 1.0
+
+
+class MessageIngestionQueue:
+    """
+    Bounded queue that buffers incoming messages and writes them in batches.
+
+    Handlers enqueue documents instead of awaiting a database round trip. A background
+    task flushes the buffer with a single unordered insert_many whenever FLUSH_BATCH_SIZE
+    messages are waiting or FLUSH_INTERVAL_SECONDS have passed. When the queue is full,
+    put() waits for space, which slows down producers instead of dropping messages.
+    After each write, the chat registry and the users directory are updated with one
+    upsert per chat and per user in the batch. Accepted messages are also kept in the
+    RecentMessageBuffer so recent history can be read back without the database.
+    """
+
+    _instance = None
+
+    def __init__(self, repository: MessageRepository, chat_repository: Optional[ChatRepository] = None, user_repository: Optional[UserRepository] = None, max_size: int = MAX_QUEUE_SIZE, batch_size: int = FLUSH_BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL_SECONDS):
+        self.repository = repository
+        self.chat_repository = chat_repository
+        self.user_repository = user_repository
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._batch: List[Dict] = []
+
+        # Flush statistics
+        self._batches_flushed = 0
+        self._documents_flushed = 0
+        self._documents_failed = 0
+        self._total_flush_latency = 0.0
+        self._last_flush_latency = 0.0
+        self._max_flush_latency = 0.0
+
+    @classmethod
+    def get_instance(cls) -> "MessageIngestionQueue":
+        """Get the shared ingestion queue, creating it on first use."""
+        if cls._instance is None:
+            db_client = DatabaseClient.get_instance()
+            cls._instance = cls(MessageRepository(db_client.client), ChatRepository(db_client.client), UserRepository(db_client.client))
+        return cls._instance
+
+    @classmethod
+    async def shutdown(cls):
+        """Drain the shared ingestion queue if it was ever started."""
+        if cls._instance is not None:
+            await cls._instance.stop()
+
+    def start(self):
+        """Start the background flush task if it is not running yet."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def put(self, message_data: Dict):
+        """
+        Enqueue a message document for writing.
+
+        Waits for free space when the queue is full.
+
+        Args:
+            message_data: Dictionary containing message information
+        """
+        self.start()
+        await self._queue.put(message_data)
+        RecentMessageBuffer.get_instance().add(message_data)
+
+    async def stop(self):
+        """Stop the flush task and write everything that is still buffered."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        # Let a batch that was being written when we cancelled finish
+        if self._inflight is not None and not self._inflight.done():
+            await self._inflight
+
+        while not self._queue.empty():
+            self._batch.append(self._queue.get_nowait())
+
+        while self._batch:
+            batch, self._batch = self._batch[: self.batch_size], self._batch[self.batch_size :]
+            await self._flush(batch)
+
+        log.info("Message ingestion queue drained", **self.get_stats())
+
+    async def _run(self):
+        """Collect messages into batches and flush them on size or time thresholds."""
+        loop = asyncio.get_running_loop()
+        while True:
+            self._batch.append(await self._queue.get())
+            deadline = loop.time() + self.flush_interval
+
+            while len(self._batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            batch, self._batch = self._batch, []
+            # Shield the write so cancelling the worker never loses a batch that is already in flight
+            self._inflight = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._inflight)
+
+    async def _flush(self, batch: List[Dict]):
+        """Write a batch of messages and record its latency."""
+        started = time.perf_counter()
+        try:
+            inserted = await self.repository.insert_messages(batch)
+        except Exception as e:
+            log.error("Failed to flush message batch", error=str(e), batch_size=len(batch))
+            inserted = 0
+
+        if inserted and self.chat_repository is not None:
+            try:
+                await self.chat_repository.record_messages(batch)
+            except Exception as e:
+                log.error("Failed to update chat registry", error=str(e), batch_size=len(batch))
+        if inserted and self.user_repository is not None:
+            try:
+                await self.user_repository.record_messages(batch)
+            except Exception as e:
+                log.error("Failed to update users directory", error=str(e), batch_size=len(batch))
+
+        latency = time.perf_counter() - started
+        self._batches_flushed += 1
+        self._documents_flushed += inserted
+        self._documents_failed += len(batch) - inserted
+        self._total_flush_latency += latency
+        self._last_flush_latency = latency
+        self._max_flush_latency = max(self._max_flush_latency, latency)
+
+    def get_stats(self) -> Dict:
+        """
+        Get queue depth and flush statistics.
+
+        Returns:
+            Dictionary with queue depth, document counters and flush latencies in milliseconds
+        """
+        avg_latency = self._total_flush_latency / self._batches_flushed if self._batches_flushed else 0.0
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "buffered": len(self._batch),
+            "batches_flushed": self._batches_flushed,
+            "documents_flushed": self._documents_flushed,
+            "documents_failed": self._documents_failed,
+            "last_flush_latency_ms": round(self._last_flush_latency * 1000, 3),
+            "avg_flush_latency_ms": round(avg_latency * 1000, 3),
+            "max_flush_latency_ms": round(self._max_flush_latency * 1000, 3),
+        }
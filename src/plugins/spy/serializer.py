@@ -0,0 +1,106 @@
+"""Direct conversion of pyrogram objects into BSON-ready documents"""
+
+import re
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict
+
+# Deliberately left out: raw TL objects are not serializable and not worth storing.
+# pyrogram's own JSON output does include them, so documents differ from it there
+HIDDEN_ATTRIBUTES = frozenset({"raw"})
+# Attributes that pyrogram masks in its own JSON representation
+MASKED_ATTRIBUTES = {"phone_number": "*" * 9}
+
+# Converter per concrete value type, resolved on first sight
+_converters: Dict[type, Callable[[Any], Any]] = {}
+# Per pyrogram type: attribute name -> whether it belongs in the document
+_field_maps: Dict[type, Dict[str, bool]] = {}
+
+
+def to_document(obj: Any) -> Any:
+    """
+    Convert a pyrogram object graph into plain dicts, lists and scalars in a single pass.
+
+    The result matches ``json.loads(str(obj))`` apart from HIDDEN_ATTRIBUTES, which are
+    left out: objects become dicts tagged with their class name under "_", private and
+    None attributes are skipped, enums and datetimes become their string form and phone
+    numbers are masked.
+
+    Args:
+        obj: A pyrogram object (usually a Message)
+
+    Returns:
+        The document ready to be stored in MongoDB
+    """
+    converter = _converters.get(type(obj))
+    if converter is None:
+        converter = _converters[type(obj)] = _resolve_converter(type(obj))
+    return converter(obj)
+
+
+def _resolve_converter(value_type: type) -> Callable[[Any], Any]:
+    """Pick the conversion for a type, following the same precedence as json.dumps."""
+    if value_type in (str, int, float, bool, type(None)):
+        return _identity
+    if issubclass(value_type, str):
+        return str.__str__
+    if issubclass(value_type, bool):
+        return bool
+    if issubclass(value_type, int):
+        return int
+    if issubclass(value_type, float):
+        return float
+    if issubclass(value_type, (list, tuple)):
+        return _convert_sequence
+    if issubclass(value_type, dict):
+        return _convert_mapping
+    # Everything below is what pyrogram's Object.default handles
+    if issubclass(value_type, (bytes, re.Match)):
+        return repr
+    if issubclass(value_type, (Enum, datetime)):
+        return str
+    return _convert_object
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _convert_sequence(value) -> list:
+    return [to_document(item) for item in value]
+
+
+def _convert_mapping(value: dict) -> dict:
+    return {_convert_key(key): to_document(item) for key, item in value.items()}
+
+
+def _convert_key(key: Any) -> str:
+    """Convert a mapping key the way json.dumps does."""
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    return repr(key) if isinstance(key, float) else str(int(key))
+
+
+def _convert_object(obj: Any) -> dict:
+    """Convert a pyrogram object using its cached field map."""
+    obj_type = type(obj)
+    fields = _field_maps.get(obj_type)
+    if fields is None:
+        fields = _field_maps[obj_type] = {}
+
+    document = {"_": obj_type.__name__}
+    for name, value in obj.__dict__.items():
+        include = fields.get(name)
+        if include is None:
+            # Attributes can be attached after construction (e.g. Message.command), so the map grows lazily
+            include = fields[name] = not name.startswith("_") and name not in HIDDEN_ATTRIBUTES
+        if not include or value is None:
+            continue
+        document[name] = MASKED_ATTRIBUTES[name] if name in MASKED_ATTRIBUTES else to_document(value)
+    return document
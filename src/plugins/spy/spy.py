@@ -1,20 +1,20 @@
-import json
 from datetime import datetime, timezone
 
 from pyrogram import Client, filters
 from pyrogram.enums import ChatType
 from structlog import get_logger
 
-from src.database.client import DatabaseClient
-from src.database.repository.message_repository import MessageRepository
+from src.database.message_schema import slim_document
+from .ingestion import MessageIngestionQueue
+from .serializer import to_document
 
 # Get the shared logger instance
 log = get_logger(__name__)
 
 
-def serialize(obj: str) -> dict:
-    """Serialize objects to JSON with caching."""
-    return json.loads(str(obj))
+def serialize(obj) -> dict:
+    """Convert a pyrogram object into a database document in a single pass."""
+    return to_document(obj)
 
 
 def get_user_identifier(message) -> str:
@@ -47,25 +47,17 @@ def get_message_content(message) -> str:
 async def message(client: Client, message):
     """Log all incoming messages to the database."""
     try:
-        # Use shared database instance
-        db_client = DatabaseClient.get_instance()
-
-        # Initialize repositories
-        message_repo = MessageRepository(db_client.client)
-
-        # Prepare message data with created_at
+        # Prepare message data with created_at; stored slim, with the full dump compressed under "raw"
         message_data = serialize(message)
         message_data["created_at"] = datetime.now(timezone.utc)
+        message_data = slim_document(message_data)
 
-        # Store message
-        await message_repo.insert_message(message_data)
+        # Queue message for a batched write instead of waiting on the database
+        await MessageIngestionQueue.get_instance().put(message_data)
 
-        # Build logging data
-        user_identifier = get_user_identifier(message)
-        msg_content = get_message_content(message)
+        # Structured fields are rendered by the logging thread; high volume lines are sampled
         chat_title = "DM" if message.chat.type == ChatType.PRIVATE else message.chat.title
-
-        log.info(f"[{chat_title}] [{message.chat.id}] [{user_identifier}] [{message.from_user.id if message.from_user else 'N/A'}]: {msg_content}", message_id=message.id, chat_id=message.chat.id, message_type=type(message).__name__)
+        log.info("Message received", chat=chat_title, chat_id=message.chat.id, user=get_user_identifier(message), user_id=message.from_user.id if message.from_user else None, content=get_message_content(message), message_id=message.id)
 
     except Exception as e:
         log.error("Error logging message", error=str(e), message_id=getattr(message, "id", None))
@@ -9,7 +9,9 @@ from pyrogram.enums import ParseMode
 from structlog import get_logger
 
 from src.database.client import DatabaseClient
+from src.database.message_buffer import RecentMessageBuffer
 from src.database.repository.bot_config_repository import BotConfigRepository
+from src.database.repository.chat_repository import ChatRepository
 from src.database.repository.message_repository import MessageRepository
 from src.database.repository.peer_config_repository import PeerConfigRepository
 from src.services.openrouter import OpenRouter
@@ -31,6 +33,24 @@ MESSAGE_TYPES = {
     "video_note": lambda m: "[ВИДЕОКРУГ]",
     "voice": lambda m: "[ГОЛОСОВОЕ]",
 }
+# Fields _format_message reads; media types only need to be present
+MESSAGE_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "created_at": 1,
+    "text": 1,
+    "caption": 1,
+    "from_user.first_name": 1,
+    "from_user.last_name": 1,
+    "from_user.username": 1,
+    "photo.file_unique_id": 1,
+    "sticker.file_unique_id": 1,
+    "video_note.file_unique_id": 1,
+    "voice.file_unique_id": 1,
+    "forwards": 1,
+    "views": 1,
+    "forward_from_message_id": 1,
+}
 
 
 class InsufficientDataError(Exception):
@@ -67,7 +87,8 @@ class SummaryJob:
         # Get database client for config repository
         db_client = DatabaseClient.get_instance()
         self.config_repo = BotConfigRepository(db_client)
-        self.config_repo = BotConfigRepository(db_client)
+        # Chat discovery, titles and daily message counts
+        self.chat_repository = ChatRepository(db_client.client)
 
         # These will be loaded from config in async init
         self.system_prompt = ""
@@ -220,8 +241,13 @@ class SummaryJob:
             start_date_utc = start_date.astimezone(pytz.UTC)
             end_date_utc = end_date.astimezone(pytz.UTC)
 
-            # Get messages within the date range for specific chat
-            messages = await self.message_repository.get_messages_by_date_range(start_date=start_date_utc, end_date=end_date_utc, chat_id=chat_id, exclude_commands=True, exclude_bots=True)
+            # Served from memory when this process saw the whole day, otherwise from the database
+            messages = RecentMessageBuffer.get_instance().get_messages_by_date_range(start_date=start_date_utc, end_date=end_date_utc, chat_id=chat_id, exclude_commands=True, exclude_bots=True)
+            if messages is not None:
+                log.info("Messages fetched from buffer", chat_id=chat_id, date=date_str, message_count=len(messages))
+                return messages
+
+            messages = [message async for message in self.message_repository.iter_messages_by_date_range(start_date=start_date_utc, end_date=end_date_utc, chat_id=chat_id, exclude_commands=True, exclude_bots=True, projection=MESSAGE_PROJECTION)]
             log.info("Messages fetched", chat_id=chat_id, date=date_str, message_count=len(messages))
 
             return messages
@@ -241,6 +267,9 @@ class SummaryJob:
             return_text: Whether to return the formatted summary text (for sending to chat)
         """
         try:
+            # Served from the shared bot config cache, so edits apply without a restart
+            await self.initialize_config()
+
             date_str = date.strftime("%Y-%m-%d")
 
             messages = await self.get_messages_for_date(chat_id, date)
@@ -344,27 +373,32 @@ class SummaryJob:
 
             log.info("Starting daily summary generation", date=date_str)
 
+            await self.initialize_config()
+            day_start = MOSCOW_TZ.localize(datetime.combine(yesterday.date(), datetime.min.time()))
+
             # Determine which chats to process based on DEBUG setting
             if DEBUG:
                 # Only process the specific debug chat ID in debug mode
-                chat_ids = [DEBUG_CHAT_ID]
+                chats = [await self.chat_repository.get_chat(DEBUG_CHAT_ID) or {"chat_id": DEBUG_CHAT_ID}]
                 log.info("Processing debug chat only (DEBUG=True)", chat_id=DEBUG_CHAT_ID)
             else:
-                # Get all non-private chats in normal mode
-                # First get all distinct chat documents with their type
-                pipeline = [
-                    {"$match": {"chat.type": {"$ne": "ChatType.PRIVATE"}}},  # Exclude private chats
-                    {"$group": {"_id": "$chat.id"}},
-                ]
-                result = await self.message_repository.aggregate_messages(pipeline)
-                chat_ids = [doc["_id"] for doc in result]
-                log.info("Processing all non-private chats (DEBUG=False)", chat_count=len(chat_ids))
+                # Non-private chats from the chat registry that were active since the start of yesterday
+                chats = await self.chat_repository.get_active_chats(since=day_start.astimezone(pytz.UTC))
+                log.info("Processing all non-private chats (DEBUG=False)", chat_count=len(chats))
 
             processed_count = 0
             enabled_count = 0
+            day_key = ChatRepository.day_key(day_start)
 
-            for chat_id in chat_ids:
+            for chat in chats:
+                chat_id = chat["chat_id"]
                 try:
+                    # The registry counts every logged message, so a chat below the threshold here can be skipped without fetching
+                    message_count = chat.get("message_counts", {}).get(day_key, 0)
+                    if not DEBUG and message_count < self.min_messages_threshold:
+                        log.debug("Skipping summary: not enough messages", chat_id=chat_id, message_count=message_count, threshold=self.min_messages_threshold)
+                        continue
+
                     # Check if summarization is enabled for this chat using the framework
                     from src.config.framework import get_chat_setting
 
@@ -377,9 +411,7 @@ class SummaryJob:
                     else:
                         log.info("Summary disabled for chat (processing only)", chat_id=chat_id)
 
-                    # Get chat title from any message
-                    chat_msg = await self.message_repository.find_one_message_by_chat_id(chat_id)
-                    chat_title = chat_msg["chat"].get("title", str(chat_id)) if chat_msg else str(chat_id)
+                    chat_title = chat.get("title") or str(chat_id)
 
                     # Generate summary for this chat
                     # Only return text for sending if summary is enabled
@@ -403,7 +435,7 @@ class SummaryJob:
                     log.error("Error processing chat", error=str(e), chat_id=chat_id)
                     continue
 
-            log.info("Daily summary generation completed", total_chats=len(chat_ids), enabled_chats=enabled_count, processed_chats=processed_count, date=date_str)
+            log.info("Daily summary generation completed", total_chats=len(chats), enabled_chats=enabled_count, processed_chats=processed_count, date=date_str)
 
         except Exception as e:
             log.error("Error in daily summary generation", error=str(e))
@@ -7,9 +7,13 @@ from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
 from structlog import get_logger
 
+from src.database.indexes import IndexRegistry
+from src.database.monitoring import monitored_repository
+
 log = get_logger(__name__)
 
 
+@monitored_repository
 class SummaryRepository:
     """Repository for managing chat summaries data"""
 
@@ -20,9 +24,7 @@ class SummaryRepository:
 
     async def create_indexes(self):
         """Create necessary indexes for efficient querying"""
-        await self.summaries.create_index([("chat_id", 1)])
-        await self.summaries.create_index([("generated_at", -1)])
-        await self.summaries.create_index([("chat_id", 1), ("generated_at", -1)])
+        await IndexRegistry.create_indexes(self.db, "summaries")
         log.info("Created indexes for summaries collection")
 
     async def store_summary(self, chat_id: int, chat_title: str, summary_date: datetime, themes: List[Dict], message_count: int) -> str:
@@ -151,3 +153,10 @@ class SummaryRepository:
         except Exception as e:
             log.error("Error deleting summary", error=str(e), summary_id=summary_id)
             return False
+
+
+IndexRegistry.register_index("summaries", [("chat_id", 1)])
+IndexRegistry.register_index("summaries", [("generated_at", -1)])
+IndexRegistry.register_index("summaries", [("chat_id", 1), ("generated_at", -1)])
+IndexRegistry.register_query("summaries", "get_summaries_by_chat", {"chat_id": -1001}, sort=[("generated_at", -1)])
+IndexRegistry.register_query("summaries", "get_summaries_by_date_range", {"chat_id": -1001, "summary_date": {"$gte": datetime(2025, 1, 1), "$lte": datetime(2025, 1, 31)}}, sort=[("summary_date", 1)])
@@ -1,15 +1,27 @@
+import time
+
 import structlog
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
 
 from src.database.client import DatabaseClient
 from src.plugins.tanks.repository import TanksRepository
 from src.plugins.tanks.service import TankService
+from src.plugins.tanks.index import TankIndex
+from src.utils.snapshot import CacheSnapshot
+from src.utils.startup import startup_step
 
 # Get the shared logger instance
 logger = structlog.get_logger()
 
+# How often the catalogue is refetched from tanks.gg
+TANKS_REFRESH_INTERVAL_HOURS = 6
 
-async def init_tanks():
-    """Initialize tanks plugin and sync data."""
+_scheduler = None
+
+
+async def refresh_tanks():
+    """Sync the tank catalogue; unchanged catalogues are skipped."""
     try:
         # Get shared database instance
         db_client = DatabaseClient.get_instance()
@@ -20,10 +32,42 @@ async def init_tanks():
 
         # Sync tanks
         synced_count = await tank_service.sync_tanks(clear_existing=False)
-        logger.info("Initial tank sync completed", count=synced_count)
+        logger.info("Tank sync completed", count=synced_count)
     except Exception as e:
-        logger.error("Failed initial tank sync", error=str(e))
+        logger.error("Failed tank sync", error=str(e))
+
+
+@startup_step("tanks", depends_on=("database",), background=True)
+async def init_tanks():
+    """Initialize tanks plugin, sync data and schedule periodic refreshes."""
+    global _scheduler
+
+    await refresh_tanks()
+
+    if _scheduler is None:
+        _scheduler = AsyncIOScheduler()
+        _scheduler.add_job(refresh_tanks, IntervalTrigger(hours=TANKS_REFRESH_INTERVAL_HOURS), id="tanks_refresh", replace_existing=True)
+        _scheduler.start()
+        logger.info("Tank refresh scheduled", interval_hours=TANKS_REFRESH_INTERVAL_HOURS)
+
+
+def dump_index():
+    """Snapshot the catalogue index as a single entry."""
+    index = TankService.get_index()
+    if len(index):
+        yield index.version, index.tanks, time.monotonic() - index.built_at
+
+
+def restore_index(entries) -> int:
+    """Swap in a catalogue restored from a snapshot unless a sync already loaded one."""
+    if not entries or len(TankService.get_index()):
+        return 0
+    version, tanks, age = entries[-1]
+    TankService.index = TankIndex(tanks, version=version, age=age)
+    return len(tanks)
+
 
+CacheSnapshot.register("tanks", dump_index, restore_index, ttl=TANKS_REFRESH_INTERVAL_HOURS * 3600)
 
 # Export the initialization function
 __all__ = ["init_tanks"]
@@ -0,0 +1,139 @@
+"""In-memory index of the tank catalogue"""
+
+import bisect
+import random
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+# Minimum share of query trigrams a name must contain to count as a fuzzy match
+FUZZY_MATCH_THRESHOLD = 0.5
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase a tank name, fold ё into е and collapse punctuation into single spaces."""
+    return _NON_WORD.sub(" ", name.casefold().replace("ё", "е")).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Get the trigrams of a normalized string, padded so short words still produce some."""
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TankIndex:
+    """
+    Immutable snapshot of the tank catalogue with the lookups the /tanks command needs.
+
+    Tanks are bucketed by tier and nation, random picks index straight into a list and
+    names are searchable by exact match, word prefix, substring and trigram similarity.
+    A new snapshot is built after every sync and swapped in whole, so readers never
+    see a half-built index.
+    """
+
+    def __init__(self, tanks: List[Dict], version: int = 0, age: float = 0.0):
+        self.version = version
+        self.tanks = tanks
+        # Monotonic time the catalogue was loaded; age carries over restored snapshots
+        self.built_at = time.monotonic() - age
+        self.by_tier: Dict[int, List[Dict]] = defaultdict(list)
+        self.by_nation: Dict[str, List[Dict]] = defaultdict(list)
+        # Normalized name and short name per tank position
+        self._names: List[Tuple[str, ...]] = []
+        self._exact: Dict[str, int] = {}
+        # Sorted (word, position) pairs for prefix lookups
+        self._words: List[Tuple[str, int]] = []
+        self._trigrams: Dict[str, Set[int]] = defaultdict(set)
+
+        for position, tank in enumerate(tanks):
+            self.by_tier[tank.get("tier", 0)].append(tank)
+            self.by_nation[tank.get("nation")].append(tank)
+
+            names = tuple(dict.fromkeys(normalize_name(value) for value in (tank.get("name"), tank.get("short_name")) if value))
+            self._names.append(names)
+            for name in names:
+                self._exact.setdefault(name, position)
+                self._words.extend((word, position) for word in name.split())
+                for trigram in trigrams(name):
+                    self._trigrams[trigram].add(position)
+
+        self._words.sort()
+
+    def __len__(self) -> int:
+        return len(self.tanks)
+
+    def random(self) -> Optional[Dict]:
+        """Get a random tank."""
+        return random.choice(self.tanks) if self.tanks else None
+
+    def get_by_tier(self, tier: int) -> List[Dict]:
+        """Get all tanks of a tier."""
+        return self.by_tier.get(tier, [])
+
+    def get_by_nation(self, nation: str) -> List[Dict]:
+        """Get all tanks of a nation."""
+        return self.by_nation.get(nation, [])
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Search tanks by name or short name.
+
+        Results are ordered by match quality: exact name, word prefix, substring,
+        then fuzzy trigram matches for misspelled queries.
+
+        Args:
+            query: User supplied search text
+            limit: Maximum number of tanks to return
+
+        Returns:
+            List[Dict]: Matching tanks, best match first
+        """
+        query = normalize_name(query)
+        if not query:
+            return []
+
+        ranked: List[int] = []
+        seen: Set[int] = set()
+
+        def add(positions):
+            for position in positions:
+                if position not in seen:
+                    seen.add(position)
+                    ranked.append(position)
+
+        if query in self._exact:
+            add([self._exact[query]])
+
+        # Every query word must be the prefix of some word in the name
+        first, *rest = query.split()
+        start = bisect.bisect_left(self._words, (first, -1))
+        prefixed = []
+        for word, position in self._words[start:]:
+            if not word.startswith(first):
+                break
+            if all(any(other.startswith(part) for name in self._names[position] for other in name.split()) for part in rest):
+                prefixed.append(position)
+        add(sorted(prefixed))
+
+        # Substring matches, with trigrams narrowing the candidates
+        query_trigrams = trigrams(query)
+        if len(query) >= 3:
+            inner = {query[i : i + 3] for i in range(len(query) - 2)}
+            candidates = set.intersection(*(self._trigrams.get(trigram, set()) for trigram in inner))
+        else:
+            candidates = range(len(self.tanks))
+        add(sorted(position for position in candidates if any(query in name for name in self._names[position])))
+
+        # Fuzzy matches only when nothing matched literally
+        if not ranked:
+            scores: Dict[int, int] = defaultdict(int)
+            for trigram in query_trigrams:
+                for position in self._trigrams.get(trigram, ()):
+                    scores[position] += 1
+            threshold = FUZZY_MATCH_THRESHOLD * len(query_trigrams)
+            add(position for position, score in sorted(scores.items(), key=lambda item: (-item[1], item[0])) if score >= threshold)
+
+        return [self.tanks[position] for position in ranked[:limit]]
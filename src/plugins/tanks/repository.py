@@ -1,12 +1,23 @@
+from datetime import datetime
 from typing import Dict, List, Optional
 
+from pymongo import DeleteMany, UpdateOne
 
+from src.database.indexes import IndexRegistry
+from src.database.monitoring import monitored_repository
+
+# Document in the sync_state collection holding the last synced catalogue hash
+SYNC_STATE_ID = "tanks"
+
+
+@monitored_repository
 class TanksRepository:
     """Repository for managing tank data"""
 
     def __init__(self, db):
         self.db = db["nexus"]
         self.collection = self.db["tanks"]
+        self.sync_state = self.db["sync_state"]
 
     async def get_random_tank(self) -> Optional[Dict]:
         """Get a random tank from the collection."""
@@ -43,6 +54,42 @@ class TanksRepository:
         )
         return tank_data["tank_id"]
 
+    async def sync_tanks(self, tanks: List[Dict]) -> Dict[str, int]:
+        """
+        Bring the collection in line with a fetched catalogue in a single unordered bulk write.
+
+        Tanks whose content_hash is unchanged are left alone, new and changed tanks are
+        upserted and tanks missing from the catalogue are deleted.
+
+        Args:
+            tanks: Formatted tank documents, each with a content_hash
+
+        Returns:
+            Dict[str, int]: Counts of inserted, updated, deleted and unchanged tanks
+        """
+        cursor = self.collection.find({}, {"_id": 0, "tank_id": 1, "content_hash": 1})
+        existing = {doc["tank_id"]: doc.get("content_hash") async for doc in cursor}
+
+        operations = [UpdateOne({"tank_id": tank["tank_id"]}, {"$set": tank}, upsert=True) for tank in tanks if existing.get(tank["tank_id"]) != tank["content_hash"]]
+        fetched_ids = [tank["tank_id"] for tank in tanks]
+        if set(existing) - set(fetched_ids):
+            operations.append(DeleteMany({"tank_id": {"$nin": fetched_ids}}))
+
+        counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": len(tanks) - sum(isinstance(op, UpdateOne) for op in operations)}
+        if operations:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            counts.update(inserted=result.upserted_count, updated=result.modified_count, deleted=result.deleted_count)
+        return counts
+
+    async def get_catalogue_hash(self) -> Optional[str]:
+        """Get the payload hash of the last synced catalogue."""
+        state = await self.sync_state.find_one({"_id": SYNC_STATE_ID})
+        return state.get("payload_hash") if state else None
+
+    async def set_catalogue_hash(self, payload_hash: str, count: int):
+        """Record the payload hash of a synced catalogue."""
+        await self.sync_state.update_one({"_id": SYNC_STATE_ID}, {"$set": {"payload_hash": payload_hash, "count": count, "synced_at": datetime.utcnow()}}, upsert=True)
+
     async def get_tank_by_id(self, tank_id: str) -> Optional[Dict]:
         """
         Get a tank by its ID.
@@ -101,3 +148,10 @@ class TanksRepository:
         """
         result = await self.collection.delete_many({})
         return result.deleted_count
+
+
+IndexRegistry.register_index("tanks", "tank_id")
+IndexRegistry.register_index("tanks", "tier")
+IndexRegistry.register_query("tanks", "upsert_tank", {"tank_id": 1})
+IndexRegistry.register_query("tanks", "sync_tanks", {"tank_id": {"$nin": [1, 2]}})
+IndexRegistry.register_query("tanks", "get_tanks_by_tier", {"tier": 8})
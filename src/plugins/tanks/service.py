@@ -1,9 +1,11 @@
+import hashlib
 import json
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 import httpx
 from structlog import get_logger
 
+from src.plugins.tanks.index import TankIndex
 from src.plugins.tanks.repository import TanksRepository
 
 # Get the shared logger instance
@@ -14,16 +16,29 @@ TANK_IMAGE_URL = "https://assets.tanks.gg/icons/ru-tanks/standard/{country}-{tan
 
 
 class TankService:
+    # Process-wide snapshot of the catalogue, replaced after every sync that changes it
+    index = TankIndex([])
+
     def __init__(self, repository: TanksRepository):
         self.repository = repository
         self.http_client = httpx.AsyncClient()
 
     async def fetch_tanks(self) -> List[Dict]:
         """Fetch tanks data from the API."""
+        tanks, _ = await self.fetch_catalogue()
+        return tanks
+
+    async def fetch_catalogue(self) -> Tuple[List[Dict], str]:
+        """Fetch tanks data from the API along with a hash of the raw payload."""
         response = await self.http_client.get(API_URL)
         response.raise_for_status()
         data = response.json()
-        return data.get("tanks", [])
+        return data.get("tanks", []), hashlib.sha256(response.content).hexdigest()
+
+    @staticmethod
+    def hash_tank(tank: Dict) -> str:
+        """Hash a formatted tank so unchanged tanks can be skipped when syncing."""
+        return hashlib.sha256(json.dumps(tank, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
 
     def format_tank_data(self, tank: Dict) -> Dict:
         """Format tank data and add image URL."""
@@ -50,6 +65,18 @@ class TankService:
             "image_url": TANK_IMAGE_URL.format(country=tank.get("nation", "unknown").lower(), tank_id=tank["id"]),
         }
 
+    @classmethod
+    def get_index(cls) -> TankIndex:
+        """Get the current catalogue index; empty until the first sync has loaded it."""
+        return cls.index
+
+    async def refresh_index(self) -> TankIndex:
+        """Rebuild the in-memory index from the database and swap it in."""
+        tanks = await self.repository.get_all_tanks()
+        TankService.index = TankIndex(tanks, version=TankService.index.version + 1)
+        log.info("Tank index rebuilt", version=TankService.index.version, count=len(tanks))
+        return TankService.index
+
     async def clear_tanks(self):
         """Clear all tanks from the database."""
         try:
@@ -63,11 +90,15 @@ class TankService:
         """
         Fetch tanks from API and sync to database.
 
+        The sync is skipped when the fetched payload is identical to the last synced one.
+        Otherwise only new and changed tanks are written and tanks that disappeared from
+        the catalogue are deleted, all in one bulk write.
+
         Args:
             clear_existing: If True, clear all existing tanks before syncing
 
         Returns:
-            int: Number of tanks synced
+            int: Number of tanks written
         """
         try:
             # Optionally clear existing tanks
@@ -75,25 +106,44 @@ class TankService:
                 await self.clear_tanks()
 
             # Fetch tanks from API
-            tanks_data = await self.fetch_tanks()
+            tanks_data, payload_hash = await self.fetch_catalogue()
+            if not tanks_data:
+                # Never wipe the catalogue because of an empty or broken response
+                log.warning("Tank API returned no tanks, keeping existing catalogue")
+                await self._ensure_index()
+                return 0
+
+            if not clear_existing and payload_hash == await self.repository.get_catalogue_hash():
+                log.info("Tank catalogue unchanged, skipping sync", count=len(tanks_data))
+                await self._ensure_index()
+                return 0
 
             # Format tank data
             formatted_tanks = [self.format_tank_data(tank) for tank in tanks_data]
-
-            # Save each tank to repository
-            count = 0
             for tank in formatted_tanks:
-                try:
-                    await self.repository.upsert_tank(tank)
-                    count += 1
-                except Exception as e:
-                    log.error("Failed to save tank", tank_id=tank["tank_id"], error=str(e))
+                tank["content_hash"] = self.hash_tank(tank)
+
+            counts = await self.repository.sync_tanks(formatted_tanks)
+            await self.repository.set_catalogue_hash(payload_hash, len(formatted_tanks))
 
-            log.info(f"Successfully synced {count} tanks")
-            return count
+            log.info("Successfully synced tanks", **counts)
+
+            if clear_existing or counts["inserted"] or counts["updated"] or counts["deleted"] or not len(TankService.index):
+                await self.refresh_index()
+            return counts["inserted"] + counts["updated"]
 
         except Exception as e:
             log.error("Failed to sync tanks", error=str(e))
+            # Serve whatever is stored if the API is unreachable
+            await self._ensure_index()
             raise
         finally:
             await self.http_client.aclose()
+
+    async def _ensure_index(self):
+        """Load the index from the database if no sync has loaded it yet."""
+        if not len(TankService.index):
+            try:
+                await self.refresh_index()
+            except Exception as e:
+                log.error("Failed to load tank index", error=str(e))
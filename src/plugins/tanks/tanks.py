@@ -8,6 +8,7 @@ from structlog import get_logger
 from src.database.client import DatabaseClient
 from src.plugins.help import command_handler
 from src.plugins.tanks.repository import TanksRepository
+from src.plugins.tanks.service import TankService
 
 log = get_logger(__name__)
 
@@ -32,16 +33,16 @@ async def retrieve_tanks(client: Client, message: Message):
     - /tanks <name> -> search tank by name
     """
     try:
-        # Get database instance and initialize repository
-        db = DatabaseClient.get_instance()
-        repository = TanksRepository(db.client)
+        # Answer from the in-memory index; fall back to the database until the first sync has loaded it
+        index = TankService.get_index()
+        repository = None if len(index) else TanksRepository(DatabaseClient.get_instance().client)
 
         # Get command arguments
         args = message.command[1:]
 
         # Case 1: No arguments - return random tank
         if not args:
-            tank = await repository.get_random_tank()
+            tank = index.random() if repository is None else await repository.get_random_tank()
             if not tank:
                 await message.reply(TANK_NOT_FOUND_MESSAGE)
                 return
@@ -54,7 +55,7 @@ async def retrieve_tanks(client: Client, message: Message):
                 await message.reply(TANK_INVALID_TIER_MESSAGE)
                 return
 
-            tanks = await repository.get_tanks_by_tier(tier)
+            tanks = index.get_by_tier(tier) if repository is None else await repository.get_tanks_by_tier(tier)
             if not tanks:
                 await message.reply(TANK_NOT_FOUND_MESSAGE)
                 return
@@ -65,7 +66,7 @@ async def retrieve_tanks(client: Client, message: Message):
 
         # Case 3: Text argument - search tank by name
         search_query = " ".join(args)
-        tanks = await repository.search_tanks_by_name(search_query)
+        tanks = index.search(search_query) if repository is None else await repository.search_tanks_by_name(search_query)
 
         if not tanks:
             await message.reply("Не нашёл такого танка")
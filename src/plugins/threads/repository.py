@@ -4,9 +4,13 @@ from typing import Dict, List, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from structlog import get_logger
 
+from src.database.indexes import IndexRegistry
+from src.database.monitoring import monitored_repository
+
 log = get_logger(__name__)
 
 
+@monitored_repository
 class ThreadsRepository:
     """Repository for managing thread data"""
 
@@ -17,9 +21,7 @@ class ThreadsRepository:
 
     async def create_index(self):
         """Create necessary indexes"""
-        await self.collection.create_index([("user_id", 1), ("chat_id", 1), ("timestamp", -1)])
-        await self.collection.create_index([("command", 1)])
-        await self.collection.create_index([("theme", "text")])
+        await IndexRegistry.create_indexes(self.db, "threads")
 
     async def save_thread(self, thread_data: Dict) -> str:
         """
@@ -141,3 +143,10 @@ class ThreadsRepository:
         cutoff = datetime.utcnow() - timedelta(days=days)
         result = await self.collection.delete_many({"timestamp": {"$lt": cutoff}})
         return result.deleted_count
+
+
+IndexRegistry.register_index("threads", [("user_id", 1), ("chat_id", 1), ("timestamp", -1)])
+IndexRegistry.register_index("threads", [("command", 1)])
+IndexRegistry.register_index("threads", [("theme", "text")])
+IndexRegistry.register_query("threads", "get_user_threads", {"user_id": 42}, sort=[("timestamp", -1)])
+IndexRegistry.register_query("threads", "get_threads_by_command", {"command": "bugurt"}, sort=[("timestamp", -1)])
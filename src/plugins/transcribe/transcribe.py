@@ -5,7 +5,7 @@ from pyrogram.enums import ChatType, ParseMode
 from pyrogram.types import Message
 from structlog import get_logger
 
-from src.config.framework import get_chat_setting
+from src.security.context import UpdateContext
 from src.security.rate_limiter import rate_limit
 from src.services.falai import FalAI
 from .constants import MAX_AUDIO_DURATION, MIN_AUDIO_DURATION, TRANSCRIPTION_ERROR, TRANSCRIPTION_SUCCESS
@@ -23,7 +23,7 @@ async def transcribe_handler(client: Client, message: Message):
 
     # Skip transcription in non-private chats if disabled
     if message.chat.type != ChatType.PRIVATE:
-        if not await get_chat_setting(message.chat.id, "transcribe", default=True):
+        if not await UpdateContext.of(message).get_setting("transcribe", True):
             return
 
     # Get audio duration
@@ -51,7 +51,7 @@ async def set_vip_command(client: Client, message: Message):
         chat_id = message.chat.id
 
     # Check current VIP status
-    current_status = await is_vip(chat_id)
+    current_status = is_vip(chat_id)
     
     try:
         # Toggle VIP status
@@ -60,7 +60,7 @@ async def set_vip_command(client: Client, message: Message):
             await message.reply_text(f"✅ VIP статус отключен для {target}", quote=True)
             log.info("VIP status disabled", chat_id=chat_id, by_user=message.from_user.id)
         else:
-            await enable_vip(chat_id)
+            await enable_vip(chat_id, granted_by=message.from_user.id)
             await message.reply_text(f"✅ VIP статус включен для {target}", quote=True)
             log.info("VIP status enabled", chat_id=chat_id, by_user=message.from_user.id)
     except Exception as e:
@@ -0,0 +1,109 @@
+"""Per-update context resolving chat configuration, VIP, developer and rate limit state once"""
+
+from typing import Any, Dict, Optional, Union
+
+from pyrogram.enums import ChatType
+from pyrogram.types import CallbackQuery, Message
+
+from src.config.framework import PeerConfigModel, get_chat_config, is_vip
+from src.security.rate_limiter import RateLimiter
+from src.utils.helpers import is_developer
+
+# Attribute the context is stored under; private names are skipped by the spy serializer
+CONTEXT_ATTRIBUTE = "_context"
+
+
+class UpdateContext:
+    """
+    Lazily populated facts about the chat and user behind one update.
+
+    The group -1 middleware in src/plugins/context.py attaches a context to every
+    incoming message, and every handler and decorator processing that message reads
+    from it. Each fact is resolved on first access and kept for the rest of the update,
+    so a voice message that passes through spy, transcription and permission checks
+    costs at most one chat configuration lookup. Use UpdateContext.of(message) to get
+    the context; it is created on the spot for updates the middleware did not see.
+    """
+
+    __slots__ = ("chat_id", "user_id", "is_private", "_config", "_is_developer", "_rate_limits")
+
+    def __init__(self, chat_id: Optional[int], user_id: Optional[int], is_private: bool):
+        self.chat_id = chat_id
+        self.user_id = user_id
+        self.is_private = is_private
+        self._config: Optional[Dict] = None
+        self._is_developer: Optional[bool] = None
+        self._rate_limits: Dict[str, bool] = {}
+
+    @classmethod
+    def of(cls, message: Union[Message, CallbackQuery]) -> "UpdateContext":
+        """
+        Get the context attached to an update, attaching a new one if there is none.
+
+        Args:
+            message: The incoming message or callback query
+
+        Returns:
+            UpdateContext: The context shared by all handlers of this update
+        """
+        context = getattr(message, CONTEXT_ATTRIBUTE, None)
+        if context is None:
+            chat = getattr(message, "chat", None)
+            context = cls(
+                chat_id=chat.id if chat else None,
+                user_id=message.from_user.id if message.from_user else None,
+                is_private=chat is not None and chat.type == ChatType.PRIVATE,
+            )
+            setattr(message, CONTEXT_ATTRIBUTE, context)
+        return context
+
+    async def get_config(self) -> Dict:
+        """Get the chat configuration, loading it on first use."""
+        if self._config is None:
+            self._config = await get_chat_config(self.chat_id) if self.chat_id is not None else {}
+        return self._config
+
+    async def get_setting(self, param_name: str, default: Any = None) -> Any:
+        """
+        Get a chat setting from the configuration resolved for this update.
+
+        Args:
+            param_name: The setting key (parameter or command name)
+            default: Value returned when the setting is missing
+
+        Returns:
+            The setting value
+        """
+        actual_param = PeerConfigModel.get_param_by_command(param_name) or param_name
+        return (await self.get_config()).get(actual_param, default)
+
+    @property
+    def is_vip(self) -> bool:
+        """Whether the user behind the update has VIP status."""
+        return self.user_id is not None and is_vip(self.user_id)
+
+    @property
+    def is_developer(self) -> bool:
+        """Whether the user behind the update is the bot owner."""
+        if self._is_developer is None:
+            self._is_developer = self.user_id is not None and is_developer(self.user_id)
+        return self._is_developer
+
+    async def check_rate_limit(self, operation: str, window_seconds: int, burst: int = 1) -> bool:
+        """
+        Take a rate limit token for the user, at most once per operation and update.
+
+        Args:
+            operation: Name of the rate limited operation
+            window_seconds: Seconds needed to earn back one token
+            burst: Number of requests allowed back to back
+
+        Returns:
+            bool: True if the update may perform the operation
+        """
+        if operation not in self._rate_limits:
+            if self.user_id is None:
+                self._rate_limits[operation] = True
+            else:
+                self._rate_limits[operation] = await RateLimiter.get_instance().check(user_id=self.user_id, operation=operation, window_seconds=window_seconds, capacity=burst)
+        return self._rate_limits[operation]
@@ -0,0 +1,126 @@
+"""In-memory view of user entitlements backed by the entitlements collection"""
+
+import asyncio
+from typing import Optional, Set
+
+import structlog
+from pymongo.errors import PyMongoError
+
+from src.database.client import DatabaseClient
+from src.database.invalidation import InvalidationBus
+from src.database.repository.entitlements_repository import VIP_ENTITLEMENT, EntitlementsRepository
+
+logger = structlog.get_logger()
+
+# Invalidation bus key prefix; followed by the user ID
+VIP_INVALIDATION_PREFIX = "entitlements:vip:"
+# Delays between background attempts when the startup load fails; the last one repeats
+LOAD_RETRY_SECONDS = (1, 5, 15, 60)
+
+
+class Entitlements:
+    """
+    Keeps the set of VIP user IDs in memory.
+
+    The set is loaded once at startup and updated in place by grant_vip() and
+    revoke_vip(), which write through to the entitlements collection first and tell
+    other processes over the invalidation bus. Checking VIP status is a set
+    membership test and never touches the database. If the startup load fails, it is
+    retried in the background and is_vip() answers False until it succeeds, so a
+    database hiccup degrades VIP users to regular limits instead of stopping the bot.
+    """
+
+    _instance = None
+
+    def __init__(self, repository: EntitlementsRepository):
+        self.repository = repository
+        self.vip_user_ids: Set[int] = set()
+        self.loaded = False
+        self._retry: Optional[asyncio.Task] = None
+
+    @classmethod
+    def get_instance(cls) -> "Entitlements":
+        """Get the shared entitlements, creating them on first use."""
+        if cls._instance is None:
+            cls._instance = cls(EntitlementsRepository(DatabaseClient.get_instance()))
+        return cls._instance
+
+    @classmethod
+    async def shutdown(cls):
+        """Stop a background load retry if one is running."""
+        if cls._instance is not None and cls._instance._retry is not None and not cls._instance._retry.done():
+            cls._instance._retry.cancel()
+            try:
+                await cls._instance._retry
+            except asyncio.CancelledError:
+                pass
+
+    async def load(self):
+        """
+        Import legacy VIP flags if needed and load every VIP user ID.
+
+        Database errors are logged, not raised; loading is then retried in the background.
+        """
+        try:
+            await self._load()
+        except PyMongoError as e:
+            logger.error("Failed to load entitlements, retrying in the background", error=str(e))
+            if self._retry is None or self._retry.done():
+                self._retry = asyncio.create_task(self._retry_load())
+
+    async def _load(self):
+        await self.repository.import_legacy_vips()
+        self.vip_user_ids = set(await self.repository.get_user_ids(VIP_ENTITLEMENT))
+        self.loaded = True
+        logger.info("Loaded entitlements", vip_users=len(self.vip_user_ids))
+
+    async def _retry_load(self):
+        """Keep trying to load until it succeeds."""
+        attempt = 0
+        while not self.loaded:
+            await asyncio.sleep(LOAD_RETRY_SECONDS[min(attempt, len(LOAD_RETRY_SECONDS) - 1)])
+            attempt += 1
+            try:
+                await self._load()
+            except PyMongoError as e:
+                logger.warning("Retrying entitlements load failed", attempt=attempt, error=str(e))
+
+    def is_vip(self, user_id: int) -> bool:
+        """Check whether a user has VIP status."""
+        return user_id in self.vip_user_ids
+
+    async def grant_vip(self, user_id: int, granted_by: Optional[int] = None):
+        """
+        Give a user VIP status.
+
+        Args:
+            user_id: The user ID
+            granted_by: User ID of the developer granting it
+        """
+        await self.repository.grant(user_id, VIP_ENTITLEMENT, granted_by)
+        self.vip_user_ids.add(user_id)
+        await InvalidationBus.get_instance().publish(f"{VIP_INVALIDATION_PREFIX}{user_id}")
+
+    async def revoke_vip(self, user_id: int):
+        """
+        Remove VIP status from a user.
+
+        Args:
+            user_id: The user ID
+        """
+        await self.repository.revoke(user_id, VIP_ENTITLEMENT)
+        self.vip_user_ids.discard(user_id)
+        await InvalidationBus.get_instance().publish(f"{VIP_INVALIDATION_PREFIX}{user_id}")
+
+    async def _on_invalidation(self, key: str):
+        """Re-read a user's VIP status after another process changed it."""
+        user_id = key[len(VIP_INVALIDATION_PREFIX) :]
+        if not user_id:
+            self.vip_user_ids = set(await self.repository.get_user_ids(VIP_ENTITLEMENT))
+        elif await self.repository.has(int(user_id), VIP_ENTITLEMENT):
+            self.vip_user_ids.add(int(user_id))
+        else:
+            self.vip_user_ids.discard(int(user_id))
+
+
+InvalidationBus.subscribe(VIP_INVALIDATION_PREFIX, lambda key: Entitlements.get_instance()._on_invalidation(key))
@@ -5,7 +5,7 @@ from functools import wraps
 from pyrogram.enums import ChatType
 from pyrogram.types import Message
 
-from src.plugins.peer_config.settings import get_chat_setting
+from src.security.context import UpdateContext
 
 
 def requires_setting(setting: str):
@@ -20,8 +20,8 @@ def requires_setting(setting: str):
         async def wrapper(client, message: Message, *args, **kwargs):
             # Skip check for private chats
             if message.chat.type != ChatType.PRIVATE:
-                # Check if setting is enabled
-                if not await get_chat_setting(message.chat.id, setting):
+                # Check if setting is enabled, using the configuration resolved for this update
+                if not await UpdateContext.of(message).get_setting(setting, False):
                     return await message.reply_text(f"❌ В данном чате нет прав на {setting}. Включите через /config", quote=True)
 
             # Proceed with the handler
@@ -1,22 +1,231 @@
+import asyncio
 import functools
-from typing import Optional, Callable, Any
+import time
+from datetime import datetime
+from typing import Optional, Callable, Any, Dict, Set, Tuple
 
 import structlog
+from pymongo.errors import DuplicateKeyError
 
 from src.database.client import DatabaseClient
 from src.database.repository.ratelimit_repository import RateLimitRepository
-from src.utils.helpers import is_developer
+from src.utils.cache import TTLCache
+from src.utils.credentials import Credentials
 
 logger = structlog.get_logger()
 
+# How often dirty buckets are written to MongoDB and refilled buckets are evicted
+FLUSH_INTERVAL_SECONDS = 5.0
+# Number of rate limited keys whose denial is remembered locally in distributed mode
+LEASE_CACHE_SIZE = 10000
+
+
+class _Bucket:
+    """Token bucket state for one (user, operation) key."""
+
+    __slots__ = ("tokens", "updated_at", "expires_at")
+
+    def __init__(self, tokens: float, updated_at: float, expires_at: float):
+        self.tokens = tokens
+        self.updated_at = updated_at
+        # Moment the bucket is full again; from then on it is equivalent to no bucket at all
+        self.expires_at = expires_at
+
+
+class RateLimiter:
+    """
+    In-memory token bucket rate limiter keyed by (user_id, operation).
+
+    Decisions only touch a dict and never await, so concurrent handlers are not
+    serialized behind database writes. Buckets changed since the last flush are
+    written to the ratelimits collection in one bulk write every FLUSH_INTERVAL_SECONDS,
+    and buckets that have refilled are dropped from memory (and expire in MongoDB
+    through a TTL index). Persisted buckets are loaded back when the limiter starts,
+    so a restart does not reset everyone's allowance.
+
+    In distributed mode (RATE_LIMIT_DISTRIBUTED=true) the buckets live in MongoDB and
+    every decision is a single atomic find_one_and_update, so several bot processes
+    share one allowance. A denied key is leased locally until its next token is due,
+    which keeps users hammering a command from reaching the database each time.
+    """
+
+    _instance = None
+
+    def __init__(self, repository: RateLimitRepository, distributed: bool = False, flush_interval: float = FLUSH_INTERVAL_SECONDS):
+        self.repository = repository
+        self.distributed = distributed
+        self.flush_interval = flush_interval
+        self._buckets: Dict[Tuple[int, str], _Bucket] = {}
+        self._dirty: Set[Tuple[int, str]] = set()
+        self._worker: Optional[asyncio.Task] = None
+        # (user_id, operation) -> unix time before which the key is known to be rate limited
+        self._denied_until = TTLCache(maxsize=LEASE_CACHE_SIZE)
+
+    @classmethod
+    def get_instance(cls) -> "RateLimiter":
+        """Get the shared rate limiter, creating it on first use."""
+        if cls._instance is None:
+            distributed = Credentials.get_instance().ratelimit.distributed
+            cls._instance = cls(RateLimitRepository(DatabaseClient.get_instance()), distributed=distributed)
+        return cls._instance
+
+    @classmethod
+    async def shutdown(cls):
+        """Persist pending buckets of the shared limiter if it was ever started."""
+        if cls._instance is not None:
+            await cls._instance.stop()
+
+    def start(self):
+        """Start the background persistence task if it is not running yet."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and write the remaining dirty buckets."""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        await self._flush()
+
+    async def check(self, user_id: int, operation: str, window_seconds: float, capacity: int = 1) -> bool:
+        """
+        Take a token from the (user_id, operation) bucket using the configured mode.
+
+        Args:
+            user_id: The user ID
+            operation: The operation name
+            window_seconds: Time to refill the whole bucket
+            capacity: Number of requests allowed in a burst
+
+        Returns:
+            bool: True if operation is allowed, False if rate limited
+        """
+        if not self.distributed:
+            return self.allow(user_id, operation, window_seconds, capacity)
+
+        key = (user_id, operation)
+        now = time.time()
+        if self._denied_until.get(key, 0) > now:
+            return False
+
+        try:
+            try:
+                bucket = await self.repository.take_token(user_id, operation, window_seconds, capacity, now)
+            except DuplicateKeyError:
+                # Another process created the bucket between our match and insert
+                bucket = await self.repository.take_token(user_id, operation, window_seconds, capacity, now)
+        except Exception as e:
+            logger.error("Distributed rate limit check failed, using local bucket", error=str(e), user_id=user_id, operation=operation)
+            return self.allow(user_id, operation, window_seconds, capacity)
+
+        if bucket["updated_at"] == now:
+            return True
+
+        # No token left: nobody can get one for this key before it refills to 1
+        rate = capacity / window_seconds
+        self._denied_until.set(key, bucket["updated_at"] + (1 - bucket["tokens"]) / rate)
+        return False
+
+    def allow(self, user_id: int, operation: str, window_seconds: float, capacity: int = 1) -> bool:
+        """
+        Take a token from the in-memory (user_id, operation) bucket if one is available.
+
+        The bucket holds up to capacity tokens and refills at capacity tokens per
+        window_seconds. With the default capacity of 1 a user gets one request per window.
+
+        Args:
+            user_id: The user ID
+            operation: The operation name
+            window_seconds: Time to refill the whole bucket
+            capacity: Number of requests allowed in a burst
+
+        Returns:
+            bool: True if operation is allowed, False if rate limited
+        """
+        self.start()
+
+        key = (user_id, operation)
+        now = time.time()
+        rate = capacity / window_seconds
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = capacity
+        else:
+            tokens = min(capacity, bucket.tokens + (now - bucket.updated_at) * rate)
+
+        if tokens < 1:
+            return False
+
+        tokens -= 1
+        self._buckets[key] = _Bucket(tokens, now, now + (capacity - tokens) / rate)
+        self._dirty.add(key)
+        return True
+
+    def evict_expired(self) -> int:
+        """
+        Drop buckets that have refilled completely.
+
+        Returns:
+            int: Number of evicted buckets
+        """
+        now = time.time()
+        expired = [key for key, bucket in self._buckets.items() if bucket.expires_at <= now]
+        for key in expired:
+            del self._buckets[key]
+            self._dirty.discard(key)
+        return len(expired)
+
+    async def load(self):
+        """Restore persisted buckets, keeping any decision made since startup."""
+        try:
+            for doc in await self.repository.load_buckets():
+                key = (doc["user_id"], doc["operation"])
+                if key not in self._buckets:
+                    self._buckets[key] = _Bucket(doc["tokens"], doc["updated_at"], doc["expires_at"].timestamp() if isinstance(doc["expires_at"], datetime) else doc["expires_at"])
+            logger.info("Rate limit buckets loaded", count=len(self._buckets))
+        except Exception as e:
+            logger.error("Failed to load rate limit buckets", error=str(e))
+
+    async def _run(self):
+        await self.load()
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.evict_expired()
+            await self._flush()
+
+    async def _flush(self):
+        """Write every bucket changed since the previous flush."""
+        if not self._dirty:
+            return
+
+        keys, self._dirty = self._dirty, set()
+        documents = []
+        for user_id, operation in keys:
+            bucket = self._buckets.get((user_id, operation))
+            if bucket is None:
+                continue
+            documents.append({"user_id": user_id, "operation": operation, "tokens": bucket.tokens, "updated_at": bucket.updated_at, "expires_at": datetime.utcfromtimestamp(bucket.expires_at)})
+
+        try:
+            await self.repository.save_buckets(documents)
+        except Exception as e:
+            # Retry on the next flush unless a newer decision already marked the key
+            self._dirty.update(keys)
+            logger.error("Failed to persist rate limit buckets", error=str(e), count=len(documents))
+
 
 def rate_limit(
     operation: Optional[str] = None,
     window_seconds: int = 10,  # Default 10 second window
     on_rate_limited: Optional[Callable] = None,
+    burst: int = 1,
 ):
     """
-    Rate limiting decorator that uses timestamps to limit operations.
+    Rate limiting decorator backed by the shared in-memory token bucket limiter.
 
     Args:
         operation (Optional[str]): Name of the operation to rate limit.
@@ -25,6 +234,7 @@ def rate_limit(
             one request per window.
         on_rate_limited (Optional[Callable]): Callback function to execute when rate limit
             is exceeded. Receives the event object as parameter.
+        burst (int): Number of requests allowed back to back before the window applies.
 
     Example usage:
         @rate_limit(
@@ -48,19 +258,19 @@ def rate_limit(
                     return await func(*args, **kwargs)
 
                 user_id = event.from_user.id
-                
+                from src.security.context import UpdateContext
+
+                context = UpdateContext.of(event)
+
                 # Developer bypass - allow owner to bypass rate limits
-                if is_developer(user_id):
+                if context.is_developer:
                     logger.info("Developer bypassed rate limit", user_id=user_id)
                     return await func(*args, **kwargs)
                 
                 op_name = operation or func.__name__
 
-                # Check rate limit
-                db_client = DatabaseClient.get_instance()
-                rate_limit_repo = RateLimitRepository(db_client)
-
-                allowed = await rate_limit_repo.check_rate_limit(user_id=user_id, operation=op_name, window_seconds=window_seconds)
+                # Check rate limit; the result is shared by every handler of this update
+                allowed = await context.check_rate_limit(op_name, window_seconds, burst)
 
                 if not allowed:
                     logger.warning("Rate limit exceeded", user_id=user_id, operation=op_name)
@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterator, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Bounded in-memory cache with LRU eviction and per-entry expiry.
+
+    Entries are evicted in least-recently-used order once ``maxsize`` is
+    reached and are treated as missing once they are older than ``ttl`` seconds.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize: Maximum number of entries to keep
+            ttl: Lifetime of an entry in seconds (None to never expire)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.monotonic() - stored_at > self.ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it as recently used, or return default if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        stored_at, value = entry
+        if self._expired(stored_at):
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, age: float = 0.0):
+        """
+        Store a value, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key: Entry key
+            value: Entry value
+            age: Seconds the value has already spent cached (when restoring a snapshot)
+        """
+        self._data[key] = (time.monotonic() - age, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a value from the cache and return it."""
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        """Remove all entries."""
+        self._data.clear()
+
+    def keys(self) -> Iterator[Hashable]:
+        """Iterate over keys of entries that have not expired."""
+        return (key for key, (stored_at, _) in list(self._data.items()) if not self._expired(stored_at))
+
+    def items(self) -> Iterator[Tuple[Hashable, Any, float]]:
+        """Iterate over (key, value, age in seconds) of entries that have not expired, least recently used first."""
+        now = time.monotonic()
+        return ((key, value, now - stored_at) for key, (stored_at, value) in list(self._data.items()) if not self._expired(stored_at))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_MISSING = object()
@@ -21,6 +21,7 @@ class DatabaseConfig:
     password: str
     host: str
     port: int
+    profile: str
 
     @property
     def connection_string(self) -> str:
@@ -32,7 +33,7 @@ class DatabaseConfig:
     def from_env(cls) -> "DatabaseConfig":
         # Use service name in Docker, fallback to MONGO_BIND_IP
         host = os.getenv("MONGO_HOST", "mongodb") if os.getenv("DOCKER_ENV") else os.getenv("MONGO_BIND_IP", "localhost")
-        return cls(username=os.getenv("MONGO_USERNAME", ""), password=os.getenv("MONGO_PASSWORD", ""), host=host, port=int(os.getenv("MONGO_PORT", "27017")))
+        return cls(username=os.getenv("MONGO_USERNAME", ""), password=os.getenv("MONGO_PASSWORD", ""), host=host, port=int(os.getenv("MONGO_PORT", "27017")), profile=os.getenv("MONGO_PROFILE", "bot"))
 
 
 @dataclass
@@ -68,6 +69,38 @@ class DebugConfig:
         return cls(owner_id=int(os.getenv("OWNER_ID", "0")))
 
 
+@dataclass
+class RateLimitConfig:
+    distributed: bool
+
+    @classmethod
+    def from_env(cls) -> "RateLimitConfig":
+        return cls(distributed=os.getenv("RATE_LIMIT_DISTRIBUTED", "false").lower() == "true")
+
+
+@dataclass
+class MetricsConfig:
+    host: str
+    port: int  # 0 disables the endpoint
+    mongo_payload_sizes: bool  # BSON-encodes every command and reply to count bytes; off by default
+
+    @classmethod
+    def from_env(cls) -> "MetricsConfig":
+        return cls(host=os.getenv("METRICS_HOST", "127.0.0.1"), port=int(os.getenv("METRICS_PORT", "0")), mongo_payload_sizes=os.getenv("METRICS_MONGO_PAYLOAD_SIZES", "false").lower() == "true")
+
+
+@dataclass
+class SnapshotConfig:
+    # CACHE_SNAPSHOT_PATH: where caches are saved on shutdown and restored from on startup;
+    # empty disables warm-restart snapshots. The default lives in logs/, the directory
+    # docker-compose mounts from the host, so the snapshot survives a redeploy.
+    path: str
+
+    @classmethod
+    def from_env(cls) -> "SnapshotConfig":
+        return cls(path=os.getenv("CACHE_SNAPSHOT_PATH", os.path.join("logs", "cache_snapshot.bson")))
+
+
 @dataclass
 class Credentials:
     bot: BotConfig
@@ -75,6 +108,9 @@ class Credentials:
     proxy: ProxyConfig
     api: APIConfig
     debug: DebugConfig
+    ratelimit: RateLimitConfig
+    metrics: MetricsConfig
+    snapshot: SnapshotConfig
 
     _instance = None
 
@@ -91,4 +127,4 @@ class Credentials:
 
     @classmethod
     def from_env(cls) -> "Credentials":
-        return cls(bot=BotConfig.from_env(), database=DatabaseConfig.from_env(), proxy=ProxyConfig.from_env(), api=APIConfig.from_env(), debug=DebugConfig.from_env())
+        return cls(bot=BotConfig.from_env(), database=DatabaseConfig.from_env(), proxy=ProxyConfig.from_env(), api=APIConfig.from_env(), debug=DebugConfig.from_env(), ratelimit=RateLimitConfig.from_env(), metrics=MetricsConfig.from_env(), snapshot=SnapshotConfig.from_env())
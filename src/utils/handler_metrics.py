@@ -0,0 +1,197 @@
+"""Per-handler invocation, error and latency metrics with an optional Prometheus endpoint."""
+
+import asyncio
+import functools
+import inspect
+import time
+from typing import Dict, Optional, Tuple
+
+import structlog
+from pyrogram import ContinuePropagation, StopPropagation
+
+from src.utils.metrics import Histogram
+
+logger = structlog.get_logger(__name__)
+
+# Propagation control raised by handlers on purpose; not counted as errors
+_CONTROL_FLOW = (StopPropagation, ContinuePropagation)
+
+
+class HandlerStats:
+    """Counters for one handler or handler group."""
+
+    __slots__ = ("invocations", "errors", "latency")
+
+    def __init__(self):
+        self.invocations = 0
+        self.errors = 0
+        self.latency = Histogram()
+
+    def record(self, duration_ms: float, failed: bool):
+        self.invocations += 1
+        if failed:
+            self.errors += 1
+        self.latency.observe(duration_ms)
+
+
+class HandlerMetrics:
+    """
+    Collects metrics for every pyrogram handler the client registers.
+
+    instrument_client() hooks Client.add_handler before the client starts, so every
+    handler pyrogram discovers in src/plugins is wrapped as it is registered; plugin
+    code needs no changes. Each wrapper holds direct references to its handler's and
+    its group's stats, so an update costs two clock reads and two histogram observations.
+    """
+
+    _instance = None
+
+    def __init__(self):
+        self.handlers: Dict[Tuple[str, int], HandlerStats] = {}
+        self.groups: Dict[int, HandlerStats] = {}
+
+    @classmethod
+    def get_instance(cls) -> "HandlerMetrics":
+        """Get the process-wide handler metrics."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def instrument_client(self, client):
+        """
+        Wrap every handler added to the client from now on.
+
+        Args:
+            client: Pyrogram client, before start() loads the plugins
+        """
+        add_handler = client.add_handler
+
+        @functools.wraps(add_handler)
+        def instrumented_add_handler(handler, group: int = 0):
+            self.instrument_handler(handler, group)
+            return add_handler(handler, group)
+
+        client.add_handler = instrumented_add_handler
+
+    def instrument_handler(self, handler, group: int):
+        """Replace a handler's callback with a timed wrapper."""
+        callback = handler.callback
+        if getattr(callback, "__metrics_wrapped__", False):
+            return
+
+        name = f"{callback.__module__.removeprefix('src.plugins.')}.{callback.__qualname__}"
+        handler_stats = self.handlers.setdefault((name, group), HandlerStats())
+        group_stats = self.groups.setdefault(group, HandlerStats())
+        perf_counter = time.perf_counter
+
+        if inspect.iscoroutinefunction(callback):
+
+            @functools.wraps(callback)
+            async def wrapper(*args, **kwargs):
+                start = perf_counter()
+                failed = False
+                try:
+                    return await callback(*args, **kwargs)
+                except _CONTROL_FLOW:
+                    raise
+                except BaseException:
+                    failed = True
+                    raise
+                finally:
+                    duration_ms = (perf_counter() - start) * 1000
+                    handler_stats.record(duration_ms, failed)
+                    group_stats.record(duration_ms, failed)
+
+        else:
+
+            @functools.wraps(callback)
+            def wrapper(*args, **kwargs):
+                start = perf_counter()
+                failed = False
+                try:
+                    return callback(*args, **kwargs)
+                except _CONTROL_FLOW:
+                    raise
+                except BaseException:
+                    failed = True
+                    raise
+                finally:
+                    duration_ms = (perf_counter() - start) * 1000
+                    handler_stats.record(duration_ms, failed)
+                    group_stats.record(duration_ms, failed)
+
+        wrapper.__metrics_wrapped__ = True
+        handler.callback = wrapper
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """
+        Get invocation, error and latency statistics per handler and per group.
+
+        Returns:
+            Dict[str, Dict]: {"handlers": {...}, "groups": {...}} with latencies in ms
+        """
+        return {
+            "handlers": {f"{name} (group {group})": {"invocations": stats.invocations, "errors": stats.errors, **stats.latency.snapshot()} for (name, group), stats in self.handlers.items()},
+            "groups": {group: {"invocations": stats.invocations, "errors": stats.errors, **stats.latency.snapshot()} for group, stats in sorted(self.groups.items())},
+        }
+
+    def render_prometheus(self) -> str:
+        """Render handler and MongoDB command metrics in the Prometheus text format."""
+        from src.database.monitoring import CommandMonitor
+
+        lines = []
+
+        def counter(metric: str, help_text: str, samples):
+            lines.extend((f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"))
+            lines.extend(f"{metric}{{{labels}}} {value}" for labels, value in samples)
+
+        def histogram(metric: str, help_text: str, samples):
+            lines.extend((f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"))
+            for labels, latency in samples:
+                for bound, count in latency.cumulative().items():
+                    le = "+Inf" if bound == float("inf") else repr(bound / 1000)
+                    lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"{metric}_sum{{{labels}}} {latency.total / 1000}")
+                lines.append(f"{metric}_count{{{labels}}} {latency.count}")
+
+        handlers = [(f'handler="{name}",group="{group}"', stats) for (name, group), stats in self.handlers.items()]
+        groups = [(f'group="{group}"', stats) for group, stats in sorted(self.groups.items())]
+
+        counter("nexus_handler_invocations_total", "Handler invocations.", [(labels, stats.invocations) for labels, stats in handlers])
+        counter("nexus_handler_errors_total", "Handler invocations that raised.", [(labels, stats.errors) for labels, stats in handlers])
+        histogram("nexus_handler_latency_seconds", "Handler latency.", [(labels, stats.latency) for labels, stats in handlers])
+        histogram("nexus_handler_group_latency_seconds", "Latency of all handlers in a group.", [(labels, stats.latency) for labels, stats in groups])
+        histogram("nexus_mongo_command_latency_seconds", "MongoDB command latency.", [(f'collection="{collection}",command="{command}"', latency) for (collection, command), latency in CommandMonitor.get_instance().get_histograms().items()])
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Minimal HTTP server answering every request with the Prometheus metrics."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info("Metrics endpoint listening", host=self.host, port=self.port)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            # Only the request line matters; drain the headers
+            while (await reader.readline()).strip():
+                pass
+            body = HandlerMetrics.get_instance().render_prometheus().encode()
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\nContent-Length: " + str(len(body)).encode() + b"\r\nConnection: close\r\n\r\n" + body)
+            await writer.drain()
+        except Exception as e:
+            logger.error("Failed to serve metrics", error=str(e))
+        finally:
+            writer.close()
@@ -1,19 +1,91 @@
+import atexit
+import os
 import sys
-from typing import List
+from collections import defaultdict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from queue import SimpleQueue
+from typing import Dict, List, Optional
 
 import structlog
 from structlog.types import Processor, EventDict
 
 import logging
 
+# Keep one in N events with these names (info and debug only); LOG_SAMPLE_RATES="event=N,..." overrides
+DEFAULT_SAMPLE_RATES = {"Message received": 10}
+# Rotate the log file at this size, keeping this many old files
+LOG_MAX_BYTES = 50 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+_listener: Optional[QueueListener] = None
+
 
 def drop_color_message_key(_, __, event_dict: EventDict) -> EventDict:
     event_dict.pop("color_message", None)
     return event_dict
 
 
-def setup_structlog(json_logs: bool = False, log_level: str = "INFO", log_file: str = "frontend.log"):
+def capture_exc_info(_, __, event_dict: EventDict) -> EventDict:
+    # The exception must be captured here; the listener thread renders it later
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
+def parse_sample_rates(value: str) -> Dict[str, int]:
+    """Parse "event=N,event=N" into a mapping of event name to sampling rate."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        event, _, rate = item.rpartition("=")
+        try:
+            rates[event.strip()] = max(1, int(rate))
+        except ValueError:
+            continue
+    return rates
+
+
+class EventSampler:
+    """
+    Processor keeping one in N occurrences of high-frequency info and debug events.
+
+    Sampling is deterministic per event name, so a rate of 10 keeps exactly every tenth
+    line. Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rates: Dict[str, int]):
+        self.rates = rates
+        self.seen: Dict[str, int] = defaultdict(int)
+
+    def __call__(self, _, method_name: str, event_dict: EventDict) -> EventDict:
+        rate = self.rates.get(event_dict.get("event"))
+        if rate is None or rate <= 1 or method_name not in ("debug", "info"):
+            return event_dict
+        self.seen[event_dict["event"]] += 1
+        if self.seen[event_dict["event"]] % rate != 1:
+            raise structlog.DropEvent
+        event_dict["sampled"] = f"1/{rate}"
+        return event_dict
+
+
+class _PassthroughQueueHandler(QueueHandler):
+    """Queue handler that leaves the structlog event dict for the listener thread to render."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_structlog(json_logs: bool = True, log_level: str = "INFO", log_file: str = "frontend.log", console: bool = True):
+    """
+    Configure structlog on top of a non-blocking stdlib pipeline.
+
+    Log calls only run the cheap shared processors and put the record on a queue. A
+    QueueListener thread renders records (console output and JSON for the rotating
+    log file) and does all of the I/O, so the event loop never waits on the disk.
+    """
+    global _listener
+
     timestamper = structlog.processors.TimeStamper(fmt="iso")
+    sampler = EventSampler({**DEFAULT_SAMPLE_RATES, **parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))})
 
     shared_processors: List[Processor] = [
         structlog.contextvars.merge_contextvars,
@@ -27,8 +99,10 @@ def setup_structlog(json_logs: bool = False, log_level: str = "INFO", log_file:
     ]
 
     structlog.configure(
-        processors=shared_processors
+        processors=[structlog.stdlib.filter_by_level, sampler]
+        + shared_processors
         + [
+            capture_exc_info,
             structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
         logger_factory=structlog.stdlib.LoggerFactory(),
@@ -50,19 +124,30 @@ def setup_structlog(json_logs: bool = False, log_level: str = "INFO", log_file:
         ],
         processors=[
             structlog.stdlib.ProcessorFormatter.remove_processors_meta,
-            structlog.processors.JSONRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(ensure_ascii=False),
         ],
     )
 
     stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(console_formatter)
 
-    file_handler = logging.FileHandler(log_file)
+    file_handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
     file_handler.setFormatter(json_formatter if json_logs else console_formatter)
 
+    if _listener is not None:
+        _listener.stop()
+    log_queue = SimpleQueue()
+    handlers = (stream_handler, file_handler) if console else (file_handler,)
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
     root_logger = logging.getLogger()
-    root_logger.addHandler(stream_handler)
-    root_logger.addHandler(file_handler)
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, _PassthroughQueueHandler):
+            root_logger.removeHandler(handler)
+    root_logger.addHandler(_PassthroughQueueHandler(log_queue))
     root_logger.setLevel(log_level.upper())
 
     def handle_exception(exc_type, exc_value, exc_traceback):
@@ -74,3 +159,11 @@ def setup_structlog(json_logs: bool = False, log_level: str = "INFO", log_file:
     sys.excepthook = handle_exception
 
     return structlog.get_logger()
+
+
+def shutdown_logging():
+    """Write out everything still queued and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,79 @@
+"""In-process metric primitives."""
+
+import bisect
+from typing import Dict, Sequence
+
+# Upper bounds in milliseconds, roughly logarithmic from sub-millisecond to ten seconds
+DEFAULT_LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+
+    Observing a value is a bisect and a few increments, so it is cheap enough for
+    every database command or update. Percentiles are estimated as the upper bound of
+    the bucket the requested rank falls in.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "total", "max")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        # One extra slot for values above the last bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Record a value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimate a percentile.
+
+        Args:
+            fraction: Percentile as a fraction (0.99 for p99)
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile (the maximum for the overflow bucket)
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def cumulative(self) -> Dict[float, int]:
+        """Get cumulative counts per upper bound, the form Prometheus expects."""
+        result, running = {}, 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            running += bucket_count
+            result[bound] = running
+        result[float("inf")] = self.count
+        return result
+
+    def snapshot(self) -> Dict[str, float]:
+        """Get summary statistics."""
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 3),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": round(self.max, 3),
+        }
@@ -0,0 +1,151 @@
+"""Warm-restart snapshots of in-memory caches."""
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, ClassVar, Dict, Iterable, List, Optional, Tuple
+
+import bson
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Bumped when the layout of the snapshot file changes
+SNAPSHOT_FORMAT = 1
+
+# (key, value, age in seconds)
+Entry = Tuple[Any, Any, float]
+
+
+@dataclass
+class SnapshotSource:
+    """A cache that takes part in snapshots."""
+
+    name: str
+    dump: Callable[[], Iterable[Entry]]
+    restore: Callable[[List[Entry]], int]
+    version: int = 1
+    ttl: Optional[float] = None
+
+
+class CacheSnapshot:
+    """
+    Saves registered caches to a local file on shutdown and restores them on startup.
+
+    Cache owners register a dump and a restore function at module level, the same way
+    repositories register their indexes. Each cache is stored as its own section with
+    the owner's version and a SHA-256 checksum of its payload; a section is discarded
+    when the version changed or the checksum does not match. Entry ages are carried
+    over, so entries that outlived the cache's TTL while the bot was down are dropped.
+    The file is removed once loaded, so a crash never restores an old snapshot.
+    """
+
+    sources: ClassVar[Dict[str, SnapshotSource]] = {}
+
+    @classmethod
+    def register(cls, name: str, dump: Callable[[], Iterable[Entry]], restore: Callable[[List[Entry]], int], version: int = 1, ttl: Optional[float] = None):
+        """
+        Register a cache.
+
+        Args:
+            name: Unique section name
+            dump: Returns the cache entries as (key, value, age in seconds); values must be BSON encodable
+            restore: Puts restored entries back into the cache and returns how many it took
+            version: Bump when the shape of the entries changes
+            ttl: Entries older than this many seconds are not restored (None to keep all)
+        """
+        cls.sources[name] = SnapshotSource(name=name, dump=dump, restore=restore, version=version, ttl=ttl)
+
+    @classmethod
+    def save(cls, path: str) -> Dict[str, int]:
+        """
+        Write every registered cache to a snapshot file.
+
+        Args:
+            path: Snapshot file path; written atomically through a temporary file
+
+        Returns:
+            Dict[str, int]: Number of entries saved per cache
+        """
+        started = time.perf_counter()
+        sections, counts = {}, {}
+        for name, source in cls.sources.items():
+            try:
+                entries = [[key, value, age] for key, value, age in source.dump()]
+                payload = bson.encode({"entries": entries})
+            except Exception as e:
+                logger.error("Failed to snapshot cache", cache=name, error=str(e))
+                continue
+            sections[name] = {"version": source.version, "checksum": hashlib.sha256(payload).hexdigest(), "payload": payload}
+            counts[name] = len(entries)
+
+        data = bson.encode({"format": SNAPSHOT_FORMAT, "created_at": time.time(), "sections": sections})
+        if directory := os.path.dirname(path):
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(data)
+        os.replace(temporary_path, path)
+
+        logger.info("Saved cache snapshot", path=path, bytes=len(data), entries=counts, took_ms=round((time.perf_counter() - started) * 1000, 1))
+        return counts
+
+    @classmethod
+    def load(cls, path: str) -> Optional[float]:
+        """
+        Restore registered caches from a snapshot file and remove the file.
+
+        Args:
+            path: Snapshot file path
+
+        Returns:
+            Optional[float]: Unix time the snapshot was taken, or None if nothing was loaded
+        """
+        if not os.path.exists(path):
+            logger.info("No cache snapshot to restore", path=path)
+            return None
+
+        started = time.perf_counter()
+        try:
+            with open(path, "rb") as file:
+                snapshot = bson.decode(file.read())
+        except Exception as e:
+            logger.error("Unreadable cache snapshot", path=path, error=str(e))
+            return None
+        finally:
+            os.remove(path)
+
+        if snapshot.get("format") != SNAPSHOT_FORMAT:
+            logger.warning("Ignoring cache snapshot in an old format", path=path, format=snapshot.get("format"))
+            return None
+
+        downtime = max(0.0, time.time() - snapshot["created_at"])
+        report = {}
+        for name, section in snapshot.get("sections", {}).items():
+            report[name] = cls._restore_section(name, section, downtime)
+
+        logger.info("Restored cache snapshot", path=path, downtime_s=round(downtime, 1), caches=report, time_to_warm_ms=round((time.perf_counter() - started) * 1000, 1))
+        return snapshot["created_at"]
+
+    @classmethod
+    def _restore_section(cls, name: str, section: Dict, downtime: float) -> str:
+        """Restore one cache; returns a short description of the outcome for the report."""
+        source = cls.sources.get(name)
+        if source is None:
+            return "unregistered"
+        if section.get("version") != source.version:
+            return f"version {section.get('version')} != {source.version}"
+        payload = section.get("payload", b"")
+        if hashlib.sha256(payload).hexdigest() != section.get("checksum"):
+            logger.warning("Cache snapshot checksum mismatch", cache=name)
+            return "checksum mismatch"
+
+        entries = [(key, value, age + downtime) for key, value, age in bson.decode(payload)["entries"]]
+        fresh = [entry for entry in entries if source.ttl is None or entry[2] < source.ttl]
+        try:
+            restored = source.restore(fresh)
+        except Exception as e:
+            logger.error("Failed to restore cache", cache=name, error=str(e))
+            return "restore failed"
+        return f"{restored} restored, {len(entries) - len(fresh)} expired"
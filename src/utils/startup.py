@@ -0,0 +1,166 @@
+"""Dependency-aware startup orchestration with per-step timing."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, ClassVar, Dict, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class StartupStep:
+    """A unit of startup work."""
+
+    name: str
+    func: Callable[[], Awaitable]
+    depends_on: Tuple[str, ...] = ()
+    critical: bool = False  # Abort startup if this step fails
+    background: bool = False  # Do not hold up startup waiting for this step
+    status: str = field(default="pending", compare=False)
+    started_at: Optional[float] = field(default=None, compare=False)
+    duration: Optional[float] = field(default=None, compare=False)
+    error: Optional[str] = field(default=None, compare=False)
+
+
+class Startup:
+    """
+    Registry and runner of startup steps.
+
+    Plugins declare their initialization with the startup_step decorator and main
+    registers the core steps. run() starts every step as soon as the steps it depends
+    on have finished, so independent steps run concurrently. Background steps are
+    started the same way but run() does not wait for them. A failed step skips the
+    steps depending on it; a failed critical step aborts startup.
+    """
+
+    steps: ClassVar[Dict[str, StartupStep]] = {}
+
+    _tasks: ClassVar[Dict[str, asyncio.Task]] = {}
+    _started_at: ClassVar[float] = 0.0
+
+    @classmethod
+    def register(cls, name: str, func: Callable[[], Awaitable], depends_on: Tuple[str, ...] = (), critical: bool = False, background: bool = False):
+        """
+        Declare a startup step.
+
+        Args:
+            name: Unique step name, referenced by other steps' depends_on
+            func: Coroutine function called without arguments
+            depends_on: Names of the steps that must succeed first
+            critical: Abort startup if this step fails
+            background: Start the step but do not wait for it
+        """
+        cls.steps[name] = StartupStep(name=name, func=func, depends_on=tuple(depends_on), critical=critical, background=background)
+
+    @classmethod
+    def _validate(cls):
+        """Check that every dependency exists and there are no cycles."""
+        for step in cls.steps.values():
+            for dependency in step.depends_on:
+                if dependency not in cls.steps:
+                    raise ValueError(f"Startup step {step.name} depends on unknown step {dependency}")
+
+        visiting, done = set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Startup dependency cycle through {name}")
+            visiting.add(name)
+            for dependency in cls.steps[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in cls.steps:
+            visit(name)
+
+    @classmethod
+    async def _run_step(cls, step: StartupStep) -> bool:
+        results = await asyncio.gather(*(cls._tasks[dependency] for dependency in step.depends_on), return_exceptions=True)
+        if not all(result is True for result in results):
+            step.status = "skipped"
+            logger.warning("Skipping startup step after failed dependency", step=step.name)
+            return False
+
+        step.status = "running"
+        step.started_at = time.perf_counter() - cls._started_at
+        start = time.perf_counter()
+        try:
+            await step.func()
+            step.status = "ok"
+            return True
+        except asyncio.CancelledError:
+            step.status = "cancelled"
+            raise
+        except Exception as e:
+            step.status = "failed"
+            step.error = str(e)
+            logger.error("Startup step failed", step=step.name, error=str(e), critical=step.critical)
+            return False
+        finally:
+            step.duration = time.perf_counter() - start
+            if step.background and step.status != "cancelled":
+                logger.info("Background startup step finished", step=step.name, status=step.status, duration_ms=round(step.duration * 1000, 1))
+
+    @classmethod
+    async def run(cls):
+        """
+        Run all registered steps and log the timing table.
+
+        Raises:
+            RuntimeError: If a critical step failed or was skipped
+        """
+        cls._validate()
+        cls._started_at = time.perf_counter()
+        cls._tasks = {name: asyncio.create_task(cls._run_step(step), name=f"startup:{name}") for name, step in cls.steps.items()}
+
+        foreground = [cls._tasks[name] for name, step in cls.steps.items() if not step.background]
+        await asyncio.gather(*foreground)
+        logger.info(f"Startup steps:\n{cls.format_report()}", total_ms=round((time.perf_counter() - cls._started_at) * 1000, 1))
+
+        failed = [step.name for step in cls.steps.values() if step.critical and step.status != "ok"]
+        if failed:
+            await cls.stop()
+            raise RuntimeError(f"Critical startup steps failed: {', '.join(failed)}")
+
+    @classmethod
+    async def stop(cls):
+        """Cancel steps that are still running, e.g. background work at shutdown."""
+        pending = [task for task in cls._tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    @classmethod
+    def format_report(cls) -> str:
+        """Render the per-step timing table."""
+        rows: List[str] = [f"{'step':<22}{'status':<10}{'start ms':>10}{'took ms':>10}  depends on"]
+        ordered = sorted(cls.steps.values(), key=lambda step: (step.started_at is None, step.started_at or 0))
+        for step in ordered:
+            started = f"{step.started_at * 1000:.1f}" if step.started_at is not None else "-"
+            took = f"{step.duration * 1000:.1f}" if step.duration is not None else "-"
+            name = f"{step.name} (bg)" if step.background else step.name
+            rows.append(f"{name:<22}{step.status:<10}{started:>10}{took:>10}  {', '.join(step.depends_on) or '-'}")
+        return "\n".join(rows)
+
+
+def startup_step(name: str, depends_on: Tuple[str, ...] = (), critical: bool = False, background: bool = False):
+    """
+    Decorator registering a coroutine function as a startup step.
+
+    Example usage:
+        @startup_step("threads", depends_on=("database",))
+        async def initialize():
+            ...
+    """
+
+    def decorator(func: Callable[[], Awaitable]) -> Callable[[], Awaitable]:
+        Startup.register(name, func, depends_on=depends_on, critical=critical, background=background)
+        return func
+
+    return decorator